@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Ingest benchmark: throughput, peak RSS and per-stage timings of a synthetic module load.
+
+Each size runs in a fresh interpreter so that the peak RSS of one run does not leak into the
+next. The module is loaded through loader.load_collection with a generated settings.conf, the
+same path the GUI and the scan command take. Results are written as JSON, pass a previous
+result file to --compare to print the ratio of every timing.
+
+Usage:
+    poetry run python benchmarks/bench_ingest.py --xsd path/to/CEEventsModal.xsd
+    poetry run python benchmarks/bench_ingest.py --xsd ... --sizes 1000 --compare old.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+SIZES = (1000, 10000, 100000)
+SEARCH_REPEAT = 5
+MATERIALIZE_SAMPLE = 200
+TYPED = "text:whisper fine"
+KEYSTROKE = 0.15  # seconds between two keystrokes of the typing simulation
+
+
+def peak_rss() -> dict:
+    """Peak resident set size in MiB of this process and of its largest worker.
+
+    None where the platform cannot tell: resource is unix only, on Windows the peak working set
+    of this process is read through psutil when it is installed.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return {"self": None, "children": None}
+        peak = getattr(psutil.Process().memory_info(), "peak_wset", None)
+        return {"self": peak / 2**20 if peak else None, "children": None}
+    scale = 1 if sys.platform == "darwin" else 1024  # bytes on macOS, KiB elsewhere
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 2**20,
+    }
+
+
+def format_mb(value: float | None) -> str:
+    return "--" if value is None else f"{value:.0f}MB"
+
+
+def timeit(func, repeat: int = SEARCH_REPEAT, setup=None) -> float:
+    """Best elapsed time of func in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def search_timings() -> dict:
+    """Time the searches of the main window over the loaded bucket, as wxui runs them"""
+    from pycestorieseditor.ceevents import get_ebucket, get_indexes
+    from pycestorieseditor.query import search
+
+    ebucket, indexes = get_ebucket(), get_indexes()
+    stack = list(ebucket.values())
+    skills, text = indexes["skills"], indexes["text"]
+    return {
+        "search_text": timeit(
+            lambda: [ebucket[e] for e in text.search("whisper fi")], setup=text.clear_cache
+        ),
+        "search_text_common": timeit(
+            lambda: [ebucket[e] for e in text.search("camp")], setup=text.clear_cache
+        ),
+        "search_text_scan": timeit(lambda: [x for x in stack if "whisper fi" in x.document]),
+        "search_skill": timeit(lambda: [ebucket[e] for e in skills.get("Roguery", ())]),
+        "search_name": timeit(lambda: [x for x in stack if "e0001" in x.name]),
+        "search_query": timeit(
+            lambda: search('skill:Roguery text:"whisper fi" NOT has:children'),
+            setup=text.clear_cache,
+        ),
+        "search_query_broad": timeit(
+            lambda: search("(skill:Roguery OR ReqGoldAbove>250) e00"),
+            setup=text.clear_cache,
+        ),
+    }
+
+
+def list_timings() -> dict:
+    """Time the event list model: building its table, then showing and sorting results"""
+    from pycestorieseditor.eventlist import EventTable
+    from pycestorieseditor.query import search
+
+    start = time.perf_counter()
+    table = EventTable()
+    build = time.perf_counter() - start
+    found = search("skill:Roguery")
+    every = table.all_ids()
+    return {
+        "list_table": build,
+        "list_all": timeit(table.all_ids),
+        "list_result": timeit(lambda: table.ids_of(found)),
+        "list_sort_file": timeit(lambda: table.sort(table.ids_of(found), 2)),
+        "list_sort_all": timeit(lambda: table.sort(every, 5, False)),
+    }
+
+
+def typing_latency(typed: str = TYPED) -> dict:
+    """Keystroke to result latency of the search thread, typed one character at a time"""
+    from pycestorieseditor.query import BackgroundSearch
+    from pycestorieseditor.tracing import percentile
+
+    latencies = []
+    done = threading.Event()
+
+    def on_result(result):
+        if not result.error:
+            latencies.append((time.perf_counter_ns() - result.submitted) / 1e9)
+        if result.query == typed:
+            done.set()
+
+    searcher = BackgroundSearch(on_result)
+    searcher.start()
+    for end in range(3, len(typed) + 1):  # the search box ignores less than 3 characters
+        searcher.submit(typed[:end])
+        time.sleep(KEYSTROKE)
+    done.wait(30)
+    searcher.stop()
+    return {"typing_p50": percentile(latencies, 50), "typing_p95": percentile(latencies, 95)}
+
+
+def materialize_timing(sample: int = MATERIALIZE_SAMPLE) -> float:
+    """Mean time to bind an event picked at random, as a click in the event list does"""
+    from pycestorieseditor.ceevents import _materialize, get_ebucket, materialize
+
+    names = list(get_ebucket())
+    picked = random.Random(0).sample(names, min(sample, len(names)))
+    _materialize.cache_clear()
+    start = time.perf_counter()
+    for name in picked:
+        materialize(name)
+    return (time.perf_counter() - start) / max(1, len(picked))
+
+
+def run_one(args) -> dict:
+    """Generate a module of args.one events, load it and measure"""
+    from corpus import write_module
+    from pycestorieseditor.config import SettingsFile
+    from pycestorieseditor.loader import load_collection, summary
+
+    events_per_file = min(args.events_per_file, args.one)
+    files = max(1, args.one // events_per_file)
+    with tempfile.TemporaryDirectory() as tmp:
+        module = Path(tmp, "SyntheticModule")
+        start = time.perf_counter()
+        xmlfiles = write_module(
+            module, "SyntheticModule", files, events_per_file, args.options, args.fanout,
+            args.missing_rate, args.images, args.seed,
+        )
+        generation = time.perf_counter() - start
+        settings = Path(tmp, "settings.conf")
+        # Forward slashes, backslashes would need the escaping of wx.FileConfig.
+        settings.write_text(
+            "[general]\n"
+            f"CE_XSDFILE={Path(args.xsd).as_posix()}\n"
+            f"CeModulePath0={module.as_posix()}\n"
+            "CeModulePathAmount=1\n"
+            f"ValidationMode={args.validation}\n"
+            f"IngestBackend={args.backend}\n",
+            encoding="utf-8",
+        )
+        loaded = load_collection(SettingsFile(settings), use_cache=False)
+        data = summary(loaded)
+        timings = dict(loaded.timings)
+        timings.update(search_timings())
+        timings.update(list_timings())
+        timings.update(typing_latency())
+        timings["materialize_mean"] = materialize_timing()
+        megabytes = sum(os.path.getsize(f) for f in xmlfiles) / 2**20
+
+    load = sum(loaded.timings.values())
+    return {
+        "events": data["events"],
+        "files": data["files"],
+        "megabytes": megabytes,
+        "options": args.options,
+        "fanout": args.fanout,
+        "missing_rate": args.missing_rate,
+        "validation": data["validation"],
+        "backend": data["backend"],
+        "bad_files": len(data["bad_files"]),
+        "missing_children": data["missing_children"],
+        "generation": generation,
+        "timings": timings,
+        "throughput": {
+            "events_per_s": data["events"] / load,
+            "mb_per_s": megabytes / load,
+            "parse_events_per_s": data["events"] / loaded.timings["parse"],
+        },
+        "peak_rss_mb": peak_rss(),
+    }
+
+
+def compare(previous: dict, current: dict):
+    """Print the timings of current next to the ones of previous, for the sizes both ran"""
+    before = {run["events"]: run for run in previous["runs"]}
+    for run in current["runs"]:
+        old = before.get(run["events"])
+        if not old:
+            continue
+        print(f"\n{run['events']} events, new / old:")
+        for stage, elapsed in run["timings"].items():
+            if old["timings"].get(stage):
+                print(f"  {stage:<18} {elapsed / old['timings'][stage]:>6.2f}x")
+        rss, old_rss = run["peak_rss_mb"]["self"], old["peak_rss_mb"]["self"]
+        if rss and old_rss:
+            print(f"  {'peak rss':<18} {rss / old_rss:>6.2f}x")
+
+
+def report(run: dict):
+    print(
+        f"{run['events']:>7} events {run['files']:>4} files {run['megabytes']:>7.1f}MB  "
+        f"{run['throughput']['events_per_s']:>8.0f} events/s  "
+        f"rss {format_mb(run['peak_rss_mb']['self']):>8} "
+        f"(workers {format_mb(run['peak_rss_mb']['children'])})"
+    )
+    for stage, elapsed in run["timings"].items():
+        print(f"    {stage:<18} {elapsed * 1000:>10.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--xsd", required=True, help="Path to CEEventsModal.xsd")
+    parser.add_argument(
+        "--sizes", type=lambda v: [int(s) for s in v.split(",")], default=list(SIZES),
+        help="Comma separated amounts of events, one run each",
+    )
+    parser.add_argument("--events-per-file", type=int, default=200)
+    parser.add_argument("--options", type=int, default=3, help="Options per event")
+    parser.add_argument("--fanout", type=int, default=2, help="Events triggered per option")
+    parser.add_argument(
+        "--missing-rate", type=float, default=0.01,
+        help="Share of triggered events that do not exist",
+    )
+    parser.add_argument("--images", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--validation", default="eager")
+    parser.add_argument("--backend", default="auto")
+    parser.add_argument("-o", "--output", help="Where to write the results")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    parser.add_argument("--one", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.one:
+        print(json.dumps(run_one(args)))
+        return
+
+    runs = []
+    for size in args.sizes:
+        child = [
+            "--xsd", args.xsd, "--events-per-file", args.events_per_file,
+            "--options", args.options, "--fanout", args.fanout,
+            "--missing-rate", args.missing_rate, "--images", args.images, "--seed", args.seed,
+            "--validation", args.validation, "--backend", args.backend, "--one", size,
+        ]
+        proc = subprocess.run(
+            [sys.executable, __file__, *map(str, child)],
+            capture_output=True, text=True, check=True,
+        )
+        run = json.loads(proc.stdout.strip().splitlines()[-1])
+        report(run)
+        runs.append(run)
+
+    results = {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "runs": runs,
+    }
+    output = args.output or "bench_ingest-%s.json" % time.strftime("%Y%m%d-%H%M%S")
+    Path(output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(json.loads(Path(args.compare).read_text(encoding="utf-8")), results)
+
+
+if __name__ == '__main__':
+    main()
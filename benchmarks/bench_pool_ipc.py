@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Compare shipping the compiled schema with every task against worker initialised schemas.
+
+Usage:
+    poetry run python benchmarks/bench_pool_ipc.py --xsd path/to/CEEventsModal.xsd
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+
+from corpus import write_corpus
+from pycestorieseditor.ceevents import (
+    get_parser,
+    init_worker,
+    init_xsdfile,
+    process_file,
+)
+
+
+def cpackage(size):
+    """Chunk size of the baseline process_module"""
+    return int(size / os.cpu_count()) + 1
+
+
+def _process_task(xmlfile):
+    return xmlfile, process_file(xmlfile)
+
+
+def legacy_task(task):
+    xmlfile, xsd, parser = task
+    return xmlfile, process_file(xmlfile, xsd)
+
+
+def chunked(tasks, size):
+    return [tasks[i:i + size] for i in range(0, len(tasks), size)]
+
+
+def task_bytes(tasks, chunks) -> int:
+    """Bytes pickled to send the tasks to the pool, the pool pickles one chunk at a time."""
+    return sum(len(pickle.dumps(chunk)) for chunk in chunked(tasks, chunks))
+
+
+def run_legacy(xmlfiles, xsd, parser, chunks):
+    with multiprocessing.Pool() as pool:
+        tasks = [(xmlfile, xsd, parser) for xmlfile in xmlfiles]
+        for _ in pool.imap_unordered(legacy_task, tasks, chunksize=chunks):
+            pass
+
+
+def run_initialized(xmlfiles, xsdpath, chunks):
+    with multiprocessing.Pool(initializer=init_worker, initargs=(xsdpath,)) as pool:
+        for _ in pool.imap_unordered(_process_task, xmlfiles, chunksize=chunks):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--xsd", required=True, help="Path to CEEventsModal.xsd")
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--events", type=int, default=20, help="Events per file")
+    args = parser.parse_args()
+
+    xsd = init_xsdfile(args.xsd)
+    xmlparser = get_parser()
+    workers = multiprocessing.cpu_count()
+    with tempfile.TemporaryDirectory() as tmp:
+        xmlfiles = write_corpus(tmp, args.files, args.events, 2)
+        chunks = cpackage(len(xmlfiles))
+        before = task_bytes([(f, xsd, xmlparser) for f in xmlfiles], chunks)
+        after = task_bytes(xmlfiles, chunks) + workers * len(pickle.dumps((args.xsd,)))
+        print(f"IPC task bytes: {before:>12} -> {after:>8} ({chunks} files per chunk)")
+
+        start = time.perf_counter()
+        run_legacy(xmlfiles, xsd, xmlparser, chunks)
+        legacy = time.perf_counter() - start
+        start = time.perf_counter()
+        run_initialized(xmlfiles, args.xsd, chunks)
+        initialized = time.perf_counter() - start
+        print(f"wall time:      {legacy:>11.2f}s -> {initialized:>7.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Compare the legacy schema -> string -> xsdata round trip with the single pass ingest.
+
+The legacy path leaves the skill extraction out, filter_ceevent is gone.
+
+Usage:
+    poetry run python benchmarks/bench_process_file.py --xsd path/to/CEEventsModal.xsd
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import xmlschema
+from xsdata_attrs.bindings import XmlParser
+
+from corpus import write_corpus
+from pycestorieseditor.ceevents import process_file
+from pycestorieseditor.ceevents_template import Ceevent
+
+
+def legacy_process_file(xmlfile, xsd, parser):
+    """The ingest path as it was before the single pass rewrite."""
+    bucket = []
+    for event in xsd.to_objects(xmlfile):
+        string = event.tostring()
+        ceevent = parser.from_string(string, Ceevent)
+        ceevent.xmlsource = string
+        ceevent.xmlfile = xmlfile
+        bucket.append(ceevent)
+    return bucket, False
+
+
+def run(label, func, xmlfiles, xsd, parser):
+    start = time.perf_counter()
+    events = sum(len(func(xmlfile, xsd, parser)[0]) for xmlfile in xmlfiles)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {events:>8} events {elapsed:>8.2f}s {events / elapsed:>10.0f} events/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--xsd", required=True, help="Path to CEEventsModal.xsd")
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--events", type=int, default=10000, help="Total amount of events")
+    parser.add_argument("--options", type=int, default=3, help="Options per event")
+    args = parser.parse_args()
+
+    xsd = xmlschema.XMLSchema(args.xsd)
+    with tempfile.TemporaryDirectory() as tmp:
+        xmlfiles = write_corpus(tmp, args.files, max(1, args.events // args.files), args.options)
+        before = run("round trip", legacy_process_file, xmlfiles, xsd, XmlParser())
+        after = run("single pass", lambda f, xsd, _: process_file(f, xsd), xmlfiles, xsd, None)
+    print(f"speedup: x{before / after:.2f}")
+
+
+if __name__ == '__main__':
+    main()
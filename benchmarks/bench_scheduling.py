@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Compare one big chunk per worker with the size aware scheduler on a skewed collection.
+
+A few very large story files sit among many small ones, which is what the real modules look
+like. The legacy chunking hands each worker len(files) / cpu_count files in a row.
+
+Usage:
+    poetry run python benchmarks/bench_scheduling.py --xsd path/to/CEEventsModal.xsd
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import write_corpus
+from pycestorieseditor.ceevents import (
+    _process_batch,
+    init_worker,
+    process_file,
+    schedule,
+)
+from pycestorieseditor.tracing import CAT_WORKER, Tracer, make_span
+
+
+def legacy_task(xmlfile):
+    start = time.perf_counter_ns()
+    result = process_file(xmlfile)
+    return [make_span("process_file", CAT_WORKER, start)], result
+
+
+def report(label, tracer: Tracer, elapsed: float):
+    busy = [w.busy for w in tracer.workers()]
+    mean = sum(busy) / len(busy)
+    print(
+        f"{label:<10} wall {elapsed:>6.2f}s  work {sum(busy):>6.2f}s  "
+        f"ideal {sum(busy) / os.cpu_count():>6.2f}s  slowest/mean x{max(busy) / mean:.2f}"
+    )
+
+
+def run_legacy(xmlfiles, xsdpath):
+    tracer = Tracer()
+    start = time.perf_counter()
+    with multiprocessing.Pool(initializer=init_worker, initargs=(xsdpath,)) as pool:
+        chunks = len(xmlfiles) // os.cpu_count() + 1
+        for spans, _ in pool.imap_unordered(legacy_task, xmlfiles, chunksize=chunks):
+            tracer.extend(spans)
+    report("legacy", tracer, time.perf_counter() - start)
+
+
+def run_scheduled(xmlfiles, xsdpath):
+    tracer = Tracer()
+    start = time.perf_counter()
+    with multiprocessing.Pool(initializer=init_worker, initargs=(xsdpath,)) as pool:
+        batches = schedule(xmlfiles, os.cpu_count())
+        for spans, _ in pool.imap_unordered(_process_batch, batches):
+            tracer.extend(spans)
+    report("scheduled", tracer, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--xsd", required=True, help="Path to CEEventsModal.xsd")
+    parser.add_argument("--small", type=int, default=200, help="Amount of small files")
+    parser.add_argument("--large", type=int, default=2, help="Amount of large files")
+    parser.add_argument("--large-events", type=int, default=2000, help="Events per large file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xmlfiles = write_corpus(Path(tmp, "large"), args.large, args.large_events, seed=1)
+        xmlfiles += write_corpus(Path(tmp, "small"), args.small, 10, seed=2)
+        run_legacy(xmlfiles, args.xsd)
+        run_scheduled(xmlfiles, args.xsd)
+
+
+if __name__ == '__main__':
+    main()
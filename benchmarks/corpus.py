@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Synthetic Captivity Events corpus used by the benchmarks.
+
+Elements are written in the order declared by the ceevents_modal classes, which is the order
+the schema expects them in. write_module produces a whole module (SubModule.xml, Events and
+Images) that CePath accepts, write_corpus only the event files.
+"""
+from __future__ import annotations
+
+import random
+import struct
+import zlib
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+FLAGS = ("Captive", "Random", "Captor", "CanOnlyBeTriggeredByOtherEvent", "WaitingMenu")
+CONSEQUENCES = ("ChangeGold", "ChangeHealth", "Escape", "Leave", "Continue", "StripPlayer")
+SKILLS = ("Roguery", "Charm", "Athletics", "Medicine", "Steward")
+WORDS = (
+    "captor", "prisoner", "camp", "night", "guard", "escape", "chains", "road", "village",
+    "lord", "caravan", "coin", "whisper", "fire", "river", "market", "blade", "horse",
+)
+SYLLABLES = ("ka", "ri", "on", "ta", "mel", "dor", "as", "vin", "ul", "sen", "bra", "te", "or")
+
+
+def _vocabulary(size: int = 5000) -> tuple[tuple[str, ...], list[float]]:
+    """WORDS followed by made up words, with the Zipf like frequencies of a real text"""
+    rnd = random.Random(1234)
+    words = dict.fromkeys(WORDS)
+    while len(words) < size:
+        words["".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))] = None
+    weights, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1 / (rank + 1)
+        weights.append(total)
+    return tuple(words), weights
+
+
+VOCABULARY, _CUM_WEIGHTS = _vocabulary()
+
+
+def event_name(fileno: int, eventno: int) -> str:
+    return f"synthetic_f{fileno:04d}_e{eventno:04d}"
+
+
+def missing_name(rnd: random.Random) -> str:
+    return f"synthetic_missing_{rnd.randrange(10**6):06d}"
+
+
+def image_name(imageno: int) -> str:
+    return f"synthetic_bg_{imageno:04d}"
+
+
+def sentence(rnd: random.Random, size: int = 24) -> str:
+    words = rnd.choices(VOCABULARY, cum_weights=_CUM_WEIGHTS, k=size)
+    return " ".join(words).capitalize() + "."
+
+
+def pick_targets(rnd: random.Random, targets: list[str], fanout: int,
+                 missing_rate: float) -> list[str]:
+    """fanout outbound events, each one missing from the corpus with a chance of missing_rate"""
+    return [
+        missing_name(rnd) if rnd.random() < missing_rate else rnd.choice(targets)
+        for _ in range(fanout)
+    ]
+
+
+def build_event(rnd: random.Random, name: str, options: int, targets: list[str],
+                fanout: int = 1, missing_rate: float = 0.0, backgrounds: list[str] = ()) -> str:
+    lines = [
+        "  <CEEvent>",
+        f"    <Name>{escape(name)}</Name>",
+        f"    <Text>{escape(sentence(rnd))}</Text>",
+    ]
+    if backgrounds:
+        lines.append(f"    <BackgroundName>{rnd.choice(backgrounds)}</BackgroundName>")
+    lines.append("    <MultipleRestrictedListOfFlags>")
+    for flag in rnd.sample(FLAGS, 2):
+        lines.append(f"      <RestrictedListOfFlags>{flag}</RestrictedListOfFlags>")
+    lines.append("    </MultipleRestrictedListOfFlags>")
+    if options:
+        lines.append("    <Options>")
+        for order in range(options):
+            outbound = pick_targets(rnd, targets, fanout, missing_rate) if targets else []
+            lines.append("      <Option>")
+            lines.append(f"        <Order>{order}</Order>")
+            lines.append("        <MultipleRestrictedListOfConsequences>")
+            consequence = rnd.choice(CONSEQUENCES)
+            lines.append(
+                f"          <RestrictedListOfConsequences>{consequence}"
+                "</RestrictedListOfConsequences>"
+            )
+            lines.append("        </MultipleRestrictedListOfConsequences>")
+            lines.append(f"        <OptionText>{escape(sentence(rnd, 8))}</OptionText>")
+            if len(outbound) == 1:
+                lines.append(f"        <TriggerEventName>{outbound[0]}</TriggerEventName>")
+            lines.append(f"        <ReqGoldAbove>{rnd.randint(0, 500)}</ReqGoldAbove>")
+            if len(outbound) > 1:
+                lines.append("        <TriggerEvents>")
+                for target in outbound:
+                    lines.append("          <TriggerEvent>")
+                    lines.append(f"            <EventName>{target}</EventName>")
+                    lines.append(f"            <EventWeight>{rnd.randint(1, 10)}</EventWeight>")
+                    lines.append("          </TriggerEvent>")
+                lines.append("        </TriggerEvents>")
+            lines.append("        <SkillsRequired>")
+            lines.append(f'          <SkillRequired Id="{rnd.choice(SKILLS)}" Min="10"/>')
+            lines.append("        </SkillsRequired>")
+            lines.append("      </Option>")
+        lines.append("    </Options>")
+    lines.append("  </CEEvent>")
+    return "\n".join(lines)
+
+
+def png(width: int, height: int, rgb: tuple[int, int, int]) -> bytes:
+    """Plain coloured PNG image, written by hand to keep the generator free of PIL"""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data)) + kind + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    row = b"\x00" + bytes(rgb) * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+def write_corpus(target, files: int = 50, events_per_file: int = 200, options: int = 3,
+                 seed: int = 0, fanout: int = 1, missing_rate: float = 0.0,
+                 backgrounds: list[str] = ()) -> list[str]:
+    """Write a synthetic module under target and return the list of generated xml files.
+
+    Every option triggers fanout events of the same file, missing_rate of them do not exist.
+    """
+    rnd = random.Random(seed)
+    events = Path(target, "Events")
+    events.mkdir(parents=True, exist_ok=True)
+    xmlfiles = []
+    for fileno in range(files):
+        names = [event_name(fileno, n) for n in range(events_per_file)]
+        body = "\n".join(
+            build_event(rnd, name, options, names, fanout, missing_rate, backgrounds)
+            for name in names
+        )
+        path = Path(events, f"synthetic_{fileno:04d}.xml")
+        path.write_text(
+            f'<?xml version="1.0" encoding="utf-8"?>\n<CEEvents>\n{body}\n</CEEvents>\n',
+            encoding="utf-8",
+        )
+        xmlfiles.append(str(path))
+    return xmlfiles
+
+
+def write_images(target, images: int = 16, seed: int = 0) -> list[str]:
+    """Write plain background images under target/Images and return their names."""
+    rnd = random.Random(seed)
+    folder = Path(target, "Images")
+    folder.mkdir(parents=True, exist_ok=True)
+    names = []
+    for imageno in range(images):
+        name = image_name(imageno)
+        rgb = (rnd.randrange(256), rnd.randrange(256), rnd.randrange(256))
+        Path(folder, f"{name}.png").write_bytes(png(64, 36, rgb))
+        names.append(name)
+    return names
+
+
+def write_submodule(target, name: str) -> Path:
+    """SubModule.xml declaring a dependency on Captivity Events"""
+    path = Path(target, "SubModule.xml")
+    path.write_text(
+        f'''<?xml version="1.0" encoding="utf-8"?>
+<Module>
+  <Name value="{escape(name)}"/>
+  <Id value="{escape(name)}"/>
+  <Version value="v1.0.0"/>
+  <DefaultModule value="false"/>
+  <SingleplayerModule value="true"/>
+  <MultiplayerModule value="false"/>
+  <DependedModules>
+    <DependedModule Id="Native"/>
+    <DependedModule Id="zCaptivityEvents"/>
+  </DependedModules>
+  <SubModules/>
+</Module>
+''',
+        encoding="utf-8",
+    )
+    return path
+
+
+def write_module(target, name: str = "SyntheticModule", files: int = 50,
+                 events_per_file: int = 200, options: int = 3, fanout: int = 1,
+                 missing_rate: float = 0.0, images: int = 16, seed: int = 0) -> list[str]:
+    """Write a complete CE module under target and return the list of generated xml files."""
+    Path(target).mkdir(parents=True, exist_ok=True)
+    write_submodule(target, name)
+    backgrounds = write_images(target, images, seed)
+    return write_corpus(
+        target, files, events_per_file, options, seed, fanout, missing_rate, backgrounds
+    )
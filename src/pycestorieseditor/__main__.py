@@ -3,24 +3,174 @@
 # © 2025-current bicobus <bicobus@keemail.me>
 
 import argparse
+import json
 import multiprocessing
 import sys
+import time
+from importlib import metadata
 
-from wx import version
+from pycestorieseditor.ancestrygraph import DIRECTIONS, MAX_DEPTH
+from pycestorieseditor.backends import BACKENDS
+from pycestorieseditor.ceevents import VALIDATION_MODES
+from pycestorieseditor.config import get_config
+from pycestorieseditor.logs import apply_settings, configure_logging
 
-from pycestorieseditor.wxlaunch import launch
+
+def wx_version():
+    try:
+        return metadata.version("wxPython")
+    except metadata.PackageNotFoundError:
+        return "(not installed)"
+
+
+def format_scan(data: dict) -> str:
+    lines = [
+        "Modules:          %s" % ", ".join(m["name"] or m["path"] for m in data["modules"]),
+        "Files:            %s" % data["files"],
+        "Events:           %s" % data["events"],
+        "Images:           %s" % data["images"],
+        "Skills indexed:   %s" % data["skills"],
+        "Validation:       %s" % data["validation"],
+        "Backend:          %s" % data["backend"],
+    ]
+    if data["cache"]:
+        lines.append("Cache:            %(hits)s hits, %(misses)s misses" % data["cache"])
+    lines.append("Bad xml files:    %s" % len(data["bad_files"]))
+    lines.append("Missing children: %s" % data["missing_children"])
+    lines.append("Timings:")
+    for stage, elapsed in data["timings"].items():
+        lines.append("  %-15s %8.3fs" % (stage, elapsed))
+    lines.append("  %-15s %8.3fs" % ("total", sum(data["timings"].values())))
+    if data["workers"]:
+        lines.append("Workers:")
+    for worker in data["workers"]:
+        lines.append(
+            "  pid %(pid)-11s busy %(busy)7.3fs  idle %(idle)7.3fs  %(tasks)5s files" % worker
+        )
+    for bad in data["bad_files"]:
+        lines.append("Invalid xml file: %(file)s: %(error)s" % bad)
+    if "graph" in data:
+        from pycestorieseditor.analytics import graph_report, report_lines
+
+        lines.append("Story graph:")
+        lines.extend("  " + line for line in report_lines(graph_report(**data["graph"])))
+    return "\n".join(lines)
+
+
+def load(args, trace=None):
+    """Load the modules of the settings given by args, None when they cannot be read"""
+    from pycestorieseditor.config import SettingsFile
+    from pycestorieseditor.loader import load_collection
+    from pycestorieseditor.tracing import init_tracer
+
+    tracer = init_tracer()
+    try:
+        with tracer.span("config"):
+            conf = SettingsFile(args.config or get_config("settings"))
+    except OSError as e:
+        print("Cannot read settings: %s" % e, file=sys.stderr)
+        return None
+    apply_settings(conf)
+    return load_collection(
+        conf,
+        validation=args.validation,
+        backend=args.backend,
+        use_cache=not args.no_cache,
+        trace=trace,
+    )
+
+
+def scan(args) -> int:
+    from pycestorieseditor.loader import summary
+
+    if (loaded := load(args, args.trace)) is None:
+        return 2
+    data = summary(loaded)
+    if args.graph:
+        from pycestorieseditor.analytics import get_report
+
+        data["graph"] = get_report()._asdict()
+    if args.format == "json":
+        print(json.dumps(data, indent=2))
+    else:
+        print(format_scan(data))
+    if args.strict and (data["bad_files"] or data["missing_children"]):
+        return 1
+    return 0
+
+
+def layouts(args) -> int:
+    from pycestorieseditor.layout import get_layout_cache, precompute
+
+    if load(args) is None:
+        return 2
+    start = time.perf_counter()
+    try:
+        done = precompute(args.depth, args.direction, args.layout_backend)
+    except OSError as e:
+        print("Cannot write the layouts: %s" % e, file=sys.stderr)
+        return 2
+    print(
+        "Laid out %(computed)s graphs for %(events)s events, %(cached)s already cached" % done
+        + " in %.3fs." % (time.perf_counter() - start)
+    )
+    print("Layout cache: %s" % get_layout_cache().path)
+    return 0
 
 
 def main():
     parser = argparse.ArgumentParser(
         prog="pycestorieseditor",
-        epilog="Running wxPython %s" % version()
+        epilog="Running wxPython %s" % wx_version()
     )
     parser.add_argument(
         "-s", "--settings", action="store_true", required=False,
         help="Launch the settings window. Implies -g."
     )
+    subparsers = parser.add_subparsers(dest="command")
+    scanparser = subparsers.add_parser(
+        "scan", help="Load the modules listed in settings.conf without a GUI and report."
+    )
+    layoutparser = subparsers.add_parser(
+        "layouts",
+        help="Load the modules and lay out the ancestry graph of every event ahead of time."
+    )
+    for subparser in (scanparser, layoutparser):
+        subparser.add_argument("-c", "--config", help="Path to settings.conf")
+        subparser.add_argument("--validation", choices=VALIDATION_MODES)
+        subparser.add_argument("--backend", choices=BACKENDS)
+        subparser.add_argument("--no-cache", action="store_true", help="Ignore the parse cache")
+    scanparser.add_argument("-f", "--format", choices=("text", "json"), default="text")
+    scanparser.add_argument(
+        "--trace", metavar="PATH", help="Write the timings as a chrome://tracing json file"
+    )
+    scanparser.add_argument(
+        "--graph", action="store_true",
+        help="Also report unreachable, orphan and dead end events, and loops of the story graph"
+    )
+    scanparser.add_argument(
+        "--strict", action="store_true",
+        help="Exit with status 1 when a file is invalid or a child event is missing."
+    )
+    layoutparser.add_argument(
+        "--depth", type=int, choices=range(1, MAX_DEPTH + 1), default=1,
+        metavar="1-%s" % MAX_DEPTH,
+        help="Hops away from each event, as set in the Ancestry Graph tab",
+    )
+    layoutparser.add_argument("--direction", choices=DIRECTIONS, default=DIRECTIONS[0])
+    layoutparser.add_argument(
+        "--layout-backend", choices=BACKENDS, default="auto",
+        help="Workers laying the graphs out, processes on a multi-core machine for auto"
+    )
     args = parser.parse_args()
+    configure_logging()
+    if args.command == "scan":
+        sys.exit(scan(args))
+    if args.command == "layouts":
+        sys.exit(layouts(args))
+
+    from pycestorieseditor.wxlaunch import launch
+
     launch(args.settings)
 
 
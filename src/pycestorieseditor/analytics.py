@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Structural questions about the ancestry of the whole collection.
+
+Every pass walks the EventGraph once, in O(events + edges):
+
+- entry events are the ones the game may fire on its own, without the
+  CanOnlyBeTriggeredByOtherEvent flag. A breadth first search starting from all of them
+  finds the events reachable at all, the others can never show up in a game.
+- orphans are events flagged CanOnlyBeTriggeredByOtherEvent that no event triggers.
+- dead ends are events whose options trigger events, none of which could be found.
+- loops are the strongly connected components holding a cycle (Tarjan). A closed loop has no
+  exit: no edge leaves it and every option of its events triggers an event, an event without
+  options ending the story as well. Once in, the story never gets out.
+
+The report is kept until the buckets change, see ceevents.get_generation.
+"""
+from __future__ import annotations
+
+import time
+from array import array
+from collections import namedtuple
+
+from pycestorieseditor.ceevents import (
+    EventGraph,
+    EventSummary,
+    ancestry_instance,
+    get_ebucket,
+    get_generation,
+    index_lock,
+)
+from pycestorieseditor.ceevents_template import RestrictedListOfFlagsType
+
+ONLY_TRIGGERED = RestrictedListOfFlagsType.CAN_ONLY_BE_TRIGGERED_BY_OTHER_EVENT.value
+
+# entries and reachable are amounts of events, unreachable, orphans and dead_ends sorted event
+# names. loops holds the events of each loop, largest first, closed_loops the position in loops
+# of the ones without an exit.
+graph_report = namedtuple(
+    "graph_report",
+    [
+        "generation",
+        "events",
+        "edges",
+        "entries",
+        "reachable",
+        "unreachable",
+        "orphans",
+        "dead_ends",
+        "loops",
+        "closed_loops",
+        "elapsed",
+    ],
+)
+
+_report: graph_report | None = None
+
+
+def strongly_connected(graph: EventGraph) -> list[list[int]]:
+    """Components of graph, in reverse topological order.
+
+    Tarjan's algorithm, the recursion replaced by a stack of (event, next edge) so that long
+    chains of events do not hit the recursion limit.
+    """
+    offsets, targets = graph.offsets, graph.targets
+    count = len(graph)
+    index = array("i", [-1]) * count
+    low = array("i", [0]) * count
+    on_stack = bytearray(count)
+    stack: list[int] = []
+    components: list[list[int]] = []
+    counter = 0
+    for root in range(count):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, offsets[root])]
+        while work:
+            node, edge = work[-1]
+            end = offsets[node + 1]
+            while edge < end:
+                target = targets[edge]
+                edge += 1
+                if index[target] < 0:
+                    work[-1] = (node, edge)
+                    index[target] = low[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = 1
+                    work.append((target, offsets[target]))
+                    break
+                if on_stack[target] and index[target] < low[node]:
+                    low[node] = index[target]
+            else:
+                # Every edge of node done.
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def reachable_from(graph: EventGraph, sources) -> bytearray:
+    """1 for the events reachable from one of sources, them included"""
+    offsets, targets = graph.offsets, graph.targets
+    seen = bytearray(len(graph))
+    queue = array("i")
+    for source in sources:
+        if not seen[source]:
+            seen[source] = 1
+            queue.append(source)
+    position = 0
+    while position < len(queue):
+        node = queue[position]
+        position += 1
+        for target in targets[offsets[node]:offsets[node + 1]]:
+            if not seen[target]:
+                seen[target] = 1
+                queue.append(target)
+    return seen
+
+
+def ends_story(summary: EventSummary) -> bool:
+    """Whether the story may stop at the event: it has no option, or one triggering nothing"""
+    return not summary.options or len(set(summary.triggers[0::3])) < summary.options
+
+
+def analyze(graph: EventGraph | None = None, ebucket=None) -> graph_report:
+    """Entries, reachability, orphans, dead ends and loops of graph"""
+    start = time.perf_counter()
+    with index_lock:
+        generation = get_generation()
+        graph = ancestry_instance.graph() if graph is None else graph
+        ebucket = get_ebucket() if ebucket is None else ebucket
+        summaries = [ebucket[name] for name in graph.names]
+    names = graph.names
+    offsets = graph.offsets
+
+    only_triggered = [ONLY_TRIGGERED in summary.flags for summary in summaries]
+    entries = [eid for eid, flagged in enumerate(only_triggered) if not flagged]
+    seen = reachable_from(graph, entries)
+    unreachable = sorted(names[eid] for eid in range(len(names)) if not seen[eid])
+    orphans = sorted(
+        names[eid]
+        for eid, flagged in enumerate(only_triggered)
+        if flagged and graph.roffsets[eid] == graph.roffsets[eid + 1]
+    )
+    dead_ends = sorted(
+        names[eid]
+        for eid, summary in enumerate(summaries)
+        if summary.outboundevents and offsets[eid] == offsets[eid + 1]
+    )
+
+    component_of = array("i", [0]) * len(names)
+    cycles = []
+    for component in strongly_connected(graph):
+        if len(component) > 1 or component[0] in graph.child_ids(component[0]):
+            for eid in component:
+                component_of[eid] = len(cycles) + 1
+            cycles.append(component)
+    cycles.sort(key=len, reverse=True)
+    ends = [ends_story(summary) for summary in summaries]
+    loops, closed = [], []
+    for component in cycles:
+        label = component_of[component[0]]
+        if not any(
+            ends[eid] or any(component_of[t] != label for t in graph.child_ids(eid))
+            for eid in component
+        ):
+            closed.append(len(loops))
+        loops.append(sorted(names[eid] for eid in component))
+
+    return graph_report(
+        generation,
+        len(names),
+        len(graph.targets),
+        len(entries),
+        sum(seen),
+        unreachable,
+        orphans,
+        dead_ends,
+        loops,
+        closed,
+        time.perf_counter() - start,
+    )
+
+
+def get_report() -> graph_report:
+    """Report of the collection as loaded, computed again once it changed"""
+    global _report
+    if _report is None or _report.generation != get_generation():
+        _report = analyze()
+    return _report
+
+
+def report_lines(report: graph_report) -> list[str]:
+    """Text summary of report, naming the orphans, dead ends and closed loops"""
+    lines = [
+        "Entry events:     %s" % report.entries,
+        "Reachable:        %s of %s events" % (report.reachable, report.events),
+        "Unreachable:      %s" % len(report.unreachable),
+        "Orphans:          %s" % len(report.orphans),
+        "Dead ends:        %s" % len(report.dead_ends),
+        "Loops:            %s, %s without exit" % (len(report.loops), len(report.closed_loops)),
+    ]
+    lines.extend("Orphan event: %s" % name for name in report.orphans)
+    lines.extend("Dead end: %s" % name for name in report.dead_ends)
+    for position in report.closed_loops:
+        lines.append("Loop without exit: %s" % ", ".join(report.loops[position]))
+    return lines
@@ -1,18 +1,38 @@
 # -*- coding: utf-8 -*-
 # Licensed under the EUPL v1.2
 # © 2025-current bicobus <bicobus@keemail.me>
-from itertools import chain
+"""Neighbourhood of an event in the ancestry, as drawn by the Ancestry Graph tab.
+
+The events up to depth hops away are found by a breadth first search over the arrays of the
+EventGraph, following the parents (UP), the children (DOWN) or both, then every edge between
+two of them is kept. At most MAX_NODES events are kept, the closest first.
+"""
+from __future__ import annotations
+
+from collections import namedtuple
 from textwrap import wrap
 
-from pycestorieseditor.ceevents import ancestry_instance
+from pycestorieseditor.ceevents import EventGraph, ancestry_instance
+
+UP = "up"
+DOWN = "down"
+BOTH = "both"
+DIRECTIONS = (BOTH, UP, DOWN)
+MAX_DEPTH = 6
+MAX_NODES = 150
+CACHE_SIZE = 64
 
+ROOT_COLOR = "tab:green"
+PARENT_COLOR = "tab:red"
+CHILD_COLOR = "tab:blue"
+CYCLE_COLOR = "tab:purple"  # both an ancestor and a descendant of the event
 
-def get_color(node, core):
-    if node in core.parents_names():
-        return "tab:red"
-    if node in core.children_names():
-        return "tab:blue"
-    return "tab:green"
+# edges are (source, target) positions in nodes, the names of the events, the event first.
+# colors and labels are keyed by position, truncated tells whether MAX_NODES was reached.
+subgraph = namedtuple("subgraph", ["edges", "nodes", "colors", "labels", "truncated"])
+
+_cache: dict[tuple[str, int, str], subgraph] = {}
+_cached_graph: EventGraph | None = None
 
 
 def nwrap(txt):
@@ -21,16 +41,81 @@ def nwrap(txt):
     return txt
 
 
-def build_graph(ceevent):
-    core_node = ancestry_instance.get(ceevent.name.value)
-    nodes = [core_node.name] + list(set(core_node.parents_names() + core_node.children_names()))
-    colors = {i: get_color(node, core_node) for i, node in enumerate(nodes)}
-    labels = {i: nwrap(lbl) for i, lbl in enumerate(nodes)}
-    edges = [
-        n
-        for n in chain(
-            [(nodes.index(core_node.name), nodes.index(x)) for x in core_node.children_names()],
-            [(nodes.index(x), nodes.index(core_node.name)) for x in core_node.parents_names()],
-        )
-    ]
-    return edges, nodes, colors, labels
+def _walk(root: int, depth: int, steps, limit: int) -> tuple[list[dict[int, int]], bool]:
+    """Breadth first search from root through each of steps, one hop at a time in every
+    direction so that the closest events come first whichever way they are reached.
+
+    Returns the events met through each step along with their distance, and False once limit
+    events were found.
+    """
+    found = [{root: 0} for _ in steps]
+    frontiers = [[root] for _ in steps]
+    seen = {root}
+    for distance in range(1, depth + 1):
+        for n, step in enumerate(steps):
+            following = []
+            for eid in frontiers[n]:
+                for other in step(eid):
+                    if other in found[n]:
+                        continue
+                    if other not in seen:
+                        if len(seen) >= limit:
+                            return found, False
+                        seen.add(other)
+                    found[n][other] = distance
+                    following.append(other)
+            frontiers[n] = following
+        if not any(frontiers):
+            break
+    return found, True
+
+
+def extract(
+    graph: EventGraph, name: str, depth: int = 1, direction: str = BOTH, limit: int = MAX_NODES
+) -> subgraph:
+    """Events up to depth hops away from name in direction, and the edges between them"""
+    root = graph.ids[name]
+    steps = []
+    if direction in (UP, BOTH):
+        steps.append(graph.parent_ids)
+    if direction in (DOWN, BOTH):
+        steps.append(graph.child_ids)
+    found, complete = _walk(root, depth, steps, limit)
+    ancestors = found[0] if direction in (UP, BOTH) else {root: 0}
+    descendants = found[-1] if direction in (DOWN, BOTH) else {root: 0}
+
+    order = list(ancestors)
+    order.extend(eid for eid in descendants if eid not in ancestors)
+    position = {eid: n for n, eid in enumerate(order)}
+    nodes = [graph.names[eid] for eid in order]
+    colors = {}
+    for n, eid in enumerate(order):
+        if eid == root:
+            colors[n] = ROOT_COLOR
+        elif eid in ancestors and eid in descendants:
+            colors[n] = CYCLE_COLOR
+        else:
+            colors[n] = PARENT_COLOR if eid in ancestors else CHILD_COLOR
+    labels = {n: nwrap(label) for n, label in enumerate(nodes)}
+    edges = []
+    for eid in order:
+        source = position[eid]
+        for child in dict.fromkeys(graph.child_ids(eid)):
+            if (target := position.get(child)) is not None:
+                edges.append((source, target))
+    return subgraph(edges, nodes, colors, labels, not complete)
+
+
+def build_graph(name: str, depth: int = 1, direction: str = BOTH) -> subgraph:
+    """extract over the current graph of the ancestry, kept until the graph changes"""
+    global _cached_graph
+    graph = ancestry_instance.graph()
+    if graph is not _cached_graph:
+        _cache.clear()
+        _cached_graph = graph
+    key = (name, depth, direction)
+    if (result := _cache.get(key)) is None:
+        if len(_cache) >= CACHE_SIZE:
+            del _cache[next(iter(_cache))]
+        result = _cache[key] = extract(graph, name, depth, direction)
+    return result
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Execution backends of the ingest.
+
+Every backend exposes the part of the multiprocessing.Pool API the ingest relies on: a context
+manager with the imap_unordered, close and join methods, and an initializer run once per
+worker.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import multiprocessing.pool
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+BACKEND_PROCESS = "process"
+BACKEND_THREAD = "thread"
+BACKEND_SERIAL = "serial"
+BACKEND_AUTO = "auto"
+BACKENDS = (BACKEND_AUTO, BACKEND_PROCESS, BACKEND_THREAD, BACKEND_SERIAL)
+# Takes precedence over the IngestBackend key of settings.conf
+CE_INGEST_BACKEND = os.getenv("CE_INGEST_BACKEND")
+
+# Below either of these, starting the workers costs more than it saves.
+AUTO_MIN_FILES = 8
+AUTO_MIN_BYTES = 2 * 1024 * 1024
+
+
+class UnknownBackend(Exception):
+    ...
+
+
+class SerialPool:
+    """Run the tasks one after the other in the calling thread."""
+
+    def __init__(self, initializer=None, initargs=()):
+        if initializer:
+            initializer(*initargs)
+
+    def imap_unordered(self, func, iterable, chunksize=1):
+        return map(func, iterable)
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def gil_disabled() -> bool:
+    """True on a free-threaded build of CPython running without the GIL"""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def resolve_backend(name: str | None = None) -> str:
+    """Backend asked for by the environment, then by name, defaulting to auto"""
+    for candidate in (CE_INGEST_BACKEND, name):
+        if not candidate:
+            continue
+        candidate = candidate.strip().lower()
+        if candidate in BACKENDS:
+            return candidate
+        logger.warning("Unknown ingest backend '%s', ignoring it.", candidate)
+    return BACKEND_AUTO
+
+
+def choose_backend(files: int, total_bytes: int) -> str:
+    """Pick the backend auto stands for, given the amount of work to do"""
+    workers = os.cpu_count() or 1
+    if workers == 1 or files < AUTO_MIN_FILES or total_bytes < AUTO_MIN_BYTES:
+        return BACKEND_SERIAL
+    if gil_disabled():
+        return BACKEND_THREAD
+    return BACKEND_PROCESS
+
+
+def make_pool(backend: str, initializer=None, initargs=()):
+    """Build the pool of the given backend, see choose_backend to resolve auto"""
+    match backend:
+        case "process":
+            return multiprocessing.Pool(initializer=initializer, initargs=initargs)
+        case "thread":
+            return multiprocessing.pool.ThreadPool(initializer=initializer, initargs=initargs)
+        case "serial":
+            return SerialPool(initializer=initializer, initargs=initargs)
+    raise UnknownBackend(backend)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import logging
+import os
+import pickle
+import struct
+import zlib
+from pathlib import Path
+
+from pycestorieseditor.config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the shape of what process_file returns changes.
+CACHE_VERSION = 7
+CACHE_MAGIC = b"PCECACHE"
+CACHE_SUFFIX = ".pce"
+# magic, crc32 of the payload, length of the payload
+_header = struct.Struct("<8sIQ")
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+DEFAULT_LAYOUT_MAX_SIZE = 64 * 1024 * 1024
+
+
+class CorruptCacheEntry(Exception):
+    ...
+
+
+def file_digest(path) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+class DiskCache:
+    """Pickled results stored as files of a folder of the cache directory.
+
+    Subclasses derive the name of the entry of a source from key, None when the source has no
+    entry. Every entry carries a checksum, entries that fail to load are dropped. The least
+    recently used entries are evicted once the folder grows past max_size bytes.
+    """
+
+    def __init__(self, folder: str, path=None, max_size=DEFAULT_MAX_SIZE):
+        self._path = Path(path or get_config("cachepath"), folder)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, source) -> bool:
+        return bool(key := self.key(source)) and self._entry(key).exists()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def key(self, source) -> str | None:
+        raise NotImplementedError
+
+    def _entry(self, key: str) -> Path:
+        return Path(self._path, key + CACHE_SUFFIX)
+
+    def get(self, source):
+        """Return the cached result of source, None if missing, stale or corrupt."""
+        key = self.key(source)
+        if not key:
+            return None
+        entry = self._entry(key)
+        try:
+            with open(entry, "rb") as fh:
+                data = fh.read()
+            result = self._load(data)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, CorruptCacheEntry, pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError, IndexError, TypeError, ValueError) as e:
+            logger.warning("Dropping corrupt cache entry for %s: %s", source, e)
+            with contextlib.suppress(OSError):
+                entry.unlink()
+            self.misses += 1
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(entry)  # mtime doubles as the last access time for the LRU
+        self.hits += 1
+        return result
+
+    def put(self, source, result):
+        key = self.key(source)
+        if not key:
+            return
+        payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        entry = self._entry(key)
+        tmp = entry.with_suffix(".tmp%s" % os.getpid())
+        try:
+            with open(tmp, "wb") as fh:
+                fh.write(_header.pack(CACHE_MAGIC, zlib.crc32(payload), len(payload)))
+                fh.write(payload)
+            os.replace(tmp, entry)
+        except OSError as e:
+            logger.warning("Cannot write cache entry for %s: %s", source, e)
+            with contextlib.suppress(OSError):
+                tmp.unlink()
+
+    @staticmethod
+    def _load(data: bytes):
+        if len(data) < _header.size:
+            raise CorruptCacheEntry("truncated header")
+        magic, crc, length = _header.unpack_from(data)
+        payload = data[_header.size:]
+        if magic != CACHE_MAGIC or length != len(payload) or crc != zlib.crc32(payload):
+            raise CorruptCacheEntry("checksum mismatch")
+        return pickle.loads(payload)
+
+    def evict(self):
+        """Remove the least recently used entries until the cache fits under max_size."""
+        entries = []
+        total = 0
+        for entry in self._path.glob("*" + CACHE_SUFFIX):
+            with contextlib.suppress(OSError):
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, st.st_size, entry))
+                total += st.st_size
+        if total <= self._max_size:
+            return 0
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self._max_size * 0.9:
+                break
+            with contextlib.suppress(OSError):
+                entry.unlink()
+                total -= size
+                removed += 1
+        logger.info("Evicted %s entries from %s.", removed, self._path)
+        return removed
+
+    def clear(self):
+        for entry in self._path.glob("*" + CACHE_SUFFIX):
+            with contextlib.suppress(OSError):
+                entry.unlink()
+
+
+class ParseCache(DiskCache):
+    """On disk cache of process_file results.
+
+    Entries are keyed by the path, size and mtime of the xml file along with the hash of the
+    XSD file in use, so that editing either invalidates the entry.
+    """
+
+    def __init__(self, xsdpath, path=None, max_size=DEFAULT_MAX_SIZE, salt=""):
+        super().__init__("parse", path, max_size)
+        self._salt = "%s\0%s\0%s" % (CACHE_VERSION, file_digest(xsdpath), salt)
+
+    def key(self, xmlfile) -> str | None:
+        try:
+            st = os.stat(xmlfile)
+        except OSError:
+            return None
+        fingerprint = "%s\0%s\0%s\0%s" % (
+            os.path.abspath(xmlfile), st.st_size, st.st_mtime_ns, self._salt
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+class LayoutCache(DiskCache):
+    """On disk cache of the layouts of the Ancestry Graph tab, keyed by layout.layout_key"""
+
+    def __init__(self, path=None, max_size=DEFAULT_LAYOUT_MAX_SIZE):
+        super().__init__("layout", path, max_size)
+
+    def key(self, key: str) -> str:
+        return key
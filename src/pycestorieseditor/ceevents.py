@@ -7,23 +7,49 @@
 #   ElementTree.tostring(xsd['CEEvents'].encode(doctree))
 from __future__ import annotations
 
-import inspect
 import logging
-import logging.handlers
-import multiprocessing
+import mmap
 import os
-from collections import namedtuple
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import Counter, namedtuple
+from contextlib import suppress
+from xml.etree import ElementTree
 from xml.etree.ElementTree import ParseError as xmlParseError
 from functools import lru_cache
-from itertools import count, dropwhile
+from itertools import accumulate, chain, count
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from xsdata_attrs.bindings import XmlParser
+from xsdata.exceptions import ParserError
 import xmlschema
 
-from pycestorieseditor import logging_file_handler
-from pycestorieseditor.ceevents_template import Ceevent, SkillsRequired, SkillsToLevel
-from pycestorieseditor.pil2wx import default_background
+from pycestorieseditor.backends import (
+    BACKEND_AUTO,
+    BACKEND_PROCESS,
+    BACKEND_SERIAL,
+    choose_backend,
+    make_pool,
+)
+from pycestorieseditor.cache import ParseCache
+from pycestorieseditor.logs import init_worker_logging, worker_logging
+from pycestorieseditor.ceevents_template import Ceevent, RestrictedListOfFlagsType
+from pycestorieseditor.indexer import (
+    FLAGS,
+    SKILLS,
+    empty_indexes,
+    extract,
+    index_event,
+    unindex_event,
+)
+from pycestorieseditor.textindex import TextIndex, document, fold
+from pycestorieseditor.tracing import CAT_INGEST, CAT_WORKER, get_tracer, make_span
+
+if TYPE_CHECKING:
+    from xsdata_attrs.bindings import XmlParser
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +67,7 @@ def get_ebucket():
 
 def create_imgbucket():
     global imgbucket
-    imgbucket = {None: default_background()}
+    imgbucket = {}
     return imgbucket
 
 
@@ -51,8 +77,10 @@ def get_imgbucket():
 
 
 def init_index():
-    global indexes
-    indexes = {'skills': {}}
+    global indexes, shadowed
+    indexes = {'files': {}, 'text': TextIndex(), 'names': TextIndex(), **empty_indexes()}
+    shadowed = {}
+    _changed()
     return indexes
 
 
@@ -61,14 +89,31 @@ def get_indexes():
     return indexes
 
 
-ebucket: dict[str, Ceevent] | None = None  # pylint: disable=invalid-name
+def get_generation() -> int:
+    return generation
+
+
+def _changed():
+    global generation
+    generation += 1
+
+
+ebucket: dict[str, EventSummary] | None = None  # pylint: disable=invalid-name
 imgbucket: dict[str, os.PathLike] | None = None  # pylint: disable=invalid-name
 indexes: dict[str, dict] | None = None  # pylint: disable=invalid-name
+# Definitions overridden by the one in the bucket, by event name then file. One takes the place
+# of the bucket's when its file is unloaded.
+shadowed: dict[str, dict[str, EventSummary]] = {}  # pylint: disable=invalid-name
+# Held while the buckets, indexes and ancestry change once loaded, and while another thread
+# copies them. generation counts their changes.
+index_lock = threading.RLock()
+generation = 0  # pylint: disable=invalid-name
 
 
 def init_xsdfile(pathname):
-    global xsdfile
+    global xsdfile, xsdpath
     xsdfile = xmlschema.XMLSchema(pathname)
+    xsdpath = str(pathname)
     return xsdfile
 
 
@@ -77,7 +122,56 @@ def get_xsdfile():
     return xsdfile
 
 
+def get_xsdpath():
+    return xsdpath
+
+
+def get_parser() -> XmlParser:
+    """Parser binding xml to Ceevent, only needed once an event gets materialized"""
+    global xmlparser
+    if xmlparser is None:
+        from xsdata.formats.dataclass.parsers.handlers import XmlEventHandler
+        from xsdata_attrs.bindings import XmlParser
+
+        xmlparser = XmlParser(handler=XmlEventHandler)
+    return xmlparser
+
+
 xsdfile: xmlschema.XMLSchema | None = None
+xsdpath: str | None = None
+xmlparser: XmlParser | None = None  # pylint: disable=invalid-name
+
+
+VALIDATION_EAGER = "eager"
+VALIDATION_DEFERRED = "deferred"
+VALIDATION_OFF = "off"
+VALIDATION_MODES = (VALIDATION_EAGER, VALIDATION_DEFERRED, VALIDATION_OFF)
+
+
+def init_worker(pathname, validate=True, logqueue=None, loglevel=logging.INFO):
+    """Pool initializer: compile the schema once per worker instead of shipping it per task
+
+    Records of process workers go through logqueue, see pycestorieseditor.logs.
+    """
+    global worker_validates
+    worker_validates = validate
+    if logqueue is not None:
+        init_worker_logging(logqueue, loglevel)
+    # Thread and serial workers share the schema already compiled by the parent.
+    if validate and (xsdfile is None or xsdpath != str(pathname)):
+        init_xsdfile(pathname)
+
+
+worker_validates = True  # pylint: disable=invalid-name
+
+
+def init_validator(pathname, logqueue=None, loglevel=logging.INFO):
+    """Pool initializer of BackgroundValidation, as init_worker but leaving worker_validates
+    alone: thread and serial workers share it with the ingest."""
+    if logqueue is not None:
+        init_worker_logging(logqueue, loglevel)
+    if xsdfile is None or xsdpath != str(pathname):
+        init_xsdfile(pathname)
 
 
 class ElementNotFound(Exception):
@@ -98,87 +192,328 @@ class ChildNotFound(Exception):
         self.outboundevent = outboundevent
 
 
-@lru_cache
-def cpackage(size):
-    return int(size / os.cpu_count()) + 1
-
-
 event_ancestry_error = namedtuple("event_ancestry_error", ["source", "child", "filename"])
+# Event triggered by the option at position option of an event, weight and conditions are the
+# EventWeight and EventUseConditions of a TriggerEvent, None for a TriggerEventName.
+outbound_event = namedtuple("outbound_event", ["name", "option", "weight", "conditions"])
+ancestry_edge = namedtuple(
+    "ancestry_edge", ["source", "target", "option", "weight", "conditions"]
+)
 
 
 class EventAncestryErrors:
+    """Trigger events that couldn't be found, grouped by the file of their source as they are
+    registered"""
+
     def __init__(self):
-        self._errors = []
-        self._count = count()
-        self._len = next(self._count)
+        self._by_file: dict[str, list[event_ancestry_error]] = {}
+        self._len = 0
+        self._grouped: list[event_ancestry_error] | None = None  # files sorted, see grouped
+
+    def __iter__(self):
+        return chain.from_iterable(self._by_file.values())
+
+    def clear(self):
+        self._by_file.clear()
+        self._len = 0
+        self._grouped = None
 
     def register(self, error: event_ancestry_error):
-        self._errors.append(error)
-        self._len = next(self._count)
+        self._by_file.setdefault(error.filename, []).append(error)
+        self._len += 1
+        self._grouped = None
+
+    def discard(self, sources: set[str]):
+        """Forget the errors raised by the given source events"""
+        for filename, errors in list(self._by_file.items()):
+            kept = [err for err in errors if err.source not in sources]
+            if len(kept) == len(errors):
+                continue
+            self._len -= len(errors) - len(kept)
+            self._grouped = None
+            if kept:
+                self._by_file[filename] = kept
+            else:
+                del self._by_file[filename]
+
+    def sources_of(self, children: set[str]) -> set[str]:
+        """Name of the events that couldn't find one of the given children"""
+        return {err.source for err in self if err.child in children}
+
+    def grouped(self) -> list[event_ancestry_error]:
+        """Errors sorted by file, in the order they were found within a file. Kept until the
+        next change, do not modify."""
+        if self._grouped is None:
+            self._grouped = [err for f in sorted(self._by_file) for err in self._by_file[f]]
+        return self._grouped
 
     def groupby(self, mode=None) -> list[event_ancestry_error]:
         if mode == "filename":
-            return sorted(self._errors, key=lambda err: err.filename)
-        return sorted(self._errors, key=lambda err: err.source)
+            return self.grouped()
+        return sorted(self, key=lambda err: err.source)
 
     @property
     def len(self):
         return self._len
 
 
+class EventGraph:
+    """Edges of the ancestry frozen in compact arrays, the events being integer ids.
+
+    The edges going out of an id are targets[offsets[id]:offsets[id + 1]], along with their
+    options, weights and conditions at the same positions. The edges coming in are sources
+    [roffsets[id]:roffsets[id + 1]], redges holding their position in targets. Weights and
+    conditions are positions in strings, -1 for none.
+
+    Never modified once built, another thread can keep reading it while Ancestry builds the
+    next one.
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        offsets: array,
+        targets: array,
+        options: array,
+        weights: array,
+        conditions: array,
+        strings: list[str],
+    ):
+        self.names = names
+        self.ids: dict[str, int] = {name: n for n, name in enumerate(names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.options = options
+        self.weights = weights
+        self.conditions = conditions
+        self.strings = strings
+        # Edges sorted by target, the sort being stable sources stay in id order.
+        counts = Counter(targets)
+        self.roffsets = array("i", accumulate(map(counts.__getitem__, range(-1, len(names)))))
+        self.redges = array("i", sorted(range(len(targets)), key=targets.__getitem__))
+        owners = array("i")
+        for source in range(len(names)):
+            owners.extend(array("i", [source]) * (offsets[source + 1] - offsets[source]))
+        self.sources = array("i", map(owners.__getitem__, self.redges))
+
+    @classmethod
+    def empty(cls) -> EventGraph:
+        return cls([], array("i", [0]), array("i"), array("i"), array("i"), array("i"), [])
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str):
+        return name in self.ids
+
+    def child_ids(self, eid: int) -> array:
+        """Targets of the edges of eid, an event triggered by several options shows up for each"""
+        return self.targets[self.offsets[eid]:self.offsets[eid + 1]]
+
+    def parent_ids(self, eid: int) -> array:
+        return self.sources[self.roffsets[eid]:self.roffsets[eid + 1]]
+
+    def children(self, name: str) -> list[str]:
+        """Name of the events triggered by name, each once"""
+        if (eid := self.ids.get(name)) is None:
+            return []
+        names = self.names
+        return [names[child] for child in dict.fromkeys(self.child_ids(eid))]
+
+    def parents(self, name: str) -> list[str]:
+        """Name of the events triggering name, each once"""
+        if (eid := self.ids.get(name)) is None:
+            return []
+        names = self.names
+        return [names[parent] for parent in dict.fromkeys(self.parent_ids(eid))]
+
+    def _string(self, position: int) -> str | None:
+        return None if position < 0 else self.strings[position]
+
+    def _edge(self, source: int, edge: int) -> ancestry_edge:
+        return ancestry_edge(
+            self.names[source],
+            self.names[self.targets[edge]],
+            self.options[edge],
+            self._string(self.weights[edge]),
+            self._string(self.conditions[edge]),
+        )
+
+    def edges(self, name: str) -> list[ancestry_edge]:
+        """Edges going out of name, in option order"""
+        if (eid := self.ids.get(name)) is None:
+            return []
+        return [self._edge(eid, e) for e in range(self.offsets[eid], self.offsets[eid + 1])]
+
+    def in_edges(self, name: str) -> list[ancestry_edge]:
+        if (eid := self.ids.get(name)) is None:
+            return []
+        start, end = self.roffsets[eid], self.roffsets[eid + 1]
+        return [self._edge(self.sources[p], self.redges[p]) for p in range(start, end)]
+
+
 class AncestryNode:
-    def __init__(self, ceeventref):
-        self.name = ceeventref.name.value
-        self._ceevent = ceeventref
-        self._parents = []
-        self._children = []
+    """An event of an EventGraph"""
 
-    def set_parent(self, node: AncestryNode):
-        self._parents.append(node)
+    __slots__ = ("name", "_graph")
 
-    def set_child(self, node: AncestryNode):
-        if node in self._children:
-            return
-        self._children.append(node)
-        node.set_parent(self)
+    def __init__(self, graph: EventGraph, name: str):
+        self.name = name
+        self._graph = graph
 
     def is_graphable(self):
-        return len(self._children) + len(self._parents) > 0
+        eid = self._graph.ids[self.name]
+        graph = self._graph
+        return graph.offsets[eid] != graph.offsets[eid + 1] or bool(graph.parent_ids(eid))
 
     @property
-    def children(self):
-        return self._children
+    def children(self) -> list[str]:
+        return self._graph.children(self.name)
 
     @property
-    def parents(self):
-        return self._parents
-
-    @lru_cache
-    def children_names(self):
-        return [n.name for n in self._children]
+    def parents(self) -> list[str]:
+        return self._graph.parents(self.name)
 
-    @lru_cache
-    def parents_names(self):
-        return [n.name for n in self._parents]
+    @property
+    def edges(self) -> list[ancestry_edge]:
+        return self._graph.edges(self.name)
 
 
 class Ancestry:
-    def __init__(self):
-        self._nodes: dict[str, AncestryNode] = {}
-
-    def register(self, node: AncestryNode):
-        """Register a Ceevent object, does nothing if it already exists"""
-        if node.name not in self._nodes:
-            self._nodes[node.name] = node
+    """Edges between the events, from an option to the event it triggers.
 
-    def get(self, name: str) -> AncestryNode:
-        return self._nodes[name]
+    Changes are recorded against the last EventGraph and applied by building the next one on
+    the following read, once for a batch of changes.
+    """
 
-    def set_child_node(self, name: str, node: AncestryNode):
-        self._nodes[name].set_child(node)
+    def __init__(self):
+        self._graph = EventGraph.empty()
+        # Ids of the next graph: the ones of the current graph, then the events registered
+        # since. None once unregistered.
+        self._names: list[str | None] = []
+        self._ids: dict[str, int] = {}
+        # Edges replacing the ones of the graph going out of an id: target id, option, weight
+        # and conditions, as stored by EventGraph.
+        self._pending: dict[int, list[tuple[int, int, int, int]]] = {}
+        self._dirty = False
+        # Shared by every graph, only ever appended to.
+        self._strings: list[str] = []
+        self._interned: dict[str | None, int] = {None: -1}
+
+    def clear(self):
+        self.__init__()
+
+    def register(self, name: str):
+        """Register an event, does nothing if it already exists"""
+        if name not in self._ids:
+            self._ids[name] = len(self._names)
+            self._names.append(name)
+            self._dirty = True
 
-    def set_child_node_from_name(self, name_parent: str, name_child: str):
-        self._nodes[name_parent].set_child(self._nodes[name_child])
+    def get(self, name: str) -> AncestryNode:
+        graph = self.graph()
+        if name not in graph:
+            raise KeyError(name)
+        return AncestryNode(graph, name)
+
+    def __contains__(self, name: str):
+        return name in self._ids
+
+    def children(self, name: str) -> list[str]:
+        return self.graph().children(name)
+
+    def parents(self, name: str) -> list[str]:
+        return self.graph().parents(name)
+
+    def _parent_ids(self, eid: int) -> set[int]:
+        graph, pending = self._graph, self._pending
+        parents = set()
+        if eid < len(graph):
+            parents.update(p for p in graph.parent_ids(eid) if p not in pending)
+        parents.update(p for p, edges in pending.items() if any(e[0] == eid for e in edges))
+        return parents
+
+    def unregister(self, name: str) -> set[str]:
+        """Remove an event and its edges, return the name of its parents"""
+        eid = self._ids.pop(name, None)
+        if eid is None:
+            return set()
+        parents = {self._names[parent] for parent in self._parent_ids(eid) if parent != eid}
+        self._names[eid] = None
+        self._pending.pop(eid, None)
+        self._dirty = True
+        return parents - {None}
+
+    def clear_children(self, name: str):
+        self._pending[self._ids[name]] = []
+        self._dirty = True
+
+    def set_children(self, name: str, edges: list[outbound_event]):
+        """Replace the edges going out of name, children not registered are left out"""
+        ids, interned, intern = self._ids, self._interned, self._intern
+        self._pending[ids[name]] = [
+            (
+                ids[e.name],
+                e.option,
+                interned[e.weight] if e.weight in interned else intern(e.weight),
+                interned[e.conditions] if e.conditions in interned else intern(e.conditions),
+            )
+            for e in edges
+            if e.name in ids
+        ]
+        self._dirty = True
+
+    def _intern(self, string: str | None) -> int:
+        if (position := self._interned.get(string)) is None:
+            position = self._interned[string] = len(self._strings)
+            self._strings.append(string)
+        return position
+
+    def graph(self) -> EventGraph:
+        """The edges as they are now, rebuilt if they changed since the last call"""
+        with index_lock:
+            if self._dirty:
+                self._rebuild()
+            return self._graph
+
+    def _rebuild(self):
+        graph, names, pending = self._graph, self._names, self._pending
+        # Ids are made contiguous again, dropping the unregistered events.
+        remap = array("i", [-1]) * len(names)
+        alive = []
+        for eid, name in enumerate(names):
+            if name is not None:
+                remap[eid] = len(alive)
+                alive.append(name)
+        removed = len(alive) != len(names)
+        offsets = array("i", [0])
+        kept = []
+        for eid, name in enumerate(names):
+            if name is None:
+                continue
+            if (edges := pending.get(eid)) is None and eid < len(graph):
+                start, end = graph.offsets[eid], graph.offsets[eid + 1]
+                edges = zip(
+                    graph.targets[start:end],
+                    graph.options[start:end],
+                    graph.weights[start:end],
+                    graph.conditions[start:end],
+                )
+            if edges and removed:
+                kept.extend((remap[e[0]], *e[1:]) for e in edges if remap[e[0]] >= 0)
+            elif edges:
+                kept.extend(edges)
+            offsets.append(len(kept))
+        targets, options, weights, conditions = (
+            array("i", [edge[column] for edge in kept]) for column in range(4)
+        )
+        self._graph = EventGraph(
+            alive, offsets, targets, options, weights, conditions, self._strings
+        )
+        self._names = list(alive)
+        self._ids = dict(self._graph.ids)
+        self._pending = {}
+        self._dirty = False
 
 
 event_ancestry_errors = EventAncestryErrors()
@@ -192,17 +527,19 @@ def find_by_name(name: str):
     return ebucket[name]
 
 
-def _outboundevents(cevent: Ceevent, errors):
-    """Yield outbout events from event ceevent"""
-    for outboundevent in cevent.outboundevents:
+def _outboundevents(cevent: EventSummary, errors):
+    """Yield the outbound events of cevent found in the bucket"""
+    for outboundevent in cevent.outbound():
         try:
-            child = find_by_name(outboundevent.strip())
-            if not child:
-                raise ChildNotFound(outboundevent)
-            yield child
+            name = outboundevent.name.strip()
+            if not find_by_name(name):
+                raise ChildNotFound(outboundevent.name)
+            if name != outboundevent.name:
+                outboundevent = outboundevent._replace(name=name)
+            yield outboundevent
         except ChildNotFound as e:
             event_ancestry_errors.register(
-                event_ancestry_error(cevent.name.value, e.outboundevent, cevent.xmlfile)
+                event_ancestry_error(cevent.name, e.outboundevent, cevent.xmlfile)
             )
             next(errors)
             logger.error(
@@ -212,15 +549,23 @@ def _outboundevents(cevent: Ceevent, errors):
             )
 
 
-def populate_children():
+def link_children(names) -> int:
+    """Create the edges going out of the given events, return the amount of missing children"""
     errors = count()
     bucket = get_ebucket()
-    for cevent in bucket.values():
-        for child in _outboundevents(cevent, errors):
-            ancestry_instance.set_child_node_from_name(cevent.name.value, child.name.value)
+    for name in names:
+        if not (cevent := bucket.get(name)):
+            continue
+        ancestry_instance.set_children(cevent.name, list(_outboundevents(cevent, errors)))
+    ancestry_instance.graph()  # built now rather than by the first search
+    _changed()
     return next(errors)
 
 
+def populate_children():
+    return link_children(list(get_ebucket().keys()))
+
+
 def scan_for_images(module_path):
     module_path = Path(module_path)
     ibucket = get_imgbucket()
@@ -233,82 +578,6 @@ def scan_for_images(module_path):
         ibucket[key] = img
 
 
-SKILLNAMES = (
-    'req_captor_skill',
-    'req_hero_skill',
-    'skill_to_level',  # XXX: is a list in MenuOptions?!? Not used in the wild.
-    'skills_required',
-    ('skills_to_level', "id"),
-    ('skill', "id"),
-)
-SKIPELEM = ('value', 'restricted_list_of_flags')
-
-
-def get_skill_value(ceevent, skill):
-    if isinstance(skill, tuple):
-        if not hasattr(ceevent, skill[0]):
-            return None
-        ceevent, skill = getattr(ceevent, skill[0]), skill[1]
-
-    if hasattr(ceevent, skill):
-        return getattr(ceevent, skill)
-    return None
-
-
-def get_skill_text_value(element):
-    if isinstance(element, SkillsRequired):
-        return [skill.id for skill in element.skill_required]
-    if isinstance(element, SkillsToLevel):
-        return [skill.id for skill in element.skill]
-    raise Exception("element of type '%s' not handled" % type(element))
-
-
-def filter_and_yield_skills(members, ceevent, cname):
-    if any(x[0] in SKILLNAMES for x in members):
-        for value in filter(
-            lambda x: x is not None,
-            (get_skill_value(ceevent, skillname) for skillname in SKILLNAMES),
-        ):
-            yield get_skill_text_value(value), cname
-
-
-def filter_and_yield_from_options(members, ceevent, cname):
-    name = ["options", "menu_options"]
-    subname = {"options": "option", "menu_options": "menu_option"}
-    for otree in (x[0] for x in filter(lambda x: x[0] in name, members)):
-        options = getattr(ceevent, otree)
-        if not options:
-            return
-        for option in getattr(options, subname[otree]):
-            for value in filter(
-                lambda x: x is not None,
-                (get_skill_value(option, skillname) for skillname in SKILLNAMES),
-            ):
-                if otree == "menu_options":
-                    for skill in value:
-                        yield get_skill_text_value(skill), cname
-                else:
-                    yield get_skill_text_value(value), cname
-
-
-def filter_ceevent(ceevent: Ceevent, ceeventname):
-    if not ceevent or isinstance(ceevent, (str, int, list, float)):
-        return None
-    members = dropwhile(
-        lambda x: x[0][0] == '_',
-        inspect.getmembers_static(
-            ceevent, lambda x: inspect.ismemberdescriptor(x) or isinstance(x, str)
-        ),
-    )
-    members = list(members)
-    for name, cname in filter_and_yield_skills(members, ceevent, ceeventname):
-        yield name, cname
-    for name, cname in filter_and_yield_from_options(members, ceevent, ceeventname):
-        yield name, cname
-    for name, cname in filter_and_yield_from_options(members, ceevent, ceeventname):
-        yield name, cname
-
-
 def ce_module_name(path):
     p = Path(path)
     return p.parts[-3]
@@ -326,6 +595,9 @@ class BigBagXml:
     def add_bad_xmlfile(self, xmlfile, msg):
         self._bad_xml.append((xmlfile, msg))
 
+    def discard(self, xmlfile):
+        self._bad_xml = [(f, msg) for f, msg in self._bad_xml if f != xmlfile]
+
     def to_dict(self):
         return dict(self._bad_xml)
 
@@ -354,79 +626,745 @@ def get_bigbagxml() -> BigBagXml:
 big_bag_xml: BigBagXml | None = None
 
 
-def logging_process(queuelog):
-    listener = logging.handlers.QueueListener(queuelog, logging_file_handler)
-    listener.start()
+def _merge_result(xmlfile, result, rank=None) -> bool:
+    """Merge the result of process_file into the buckets, return False for a bad file
+
+    When rank is given, an event already provided by a file ranked after xmlfile is kept, so
+    that results merged out of order still let the last file win. The definition losing is
+    kept in shadowed.
+    """
+    mlogger = logging.getLogger(__name__)
+    bucket, errs = result
+    indexes['files'][xmlfile] = [summary.name for summary in bucket]
+    if errs:
+        bbx = get_bigbagxml()
+        bbx.add_bad_xmlfile(errs[0], errs[1])
+        return False
+    for summary in bucket:
+        if (current := ebucket.get(summary.name)) is not None:
+            mlogger.warning(
+                "Override of '%s' already present in bucket. (trigger: %s)",
+                summary.name,
+                summary.xmlfile,
+            )
+            if rank and rank.get(current.xmlfile, -1) > rank.get(xmlfile, -1):
+                shadowed.setdefault(summary.name, {})[xmlfile] = summary
+                continue
+            if current.xmlfile != xmlfile:
+                shadowed.setdefault(current.name, {})[current.xmlfile] = current
+            unindex_event(indexes, current.name, current.keys)
+        _install(summary)
+    _changed()
+    return True
+
+
+def _install(summary: EventSummary):
+    """Make summary the definition of its event in the bucket and the indexes"""
+    ebucket[summary.name] = summary
+    index_event(indexes, summary.name, summary.keys)
+    indexes['text'].add(summary.name, summary.document)
+    indexes['names'].add(summary.name, fold(summary.name))
+    ancestry_instance.register(summary.name)
+
+
+load_progress = namedtuple(
+    "load_progress", ["files", "total_files", "events", "bytes", "total_bytes", "elapsed", "eta"]
+)
+
+
+def format_progress(progress: load_progress) -> str:
+    eta = "--" if progress.eta is None else "%ds" % progress.eta
+    return "{} / {} files, {} events, {:.1f} / {:.1f} MB (ETA {})".format(
+        progress.files,
+        progress.total_files,
+        progress.events,
+        progress.bytes / 2**20,
+        progress.total_bytes / 2**20,
+        eta,
+    )
+
+
+class ProgressTracker:
+    """Accumulate per file statistics and report them as load_progress"""
+
+    def __init__(self, xmlfiles, progress=None):
+        self._sizes = {}
+        for xmlfile in xmlfiles:
+            try:
+                self._sizes[xmlfile] = os.path.getsize(xmlfile)
+            except OSError:
+                self._sizes[xmlfile] = 0
+        self._total_bytes = sum(self._sizes.values())
+        self._progress = progress
+        self._start = time.perf_counter()
+        self.files = 0
+        self.events = 0
+        self.bytes = 0
+
+    def done(self, xmlfile, events: int):
+        self.files += 1
+        self.events += events
+        self.bytes += self._sizes.get(xmlfile, 0)
+        if self._progress:
+            self._progress(self.snapshot())
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def snapshot(self) -> load_progress:
+        elapsed = time.perf_counter() - self._start
+        eta = None
+        if self.bytes:
+            eta = elapsed / self.bytes * (self._total_bytes - self.bytes)
+        return load_progress(
+            self.files,
+            len(self._sizes),
+            self.events,
+            self.bytes,
+            self._total_bytes,
+            elapsed,
+            eta,
+        )
+
+
+# A slice of xmlfile holding whole CEEvent elements, head and tail are the offsets where the
+# events of the file start and end. Files that are not split are a single part.
+parse_task = namedtuple(
+    "parse_task", ["xmlfile", "part", "parts", "start", "end", "head", "tail", "size"]
+)
+# Files are only split past this size, smaller ones parse faster than the split costs.
+SPLIT_MIN_SIZE = 1024 * 1024
+# Amount of batches handed to each worker, more batches balance better but cost more IPC.
+BATCHES_PER_WORKER = 8
+
+
+def split_file(xmlfile, size: int, parts: int) -> list[parse_task]:
+    """Split xmlfile into at most parts tasks of about the same size, at CEEvent boundaries"""
+    whole = [parse_task(xmlfile, 0, 1, 0, size, 0, size, size)]
+    if parts < 2:
+        return whole
+    try:
+        with open(xmlfile, "rb") as fh:
+            data = fh.read()
+    except OSError:
+        return whole
+    spans = list(iter_event_spans(data))
+    if len(spans) < 2:
+        return whole
+    head, tail = spans[0][0], spans[-1][1]
+    target = (tail - head) / parts
+    bounds = [head]
+    for start, _ in spans[1:]:
+        if start - bounds[-1] >= target and len(bounds) < parts:
+            bounds.append(start)
+    bounds.append(tail)
+    amount = len(bounds) - 1
+    return [
+        parse_task(xmlfile, i, amount, start, end, head, tail, end - start)
+        for i, (start, end) in enumerate(zip(bounds, bounds[1:]))
+    ]
+
+
+def schedule(xmlfiles, workers: int, split=True) -> list[list[parse_task]]:
+    """Batch the files for the pool, largest first.
+
+    Files bigger than a worker's share of the batches are split at CEEvent boundaries, small
+    files are grouped so that every batch holds about the same amount of bytes.
+    """
+    sizes = {}
+    for xmlfile in xmlfiles:
+        try:
+            sizes[xmlfile] = os.path.getsize(xmlfile)
+        except OSError:
+            sizes[xmlfile] = 0
+    total = sum(sizes.values())
+    target = max(total // max(workers * BATCHES_PER_WORKER, 1), 1)
+    tasks = []
+    for xmlfile, size in sizes.items():
+        if split and size >= SPLIT_MIN_SIZE and size > target:
+            tasks.extend(split_file(xmlfile, size, min(workers, -(-size // target))))
+        else:
+            tasks.append(parse_task(xmlfile, 0, 1, 0, size, 0, size, size))
+    tasks.sort(key=lambda task: task.size, reverse=True)
+
+    batches, batch, batch_size = [], [], 0
+    for task in tasks:
+        batch.append(task)
+        batch_size += task.size
+        if batch_size >= target:
+            batches.append(batch)
+            batch, batch_size = [], 0
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _process_batch(batch: list[parse_task]):
+    """Process the tasks of batch, along with a timing span for each of them"""
+    spans, results = [], []
+    for task in batch:
+        start = time.perf_counter_ns()
+        result = process_part(task, validate=worker_validates)
+        spans.append(
+            make_span(
+                "process_file",
+                CAT_WORKER,
+                start,
+                file=Path(task.xmlfile).name,
+                part="%s/%s" % (task.part + 1, task.parts),
+                bytes=task.end - task.start,
+                events=len(result[0]),
+            )
+        )
+        results.append((task, result))
+    return spans, results
+
+
+def _validate_batch(batch: list[parse_task]):
+    return [(task.xmlfile, validate_file(task.xmlfile)) for task in batch]
 
 
-def process_module(xmlfiles: list, cb=None):
+class PartialResults:
+    """Put back together the results of the parts of split files"""
+
+    def __init__(self):
+        self._parts: dict[str, list] = {}
+
+    def add(self, task: parse_task, result):
+        """Return the result of the whole file once all its parts are in, None until then"""
+        if task.parts == 1:
+            return result
+        parts = self._parts.setdefault(task.xmlfile, [None] * task.parts)
+        parts[task.part] = result
+        if any(part is None for part in parts):
+            return None
+        del self._parts[task.xmlfile]
+        for _, errs in parts:
+            if errs:
+                return [], errs
+        return [summary for part in parts for summary in part[0]], False
+
+
+class BackgroundValidation(threading.Thread):
+    """Validate xml files against the schema in a pool of backend, off the calling thread.
+
+    on_result(xmlfile, errs) is called from this thread for every file, errs being False or
+    a (xmlfile, msg) tuple as returned by process_file.
+    """
+
+    def __init__(
+        self,
+        xmlfiles,
+        on_result,
+        cache: ParseCache | None = None,
+        on_done=None,
+        backend=BACKEND_AUTO,
+    ):
+        super().__init__(name="BackgroundValidation", daemon=True)
+        self._xmlfiles = list(xmlfiles)
+        self._on_result = on_result
+        self._on_done = on_done
+        self._cache = cache
+        self._backend = backend
+        self._xsdpath = get_xsdpath()
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Give up once the batch under way is done, neither on_result nor on_done follow"""
+        self._stopped.set()
+
+    def run(self):
+        tasks = []
+        for xmlfile in self._xmlfiles:
+            if self._stopped.is_set():
+                return
+            if self._cache and (errs := self._cache.get(xmlfile)) is not None:
+                self._on_result(xmlfile, errs)
+            else:
+                tasks.append(xmlfile)
+        if tasks and not self._validate(tasks):
+            return
+        logger.info("Background validation of %s files done.", len(self._xmlfiles))
+        if self._on_done:
+            self._on_done()
+
+    def _validate(self, tasks: list) -> bool:
+        """Validate tasks, return False once stopped"""
+        # Validation needs whole documents, only the ordering and batching is reused.
+        batches = schedule(tasks, os.cpu_count(), split=False)
+        backend = self._backend
+        if backend == BACKEND_AUTO:
+            backend = choose_backend(len(tasks), sum(t.size for batch in batches for t in batch))
+        loglevel = logging.getLogger().getEffectiveLevel()
+        with worker_logging(backend == BACKEND_PROCESS) as logqueue, make_pool(
+            backend, init_validator, (self._xsdpath, logqueue, loglevel)
+        ) as pool:
+            for results in pool.imap_unordered(_validate_batch, batches):
+                if self._stopped.is_set():
+                    return False  # leaving the block terminates the pool
+                for xmlfile, errs in results:
+                    if self._cache:
+                        self._cache.put(xmlfile, errs)
+                    self._on_result(xmlfile, errs)
+            pool.close()
+            pool.join()
+        return True
+
+
+def _parse(xmlfiles: list, backend: str, validate: bool):
+    """Yield (xmlfile, result of process_file) as the workers of backend complete the files"""
+    tracer = get_tracer()
+    with tracer.span("schedule", CAT_INGEST):
+        batches = schedule(xmlfiles, os.cpu_count(), split=backend != BACKEND_SERIAL)
+    partials = PartialResults()
+    loglevel = logging.getLogger().getEffectiveLevel()
+    with worker_logging(backend == BACKEND_PROCESS) as logqueue:
+        initargs = (get_xsdpath(), validate, logqueue, loglevel)
+        # Pool(processes) uses os.cpu_count() if none value is provided
+        with tracer.span("pool", CAT_INGEST, backend=backend), make_pool(
+            backend, init_worker, initargs
+        ) as pool:
+            logger.info(
+                "Processing %s files in %s batches (%s).", len(xmlfiles), len(batches), backend
+            )
+            for spans, results in pool.imap_unordered(_process_batch, batches):
+                tracer.extend(spans)
+                for task, result in results:
+                    if (result := partials.add(task, result)) is not None:
+                        yield task.xmlfile, result
+            # Let the workers flush their last records before the listener stops.
+            pool.close()
+            pool.join()
+
+
+def process_module(
+    xmlfiles: list,
+    cb=None,
+    cache: ParseCache | None = None,
+    progress=None,
+    validation=VALIDATION_EAGER,
+    backend=BACKEND_AUTO,
+):
     """Process the various xml files present in a given module
 
+    Results are merged as soon as a file is done, in whatever order the workers finish them.
+
     Args:
         xmlfiles (list): list of paths leading to xml files
         cb: callback function
+        cache: optional ParseCache, files with a valid entry are not parsed again
+        progress: optional callback receiving a load_progress after each file
+        validation: one of VALIDATION_MODES. Unless eager, files are only checked for
+            well-formedness, see BackgroundValidation for the deferred validation pass.
+        backend: one of BACKENDS, see pycestorieseditor.backends
+
+    Returns:
+        The amount of files that failed, and the backend used, auto being resolved from the
+        files left to parse once the cache is read.
     """
-    global ebucket, indexes
+    rank = {xmlfile: i for i, xmlfile in enumerate(xmlfiles)}
+    tracker = ProgressTracker(rank.keys(), progress)
+    tracer = get_tracer()
+    errcount = 0
 
-    parser = XmlParser()
-    xsd = get_xsdfile()
-    queuelog = multiprocessing.Queue()
-    logging.handlers.QueueHandler(queuelog)
+    def merge(xmlfile, result):
+        nonlocal errcount
+        with tracer.span("merge", CAT_INGEST, file=Path(xmlfile).name):
+            if not _merge_result(xmlfile, result, rank):
+                errcount += 1
+        tracker.done(xmlfile, len(result[0]))
+
+    tasks = []
+    if cache and cb:
+        cb("Loading cached xml files...")
+    with tracer.span("cache", CAT_INGEST):
+        for xmlfile in rank:
+            if cache and (result := cache.get(xmlfile)) is not None:
+                merge(xmlfile, result)
+            else:
+                tasks.append(xmlfile)
+    if cache:
+        logger.info("Parse cache: %s hits, %s misses.", cache.hits, cache.misses)
+
+    if backend == BACKEND_AUTO:
+        backend = choose_backend(len(tasks), tracker.total_bytes)
+        logger.info("Auto selected the %s ingest backend.", backend)
+    if tasks:
+        if cb:
+            cb("Analyzing xml files...")
+        for xmlfile, result in _parse(tasks, backend, validation == VALIDATION_EAGER):
+            merge(xmlfile, result)
+            if cache:
+                cache.put(xmlfile, result)
+        if cache:
+            with tracer.span("evict", CAT_INGEST):
+                cache.evict()
+
+    return errcount, backend
+
+
+def unload_files(xmlfiles, rank: dict[str, int] | None = None) -> set[str]:
+    """Remove the events, indexes and errors coming from xmlfiles.
+
+    An event overridden by a removed one gets its definition back, the one of the file ranked
+    last in rank, as a full load would have it. Return the name of the events whose edges need
+    to be rebuilt: parents of the removed events and the events restored.
+    """
+    xmlfiles = set(xmlfiles)
+    rank = rank or {}
+    parents = set()
+    removed = set()
+    for xmlfile in xmlfiles:
+        for name in indexes['files'].pop(xmlfile, []):
+            if (definitions := shadowed.get(name)) is not None:
+                definitions.pop(xmlfile, None)
+                if not definitions:
+                    del shadowed[name]
+            ceevent = ebucket.get(name)
+            if not ceevent or ceevent.xmlfile != xmlfile:
+                continue  # overridden by another file
+            del ebucket[name]
+            unindex_event(indexes, name, ceevent.keys)
+            indexes['text'].remove(name)
+            indexes['names'].remove(name)
+            removed.add(name)
+            parents |= ancestry_instance.unregister(name)
+        get_bigbagxml().discard(xmlfile)
+    restored = set()
+    for name in removed:
+        definitions = shadowed.pop(name, {})
+        for xmlfile in xmlfiles & definitions.keys():
+            del definitions[xmlfile]
+        if definitions:
+            last = max(definitions, key=lambda xmlfile: rank.get(xmlfile, -1))
+            _install(definitions.pop(last))
+            restored.add(name)
+            if definitions:
+                shadowed[name] = definitions
+    if removed:
+        event_ancestry_errors.discard(removed)
+        _changed()
+    return (parents - removed) | restored
+
+
+def parse_files(
+    xmlfiles: list,
+    cache: ParseCache | None = None,
+    validation=VALIDATION_EAGER,
+    backend=BACKEND_AUTO,
+) -> list[tuple[str, tuple]]:
+    """Parse xmlfiles again through the ingest backends, without touching the buckets.
+
+    validation must be the mode the cache was opened for, see loader.open_caches. Returns the
+    (xmlfile, result) pairs apply_reload expects.
+    """
+    if backend == BACKEND_AUTO:
+        total = 0
+        for xmlfile in xmlfiles:
+            with suppress(OSError):
+                total += os.path.getsize(xmlfile)
+        backend = choose_backend(len(xmlfiles), total)
+    results = []
+    for xmlfile, result in _parse(xmlfiles, backend, validation == VALIDATION_EAGER):
+        if cache:
+            cache.put(xmlfile, result)
+        results.append((xmlfile, result))
+    return results
+
+
+def apply_reload(results: list[tuple[str, tuple]], deleted: list, xmlfiles: list):
+    """Replace the events of the files parsed by parse_files and drop the deleted ones.
+
+    xmlfiles lists every file of the collection in the order of a full load, see
+    process_module, so that events defined by several files end up as a full load has them.
+
+    Returns:
+        (added, updated, removed) sets of event names
+    """
+    rank = {xmlfile: i for i, xmlfile in enumerate(xmlfiles)}
+    changed = [xmlfile for xmlfile, _ in results]
+    after = {summary.name for _, (bucket, _) in results for summary in bucket}
+
+    with index_lock:
+        touched = set(after)
+        for xmlfile in chain(changed, deleted):
+            touched.update(indexes['files'].get(xmlfile, []))
+        before = {name: ebucket.get(name) for name in touched}
+        parents = unload_files(chain(changed, deleted), rank)
+        _materialize.cache_clear()
+        for xmlfile, result in results:
+            _merge_result(xmlfile, result, rank)
+
+        # Parents of replaced events and events that were missing one of the new events as a
+        # child need their edges rebuilt.
+        relink = (parents | event_ancestry_errors.sources_of(after)) - after
+        relink = {name for name in relink | after if name in ancestry_instance}
+        event_ancestry_errors.discard(relink)
+        for name in relink:
+            ancestry_instance.clear_children(name)
+        link_children(relink)
+        now = {name: ebucket.get(name) for name in touched}
+    added, updated, removed = set(), set(), set()
+    for name, summary in now.items():
+        if before[name] is None:
+            if summary is not None:
+                added.add(name)
+        elif summary is None:
+            removed.add(name)
+        elif summary is not before[name]:
+            updated.add(name)
+    return added, updated, removed
+
+
+def reload_files(
+    changed: list,
+    deleted: list,
+    xmlfiles: list,
+    cache: ParseCache | None = None,
+    validation=VALIDATION_EAGER,
+    backend=BACKEND_AUTO,
+):
+    """Re-parse changed files and drop deleted ones without rebuilding everything, see
+    parse_files and apply_reload"""
+    return apply_reload(parse_files(changed, cache, validation, backend), deleted, xmlfiles)
+
+
+class BackgroundReload(threading.Thread):
+    """Parse changed files off the calling thread, see parse_files.
+
+    on_result gets the results from this thread, None if parsing failed. They are to be
+    handed to apply_reload on the thread owning the buckets.
+    """
 
-    # Pool(processes) uses os.cpu_count() if none value is provided
-    errcount = 0
-    with multiprocessing.Pool() as pool:
-        chunks = cpackage(len(xmlfiles))
-        logger.info("Multiprocessing using %s chunks.", chunks)
-        cb("Analyzing xml files...")
-        p1 = multiprocessing.Process(target=logging_process, args=(queuelog,))
-        p1.start()
-        res = pool.starmap_async(
-            process_file,
-            ((xmlfile, xsd, parser) for xmlfile in xmlfiles),
-            chunksize=chunks,
-        )
-        p1.join()
+    def __init__(
+        self,
+        xmlfiles,
+        on_result,
+        cache: ParseCache | None = None,
+        validation=VALIDATION_EAGER,
+        backend=BACKEND_AUTO,
+    ):
+        super().__init__(name="BackgroundReload", daemon=True)
+        self._xmlfiles = list(xmlfiles)
+        self._on_result = on_result
+        self._cache = cache
+        self._validation = validation
+        self._backend = backend
+
+    def run(self):
+        try:
+            results = parse_files(self._xmlfiles, self._cache, self._validation, self._backend)
+        except Exception:
+            logger.exception("Cannot reload %s files.", len(self._xmlfiles))
+            results = None
+        self._on_result(results)
 
-        mlogger = logging.getLogger(__name__)
 
-        for bucket, skills, errs in res.get():
-            if errs:
-                errcount += 1
-                bbx = get_bigbagxml()
-                bbx.add_bad_xmlfile(errs[0], errs[1])
-                continue
-            if cb:
-                cb("Munching events ...")
-            for ceevent in bucket:
-                if ceevent.name.value in ebucket.keys():
-                    mlogger.warning(
-                        "Override of '%s' already present in bucket. (trigger: %s)",
-                        ceevent.name.value,
-                        ceevent.xmlfile,
-                    )
-                ebucket[ceevent.name.value] = ceevent
-                ancestry_instance.register(AncestryNode(ceevent))
-            if cb:
-                cb("Munching skills...")
-            for skill, eventname in skills:
-                for s in skill:
-                    skey = s.value if hasattr(s, 'value') else s
-                    indexes['skills'].setdefault(skey, [])
-                    indexes['skills'][skey].append(eventname)
+# Comments and CDATA sections are matched first so that commented out events are skipped.
+_event_tokens = re.compile(
+    rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<CEEvent(?=[\s>])|</CEEvent\s*>", re.DOTALL
+)
+
+
+def iter_event_spans(data: bytes):
+    """Yield the (start, end) byte offsets of each CEEvent element found in data."""
+    start = None
+    for m in _event_tokens.finditer(data):
+        token = m.group()
+        if token.startswith(b"<CEEvent"):
+            start = m.start()
+        elif token.startswith(b"</CEEvent") and start is not None:
+            yield start, m.end()
+            start = None
+
+
+def validate_file(xmlfile, xsd=None) -> tuple | bool:
+    """Validate a xml file against the schema, return False or (xmlfile, error message)"""
+    if xsd is None:
+        xsd = get_xsdfile()
+    try:
+        xsd.validate(xmlfile)
+    except (
+            xmlschema.validators.exceptions.XMLSchemaChildrenValidationError,
+            xmlschema.validators.exceptions.XMLSchemaValidationError,
+            xmlParseError
+    ) as e:
+        msg = e.reason if hasattr(e, 'reason') else e.msg
+        logging.getLogger(__name__).error("Invalid xml file: %s. Msg: %s", xmlfile, msg)
+        return xmlfile, msg
+    return False
+
+
+# Flags whose color wins over the color of the other flags of an event.
+FLAG_COLOR_PRIORITY = (
+    RestrictedListOfFlagsType.CAN_ONLY_BE_TRIGGERED_BY_OTHER_EVENT,
+    RestrictedListOfFlagsType.WAITING_MENU,
+    RestrictedListOfFlagsType.BIRTH_ALTERNATIVE,
+    RestrictedListOfFlagsType.DEATH_ALTERNATIVE,
+    RestrictedListOfFlagsType.DESERTION_ALTERNATIVE,
+)
+
+
+class EventSummary(
+    namedtuple(
+        "EventSummary",
+        [
+            "name",
+            "document",
+            "flags",
+            "outboundevents",
+            "triggers",
+            "options",
+            "keys",
+            "xmlfile",
+            "start",
+            "end",
+        ],
+    )
+):
+    """What the list, the search and the ancestry need to know about an event.
+
+    document is the folded text searched by textindex, options the amount of options.
+    outboundevents holds the name of the events triggered by the options, triggers the option,
+    weight and use conditions of each in a flat tuple, see outbound. keys holds the values of
+    each index, in indexer.INDEX_NAMES order. start and end are the byte offsets of the event
+    in xmlfile, the full Ceevent is only built on demand, see materialize.
+    """
+
+    __slots__ = ()
+
+    @property
+    def skills(self) -> tuple[str, ...]:
+        return self.keys[SKILLS]
+
+    def outbound(self) -> list[outbound_event]:
+        triggers = self.triggers
+        return [
+            outbound_event(name, *triggers[3 * n:3 * n + 3])
+            for n, name in enumerate(self.outboundevents)
+        ]
+
+    def has_restricted_flag(self, flag: RestrictedListOfFlagsType):
+        return flag.value in self.flags
 
-    return errcount
+    def get_color(self):
+        return flags_color(self.flags)
+
+
+@lru_cache(maxsize=None)
+def flags_color(flags: tuple[str, ...]) -> str | None:
+    """Colour of the events having flags, the same few combinations show up over and over"""
+    members = []
+    for value in flags:
+        try:
+            members.append(RestrictedListOfFlagsType(value))
+        except ValueError:
+            continue
+    for flag in FLAG_COLOR_PRIORITY:
+        if flag in members:
+            return flag.color
+    for flag in members:
+        try:
+            return flag.color
+        except KeyError:
+            continue
+    return None
+
+
+def summarize(element: ElementTree.Element, xmlfile, start=None, end=None) -> EventSummary:
+    """Build the EventSummary of a CEEvent element"""
+    keys = extract(element)
+    outboundevents = []
+    triggers = []
+    options = 0
+    for option in element.iterfind("Options/Option"):
+        if (tevents := option.find("TriggerEvents")) is not None:
+            for tevent in tevents:
+                if name := tevent.findtext("EventName"):
+                    outboundevents.append(name)
+                    weight = tevent.findtext("EventWeight")
+                    conditions = tevent.findtext("EventUseConditions")
+                    # The same few strings repeat, pickled once per result when interned.
+                    triggers.extend(
+                        (
+                            options,
+                            weight and sys.intern(weight),
+                            conditions and sys.intern(conditions),
+                        )
+                    )
+        elif name := option.findtext("TriggerEventName"):
+            outboundevents.append(name)
+            triggers.extend((options, None, None))
+        options += 1
+    return EventSummary(
+        element.findtext("Name", ""),
+        document(element),
+        keys[FLAGS],
+        tuple(outboundevents),
+        tuple(triggers),
+        options,
+        keys,
+        xmlfile,
+        start,
+        end,
+    )
 
 
 def process_file(
-    xmlfile, xsd, parser
-) -> tuple[list[Ceevent], list, tuple | bool]:
+    xmlfile, xsd=None, validate=True
+) -> tuple[list[EventSummary], tuple | bool]:
+    """Validate a xml file and summarize its events from a single parse tree.
+
+    The file is read once, parsed once by ElementTree and the resulting tree is validated
+    against the schema. Only an EventSummary is kept for each event, along with the byte
+    range of its source in the file.
+
+    xsd defaults to the one of the current process, see init_worker. When validate is False
+    the file is only checked for well-formedness.
+    """
+    try:
+        with open(xmlfile, "rb") as fh:
+            data = fh.read()
+    except OSError as e:
+        logger.error("Cannot read xml file: %s. Msg: %s", xmlfile, e)
+        return [], (xmlfile, str(e))
+    return _process_data(xmlfile, data, 0, xsd, validate)
+
+
+def process_part(task: parse_task, xsd=None, validate=True):
+    """Same as process_file, for the slice of a file described by a parse_task.
+
+    The events of the slice are wrapped between the head and the tail of the file so that the
+    fragment is a document of its own.
+    """
+    if task.parts == 1:
+        return process_file(task.xmlfile, xsd, validate)
+    try:
+        with open(task.xmlfile, "rb") as fh:
+            head = fh.read(task.head)
+            fh.seek(task.start)
+            body = fh.read(task.end - task.start)
+            fh.seek(task.tail)
+            tail = fh.read()
+    except OSError as e:
+        logger.error("Cannot read xml file: %s. Msg: %s", task.xmlfile, e)
+        return [], (task.xmlfile, str(e))
+    return _process_data(task.xmlfile, head + body + tail, task.start - task.head, xsd, validate)
+
+
+def _process_data(xmlfile, data: bytes, offset: int, xsd, validate):
+    """Offset is added to the spans found in data, to make them relative to xmlfile."""
+    if xsd is None and validate:
+        xsd = get_xsdfile()
     x = Path(xmlfile)
     mlogger = logging.getLogger(__name__)
-    mlogger.info("-start- %s", x.name)
+    mlogger.debug("-start- %s", x.name)
     bucket = []
     try:
-        xsobjects = xsd.to_objects(xmlfile)
+        root = ElementTree.fromstring(data)
+        if validate:
+            xsd.validate(root)
     except (
             xmlschema.validators.exceptions.XMLSchemaChildrenValidationError,
             xmlschema.validators.exceptions.XMLSchemaValidationError,
@@ -438,18 +1376,77 @@ def process_file(
         # print(e.path)
         # print(e.reason)
         mlogger.error("Invalid xml file: %s. Msg: %s", xmlfile, msg)
-        mlogger.info("-stop- %s", x.name)
-        return [], [], (xmlfile, msg)
-    skills = []
-    for event in xsobjects:
-        string = event.tostring()
-        ceevent: Ceevent = parser.from_string(string, Ceevent)
-        ceevent.xmlsource = string
-        ceevent.xmlfile = xmlfile
-        skills = skills + list(filter_ceevent(ceevent, ceevent.name.value))
-        bucket.append(ceevent)
-    mlogger.info("-stop- %s", x.name)
-    return bucket, skills, False
+        mlogger.debug("-stop- %s", x.name)
+        return [], (xmlfile, msg)
+    elements = root.findall("CEEvent")
+    spans = [(start + offset, end + offset) for start, end in iter_event_spans(data)]
+    if len(spans) != len(elements):
+        mlogger.warning("Cannot locate the source of every event in %s.", xmlfile)
+        spans = [(None, None)] * len(elements)
+    for element, (start, end) in zip(elements, spans):
+        bucket.append(summarize(element, xmlfile, start, end))
+    mlogger.debug("-stop- %s", x.name)
+    return bucket, False
+
+
+def _find_event(data: bytes, name: str) -> ElementTree.Element | None:
+    try:
+        element = ElementTree.fromstring(data)
+    except xmlParseError:
+        return None
+    return element if element.findtext("Name", "") == name else None
+
+
+def _read_span(xmlfile, start: int, end: int) -> bytes | None:
+    """Read a byte range through a read-only memory map of the file"""
+    with open(xmlfile, "rb") as fh:
+        try:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                if end > len(view):
+                    return None
+                return view[start:end]
+        except ValueError:  # empty file
+            return None
+
+
+def read_event_source(summary: EventSummary) -> bytes:
+    """Raw xml of an event, located again by name if its file changed since it was loaded"""
+    if summary.start is not None:
+        data = _read_span(summary.xmlfile, summary.start, summary.end)
+        if data and _find_event(data, summary.name) is not None:
+            return data
+        logger.info("Event '%s' moved in %s, reading it again.", summary.name, summary.xmlfile)
+    with open(summary.xmlfile, "rb") as fh:
+        data = fh.read()
+    for start, end in iter_event_spans(data):
+        if _find_event(data[start:end], summary.name) is not None:
+            return data[start:end]
+    for element in ElementTree.fromstring(data).iterfind("CEEvent"):
+        if element.findtext("Name", "") == summary.name:
+            return ElementTree.tostring(element, encoding="utf-8")
+    raise EventNotFound(summary.name)
+
+
+MATERIALIZE_CACHE_SIZE = 64
+
+
+@lru_cache(maxsize=MATERIALIZE_CACHE_SIZE)
+def _materialize(summary: EventSummary) -> Ceevent:
+    source = read_event_source(summary)
+    ceevent: Ceevent = get_parser().parse(ElementTree.fromstring(source), Ceevent)
+    ceevent.xmlfile = summary.xmlfile
+    return ceevent
+
+
+def materialize(name: str) -> Ceevent | None:
+    """Build the full Ceevent of an event, None if it is unknown or cannot be parsed"""
+    if (summary := find_by_name(name)) is None:
+        return None
+    try:
+        return _materialize(summary)
+    except (OSError, xmlParseError, ParserError, EventNotFound) as e:
+        logger.error("Cannot load event '%s' from %s: %s", name, summary.xmlfile, e)
+        return None
 
 
 class NotBannerLordModule(Exception):
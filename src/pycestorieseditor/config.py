@@ -5,9 +5,10 @@
 import contextlib
 import logging
 import os
+import re
 from pathlib import Path
 
-from platformdirs import user_config_path
+from platformdirs import user_cache_path, user_config_path
 
 logger = logging.getLogger(__name__)
 __pkg_dir = os.path.dirname(__file__)
@@ -15,6 +16,7 @@ __pkg_dir = os.path.dirname(__file__)
 __pkg_config = {
     "confpath": Path(os.getcwd()),  # TODO might change when frozen
     "userconfpath": Path(user_config_path("pyCeStories")),
+    "cachepath": Path(user_cache_path("pyCeStories")),
 }
 __pkg_config.update(
     {
@@ -30,3 +32,71 @@ def get_config(name):
 
     logger.warning("Trying to access non existing config attribute '%s'", name)
     return None
+
+
+_escapes = {"n": "\n", "r": "\r", "t": "\t", "\\": "\\", '"': '"'}
+_long = re.compile(r"[+-]?[0-9]+")
+
+
+def _unescape(value: str) -> str:
+    """Undo the escaping wxFileConfig applies to the values it writes.
+
+    As its FilterInValue: a value starting with a quote is quoted, the unescaped quotes of it
+    are dropped, and so are unknown escapes.
+    """
+    quoted = value.startswith('"')
+    out = []
+    chars = iter(value[1:] if quoted else value)
+    for c in chars:
+        if c == "\\":
+            out.append(_escapes.get(next(chars, ""), ""))
+        elif c != '"' or not quoted:
+            out.append(c)
+    return "".join(out)
+
+
+def _to_long(value: str) -> int | None:
+    """Decimal number as read by wxFileConfig, None for anything else"""
+    value = value.strip()
+    return int(value) if _long.fullmatch(value) else None
+
+
+class SettingsFile:
+    """Read only access to the settings.conf written by wx.FileConfig, without wx.
+
+    Mirrors the Read, ReadInt and ReadBool methods of wx.FileConfig so that both can be used
+    interchangeably by the loader.
+    """
+
+    def __init__(self, path, section="general"):
+        self._path = Path(path)
+        self._entries: dict[str, str] = {}
+        current = ""
+        with open(self._path, encoding="utf-8") as fh:
+            for line in fh:
+                # Trailing spaces belong to the value, wxFileConfig only quotes leading ones.
+                line = line.rstrip("\r\n").lstrip()
+                if not line or line[0] in ";#":
+                    continue
+                if line.startswith("["):
+                    current = line[1:line.find("]")].strip("/")
+                    continue
+                if current == section and "=" in line:
+                    key, value = line.split("=", 1)
+                    self._entries[key.strip()] = _unescape(value.lstrip())
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def Read(self, key, default=""):  # pylint: disable=invalid-name
+        return self._entries.get(key, default)
+
+    def ReadInt(self, key, default=0):  # pylint: disable=invalid-name
+        value = _to_long(self._entries.get(key, ""))
+        return default if value is None else value
+
+    def ReadBool(self, key, default=False):  # pylint: disable=invalid-name
+        """Stored as a number by wx.FileConfig, anything but 0 is true"""
+        value = _to_long(self._entries.get(key, ""))
+        return default if value is None else value != 0
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Rows of the virtual list controls: the main window event list and the error tables.
+
+Every event of the bucket gets an id, its position in the table, and the text of each column
+plus a colour category are computed once per generation of the bucket. The list then only
+holds an array of ids: showing a search result or sorting it never touches the events again.
+The error tables are plain rows of text, whose sorted orders are cached the same way.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+
+from pycestorieseditor.ceevents import (
+    EventGraph,
+    ancestry_instance,
+    ce_abbr_path,
+    ce_module_name,
+    flags_color,
+    get_ebucket,
+    get_generation,
+)
+
+COLUMNS = ("Event", "Module", "File", "Options", "Parents", "Children")
+NUMERIC = frozenset({3, 4, 5})  # columns holding counts
+
+
+class EventTable:
+    def __init__(self, ebucket=None, graph: EventGraph | None = None):
+        ebucket = get_ebucket() if ebucket is None else ebucket
+        graph = ancestry_instance.graph() if graph is None else graph
+        self.generation = get_generation()
+        self.names: list[str] = list(ebucket)
+        self.ids: dict[str, int] = {name: n for n, name in enumerate(self.names)}
+        # Module and file path only depend on the file, looked up once per file.
+        paths: dict[str, tuple[str, str]] = {}
+        # None first, so that category 0 is the default colour.
+        self.palette: list[str | None] = [None]
+        colors: dict[str | None, int] = {None: 0}
+        self.modules: list[str] = []
+        self.files: list[str] = []
+        self.options = array("I")
+        self.parents = array("I")
+        self.children = array("I")
+        self.categories = array("H")
+        for name, ceevent in ebucket.items():
+            if (path := paths.get(ceevent.xmlfile)) is None:
+                path = paths[ceevent.xmlfile] = (
+                    ce_module_name(ceevent.xmlfile),
+                    ce_abbr_path(ceevent.xmlfile),
+                )
+            self.modules.append(path[0])
+            self.files.append(path[1])
+            self.options.append(ceevent.options)
+            if (gid := graph.ids.get(name)) is not None:
+                self.parents.append(len(set(graph.parent_ids(gid))))
+                self.children.append(len(set(graph.child_ids(gid))))
+            else:
+                self.parents.append(0)
+                self.children.append(0)
+            color = flags_color(ceevent.flags)
+            if (category := colors.get(color)) is None:
+                category = colors[color] = len(self.palette)
+                self.palette.append(color)
+            self.categories.append(category)
+        self._ranks: dict[int, array] = {}
+        self._orders: dict[int, array] = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _columns(self) -> tuple:
+        return self.names, self.modules, self.files, self.options, self.parents, self.children
+
+    def text(self, eid: int, column: int) -> str:
+        return str(self._columns()[column][eid])
+
+    def ids_of(self, names: Iterable[str]) -> array:
+        """Ids of names, skipping the ones this table does not know"""
+        ids = self.ids
+        return array("i", [ids[name] for name in names if name in ids])
+
+    def all_ids(self) -> array:
+        return array("i", range(len(self.names)))
+
+    def _order(self, column: int) -> array:
+        """Every id, sorted by column then name"""
+        if (order := self._orders.get(column)) is None:
+            by_name = self._orders.get(0)
+            if by_name is None:
+                by_name = self._orders[0] = array(
+                    "i", sorted(range(len(self.names)), key=self.names.__getitem__)
+                )
+            if column == 0:
+                return by_name
+            # A stable sort of the name order keeps the names sorted among equal values.
+            values = self._columns()[column]
+            order = self._orders[column] = array("i", sorted(by_name, key=values.__getitem__))
+        return order
+
+    def _rank(self, column: int) -> array:
+        """Position of each id in the order of column"""
+        if (rank := self._ranks.get(column)) is None:
+            rank = self._ranks[column] = array("i", [0]) * len(self.names)
+            for position, eid in enumerate(self._order(column)):
+                rank[eid] = position
+        return rank
+
+    def sort(self, ids: array, column: int, ascending: bool = True) -> array:
+        """ids sorted by column, through the cached order of the column"""
+        if len(ids) == len(self.names):
+            order = self._order(column)
+            return array("i", order if ascending else reversed(order))
+        return array("i", sorted(ids, key=self._rank(column).__getitem__, reverse=not ascending))
+
+    def is_current(self) -> bool:
+        return self.generation == get_generation()
+
+
+class RowTable:
+    """Rows of text, the ones past the columns of the list holding what the list doesn't show"""
+
+    def __init__(self, rows: list[tuple[str, ...]]):
+        self.rows = rows
+        self._orders: dict[int, array] = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def text(self, row: int, column: int) -> str:
+        return self.rows[row][column]
+
+    def order(self, column: int | None = None, ascending: bool = True) -> array:
+        """Row numbers sorted by column, or as given for None. The sort being stable, rows keep
+        their given order among equal values."""
+        if column is None:
+            order = array("i", range(len(self.rows)))
+        elif (order := self._orders.get(column)) is None:
+            rows = self.rows
+            order = self._orders[column] = array(
+                "i", sorted(range(len(rows)), key=lambda row: rows[row][column])
+            )
+        return order if ascending else array("i", reversed(order))
+
+    def longest(self, column: int) -> str:
+        return max((row[column] for row in self.rows), key=len, default="")
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Inverted indexes of the values found in the events, skills, flags, items and so on.
+
+The places a value can show up in are read once from the attrs metadata of the
+ceevents_template classes and compiled into a tree of element tags. Extracting the keys of an
+event is then a single walk of its element, visiting only the branches that lead somewhere.
+"""
+from __future__ import annotations
+
+import typing
+from collections import namedtuple
+from functools import lru_cache
+from xml.etree.ElementTree import Element
+
+import attrs
+
+from pycestorieseditor.ceevents_template import Ceevent
+
+# Index name and the element tags its values are read from: tag for the text of the element,
+# tag@attribute for an attribute, tag=value to record value when the element is present, and
+# Prefix* for the text of every element whose tag starts with Prefix, recorded as tag=text.
+INDEXED = {
+    "skills": ("SkillRequired@Id", "Skill@Id"),
+    "traits": ("TraitRequired@Id", "Trait@Id"),
+    "flags": ("RestrictedListOfFlags",),
+    "consequences": ("RestrictedListOfConsequences",),
+    "terrains": ("TerrainType",),
+    "customflags": ("CustomFlag",),
+    "items": ("ReqHeroPartyHaveItem", "ReqCaptorPartyHaveItem", "ItemToGive"),
+    "scenes": ("SceneToPlay", "SceneSettings@SceneName"),
+    "sounds": ("SoundName",),
+    "backgrounds": ("BackgroundName", "Background@Name"),
+    "has": (
+        "Option=options",
+        "MenuOption=menuoptions",
+        "Companion=companions",
+        "TriggerEventName=triggers",
+        "TriggerEvent=triggers",
+        "BackgroundName=backgrounds",
+        "Background=backgrounds",
+        "SkillRequired=skills",
+        "TraitRequired=traits",
+    ),
+    "requirements": ("Req*",),
+}
+INDEX_NAMES = tuple(INDEXED)
+FLAGS = INDEX_NAMES.index("flags")
+SKILLS = INDEX_NAMES.index("skills")
+
+# extract holds what is read on the element, see _target.
+_node = namedtuple("_node", ["extract", "children"])
+# attribute None for the text of the element, the value recorded is prefix + value, or constant
+# alone when set.
+_target = namedtuple("_target", ["index", "attribute", "prefix", "constant"])
+
+
+def _inner_type(hint):
+    """The class held by Optional[...] or list[...]"""
+    args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+    return _inner_type(args[0]) if args else hint
+
+
+def _targets() -> dict[str, list[_target]]:
+    targets: dict[str, list[_target]] = {}
+    for index, specs in enumerate(INDEXED.values()):
+        for spec in specs:
+            spec, _, constant = spec.partition("=")
+            tag, _, attribute = spec.partition("@")
+            targets.setdefault(tag, []).append(
+                _target(index, attribute or None, "", constant or None)
+            )
+    return targets
+
+
+def _targets_of(targets, tag: str) -> list[_target]:
+    found = list(targets.get(tag, ()))
+    for key, entries in targets.items():
+        if key.endswith("*") and tag.startswith(key[:-1]):
+            found.extend(t._replace(prefix=tag + "=") for t in entries)
+    return found
+
+
+def _compile(cls, tag: str, targets, path: frozenset) -> _node:
+    extract, children = [], {}
+    for target in _targets_of(targets, tag):
+        if target.attribute is None:
+            extract.append(target)
+    hints = typing.get_type_hints(cls)
+    for field in attrs.fields(cls):
+        kind, name = field.metadata.get("type"), field.metadata.get("name")
+        if kind == "Attribute":
+            extract.extend(t for t in _targets_of(targets, tag) if t.attribute == name)
+            continue
+        if name is None or kind not in (None, "Element"):
+            continue  # text of the element itself, or wildcards
+        inner = _inner_type(hints[field.name])
+        if attrs.has(inner):
+            if inner in path:
+                continue
+            child = _compile(inner, name, targets, path | {inner})
+        else:
+            child = _node(tuple(t for t in _targets_of(targets, name) if t.attribute is None), {})
+        if child.extract or child.children:
+            children[name] = child
+    return _node(tuple(extract), children)
+
+
+@lru_cache(maxsize=None)
+def compile_extractor(cls=Ceevent) -> _node:
+    """Tree of the tags leading to an indexed value, built once per class"""
+    return _compile(cls, "", _targets(), frozenset({cls}))
+
+
+def _walk(element: Element, node: _node, found: list[dict]):
+    children = node.children
+    for child in element:
+        sub = children.get(child.tag)
+        if sub is None:
+            continue
+        for index, attribute, prefix, constant in sub.extract:
+            if constant:
+                found[index][constant] = None
+                continue
+            value = child.text if attribute is None else child.get(attribute)
+            if value and (value := value.strip()):
+                found[index][prefix + value] = None
+        if sub.children:
+            _walk(child, sub, found)
+
+
+def extract(element: Element, plan: _node | None = None) -> tuple[tuple[str, ...], ...]:
+    """Deduplicated values of each index found in a CEEvent element, in INDEX_NAMES order"""
+    found = [{} for _ in INDEX_NAMES]
+    _walk(element, plan or compile_extractor(), found)
+    return tuple(tuple(values) for values in found)
+
+
+class InvertedIndex(dict):
+    """Value -> names of the events holding it.
+
+    A snapshot shares the sets of the index, each is copied before its next change.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._shared = False
+        self._owned: set[str] = set()  # values whose set was copied since the last snapshot
+
+    def names(self, value: str) -> set[str]:
+        """Set of value, ready to be changed"""
+        if not self._shared or value in self._owned:
+            return self.setdefault(value, set())
+        self._owned.add(value)
+        names = self[value] = set(self.get(value, ()))
+        return names
+
+    def snapshot(self) -> dict[str, set[str]]:
+        """Read only copy, for a thread searching while this one changes"""
+        self._shared = True
+        self._owned = set()
+        return dict(self)
+
+
+def empty_indexes() -> dict[str, InvertedIndex]:
+    return {name: InvertedIndex() for name in INDEX_NAMES}
+
+
+def index_event(indexes: dict, name: str, keys: tuple[tuple[str, ...], ...]):
+    for index, values in zip(INDEX_NAMES, keys):
+        inverted = indexes[index]
+        for value in values:
+            inverted.names(value).add(name)
+
+
+def unindex_event(indexes: dict, name: str, keys: tuple[tuple[str, ...], ...]):
+    for index, values in zip(INDEX_NAMES, keys):
+        inverted = indexes[index]
+        for value in values:
+            if value in inverted:
+                names = inverted.names(value)
+                names.discard(name)
+                if not names:
+                    del inverted[value]
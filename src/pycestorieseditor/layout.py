@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Layouts of the Ancestry Graph tab: where each event goes and the path of each edge.
+
+A spring layout with curved edges takes from a fraction of a second to several seconds, too
+long for the GUI thread. BackgroundLayout computes it on a thread of its own, the result being
+kept in memory and in a LayoutCache on disk, keyed by a hash of the events and edges of the
+subgraph: reopening an event, or another event with the same neighbourhood, draws at once.
+precompute fills the disk cache for every event of the ancestry through a pool of workers.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import namedtuple
+from collections.abc import Callable
+
+from pycestorieseditor.ancestrygraph import BOTH, extract, subgraph
+from pycestorieseditor.backends import (
+    BACKEND_AUTO,
+    BACKEND_PROCESS,
+    BACKEND_SERIAL,
+    BACKEND_THREAD,
+    gil_disabled,
+    make_pool,
+)
+from pycestorieseditor.cache import LayoutCache
+from pycestorieseditor.ceevents import ancestry_instance
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the way layouts are computed or stored changes.
+LAYOUT_VERSION = 1
+NODE_SIZE = 0.03  # the default node_size of netgraph's Graph, 3, in data units
+SELFLOOP_RADIUS = 0.05 * 2**0.5  # as Graph sets it for a scale of (1, 1)
+CURVE_K = 0.1  # as Graph sets it for curved edges
+PATH_POINTS = 25  # points kept of the 100 netgraph fits through each edge
+CACHE_SIZE = 64
+
+# positions maps every event name to its (x, y), paths every (source, target) pair of event
+# names to an array of the points of the edge.
+layout = namedtuple("layout", ["positions", "paths"])
+
+_layouts: dict[str, layout] = {}
+_lock = threading.Lock()
+_disk: LayoutCache | None = None
+_disk_failed = False
+
+
+def get_layout_cache() -> LayoutCache | None:
+    """Disk cache of the layouts, None if the cache directory cannot be created"""
+    global _disk, _disk_failed
+    if _disk is None and not _disk_failed:
+        try:
+            _disk = LayoutCache()
+        except OSError as e:
+            logger.warning("Cannot open the layout cache, layouts stay in memory: %s", e)
+            _disk_failed = True
+    return _disk
+
+
+def named_edges(sub: subgraph) -> list[tuple[str, str]]:
+    nodes = sub.nodes
+    return [(nodes[source], nodes[target]) for source, target in sub.edges]
+
+
+def layout_key(sub: subgraph) -> str:
+    """Hash of the events and edges of sub, whatever their order"""
+    digest = hashlib.sha256(b"%d" % LAYOUT_VERSION)
+    for name in sorted(sub.nodes):
+        digest.update(b"\0n" + name.encode("utf-8"))
+    for source, target in sorted(named_edges(sub)):
+        digest.update(b"\0e" + source.encode("utf-8") + b"\0" + target.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def compute_layout(nodes: list[str], edges: list[tuple[str, str]]) -> layout:
+    """Spring layout of the events and curved edges, as netgraph's Graph computes them"""
+    import numpy as np
+    from netgraph import get_curved_edge_paths, get_fruchterman_reingold_layout
+
+    sizes = dict.fromkeys(nodes, NODE_SIZE)
+    positions = get_fruchterman_reingold_layout(edges, nodes=nodes, node_size=sizes)
+    paths = get_curved_edge_paths(
+        edges, positions, node_size=sizes, k=CURVE_K, selfloop_radius=SELFLOOP_RADIUS
+    )
+    thinned = {}
+    for edge, path in paths.items():
+        if len(path) > PATH_POINTS:
+            path = path[np.linspace(0, len(path) - 1, PATH_POINTS).round().astype(int)]
+        thinned[edge] = path
+    return layout({name: tuple(map(float, xy)) for name, xy in positions.items()}, thinned)
+
+
+def _remember(key: str, result: layout):
+    with _lock:
+        if key not in _layouts and len(_layouts) >= CACHE_SIZE:
+            del _layouts[next(iter(_layouts))]
+        _layouts[key] = result
+
+
+def cached_layout(sub: subgraph, key: str | None = None) -> layout | None:
+    """Layout of sub from memory or disk, None when it still has to be computed"""
+    key = key or layout_key(sub)
+    if (result := _layouts.get(key)) is None:
+        if (cache := get_layout_cache()) and (result := cache.get(key)) is not None:
+            _remember(key, result)
+    return result
+
+
+def get_layout(sub: subgraph) -> layout:
+    """Layout of sub, computed and stored unless already cached"""
+    key = layout_key(sub)
+    if (result := cached_layout(sub, key)) is None:
+        result = compute_layout(sub.nodes, named_edges(sub))
+        _remember(key, result)
+        if cache := get_layout_cache():
+            cache.put(key, result)
+    return result
+
+
+def graph_layout(sub: subgraph, result: layout) -> tuple[dict, dict]:
+    """node_layout and edge_layout arguments of netgraph's Graph drawing sub"""
+    nodes = sub.nodes
+    node_layout = {n: result.positions[name] for n, name in enumerate(nodes)}
+    edge_layout = {
+        (source, target): result.paths[nodes[source], nodes[target]]
+        for source, target in sub.edges
+    }
+    return node_layout, edge_layout
+
+
+class BackgroundLayout(threading.Thread):
+    """Lays sub out off the calling thread.
+
+    on_result gets the layout from this thread, or None if computing it failed.
+    """
+
+    def __init__(self, sub: subgraph, on_result: Callable[[layout | None], None]):
+        super().__init__(name="layout", daemon=True)
+        self._sub = sub
+        self._on_result = on_result
+
+    def run(self):
+        try:
+            result = get_layout(self._sub)
+        except Exception:
+            logger.exception("Cannot lay out the ancestry graph of %s.", self._sub.nodes[0])
+            result = None
+        self._on_result(result)
+
+
+def _layout_task(task: tuple[str, list[str], list[tuple[str, str]]]) -> tuple[str, layout]:
+    key, nodes, edges = task
+    return key, compute_layout(nodes, edges)
+
+
+def precompute(depth: int = 1, direction: str = BOTH, backend: str = BACKEND_AUTO) -> dict:
+    """Lay out the neighbourhood of every event of the ancestry into the disk cache.
+
+    Events sharing a neighbourhood share its layout, the ones already cached are skipped.
+    Returns the amounts of events, of layouts computed and of layouts found in the cache.
+    """
+    cache = get_layout_cache()
+    if cache is None:
+        raise OSError("The layout cache cannot be opened")
+    graph = ancestry_instance.graph()
+    tasks, cached, events = {}, 0, 0
+    for name in graph.names:
+        sub = extract(graph, name, depth, direction)
+        if not sub.edges:
+            continue
+        events += 1
+        key = layout_key(sub)
+        if key in tasks:
+            continue
+        if key in cache:
+            cached += 1
+            continue
+        tasks[key] = (key, sub.nodes, named_edges(sub))
+    # Python code bound by the GIL: only processes spread it over the cores.
+    if backend == BACKEND_AUTO:
+        if (os.cpu_count() or 1) == 1 or len(tasks) < 2:
+            backend = BACKEND_SERIAL
+        else:
+            backend = BACKEND_THREAD if gil_disabled() else BACKEND_PROCESS
+    logger.info("Laying out %s ancestry graphs on the %s backend.", len(tasks), backend)
+    if tasks:
+        with make_pool(backend) as pool:
+            for key, result in pool.imap_unordered(_layout_task, tasks.values(), chunksize=4):
+                cache.put(key, result)
+            pool.close()
+            pool.join()
+        cache.evict()
+    return {"events": events, "computed": len(tasks), "cached": cached}
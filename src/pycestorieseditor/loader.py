@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Load a collection of modules as described by settings.conf, without any GUI toolkit.
+
+conf is either a wx.FileConfig positioned on /general or a config.SettingsFile. Every stage is
+recorded as a span of the tracer, see pycestorieseditor.tracing.
+"""
+from __future__ import annotations
+
+import logging
+from collections import namedtuple
+
+from pycestorieseditor.backends import BACKEND_AUTO, resolve_backend
+from pycestorieseditor.cache import DEFAULT_MAX_SIZE, ParseCache
+from pycestorieseditor.ceevents import (
+    VALIDATION_DEFERRED,
+    VALIDATION_EAGER,
+    VALIDATION_MODES,
+    CePath,
+    NotBannerLordModule,
+    NotCeSubmodule,
+    ancestry_instance,
+    create_ebucket,
+    create_imgbucket,
+    event_ancestry_errors,
+    get_bigbagxml,
+    get_ebucket,
+    get_imgbucket,
+    get_indexes,
+    init_bigbagxml,
+    init_index,
+    init_xsdfile,
+    populate_children,
+    process_module,
+    scan_for_images,
+)
+from pycestorieseditor.indexer import INDEX_NAMES
+from pycestorieseditor.tracing import CE_TRACE_FILE, get_tracer
+
+logger = logging.getLogger(__name__)
+
+collection = namedtuple(
+    "collection",
+    [
+        "cepaths",
+        "xmlfiles",
+        "validation",
+        "backend",
+        "cache",
+        "validation_cache",
+        "bad_files",
+        "missing_children",
+        "timings",
+        "tracer",
+    ],
+)
+
+
+def read_validation_mode(conf) -> str:
+    mode = conf.Read("ValidationMode", VALIDATION_EAGER).lower()
+    if mode not in VALIDATION_MODES:
+        logger.warning("Unknown ValidationMode '%s', using eager.", mode)
+        return VALIDATION_EAGER
+    return mode
+
+
+def open_caches(conf, validation) -> tuple[ParseCache | None, ParseCache | None]:
+    """Parse cache and, in deferred mode, the cache of the background validation"""
+    if not conf.ReadBool("ParseCache", True):
+        return None, None
+    xsdpath = conf.Read("CE_XSDFILE")
+    max_size = conf.ReadInt("ParseCacheMaxSize", DEFAULT_MAX_SIZE // 2**20) * 2**20
+    # Results of a well-formedness only parse must not be mistaken for validated ones.
+    salt = "" if validation == VALIDATION_EAGER else "wellformed"
+    cache = ParseCache(xsdpath, max_size=max_size, salt=salt)
+    validation_cache = None
+    if validation == VALIDATION_DEFERRED:
+        validation_cache = ParseCache(xsdpath, max_size=max_size, salt="validation")
+    return cache, validation_cache
+
+
+def discover(conf, cb=None) -> tuple[list[CePath], list[str]]:
+    """Modules listed in conf and their event files, images are registered on the way"""
+    tracer = get_tracer()
+    cepaths, xmlfiles = [], []
+    for n in range(conf.ReadInt("CeModulePathAmount")):
+        with tracer.span("discovery") as args:
+            try:
+                p = CePath(conf.Read("CeModulePath%i" % n))
+            except (NotBannerLordModule, NotCeSubmodule) as e:
+                logger.error(e)
+                continue
+            cepaths.append(p)
+            if cb:
+                cb("Populating xmlfiles to parse...")
+            xmlfiles.extend(p.events_files)
+            args["module"] = p.name
+        with tracer.span("images", module=p.name):
+            if cb:
+                cb("Populating images for module %s..." % p.name)
+            scan_for_images(str(p))
+    return cepaths, xmlfiles
+
+
+def load_collection(
+    conf, cb=None, progress=None, validation=None, backend=None, use_cache=True, trace=None
+) -> collection:
+    """Fill the buckets, indexes and ancestry from the modules listed in conf.
+
+    validation and backend override the ones found in conf. trace is the path of a trace file
+    to write, overriding CE_TRACE_FILE and the TraceFile key of conf.
+    """
+    tracer = get_tracer()
+    first = len(tracer.spans)
+    create_ebucket()
+    create_imgbucket()
+    init_index()
+    init_bigbagxml()
+    ancestry_instance.clear()
+    event_ancestry_errors.clear()
+    cepaths, xmlfiles = discover(conf, cb)
+
+    with tracer.span("schema"):
+        if cb:
+            cb("Init xsd file...")
+        init_xsdfile(conf.Read("CE_XSDFILE"))
+
+    validation = validation or read_validation_mode(conf)
+    backend = resolve_backend(backend or conf.Read("IngestBackend", BACKEND_AUTO))
+    cache, validation_cache = open_caches(conf, validation) if use_cache else (None, None)
+
+    with tracer.span("parse", files=len(xmlfiles)):
+        bad_files, backend = process_module(xmlfiles, cb, cache, progress, validation, backend)
+
+    with tracer.span("ancestry"):
+        if cb:
+            cb("Creating events ancestry...")
+        missing_children = populate_children()
+
+    timings = tracer.durations(since=first)
+    logger.info(
+        "Loaded %s events from %s files in %.2fs.",
+        len(get_ebucket()), len(xmlfiles), sum(timings.values()),
+    )
+    tracer.log_summary()
+    if trace := trace or CE_TRACE_FILE or conf.Read("TraceFile"):
+        try:
+            tracer.write_chrome_trace(trace)
+        except OSError as e:
+            logger.error("Cannot write trace file: %s", e)
+    return collection(
+        cepaths,
+        xmlfiles,
+        validation,
+        backend,
+        cache,
+        validation_cache,
+        bad_files,
+        missing_children,
+        timings,
+        tracer,
+    )
+
+
+def summary(loaded: collection) -> dict:
+    """Plain data describing a loaded collection, fit for json"""
+    indexes = get_indexes()
+    return {
+        "modules": [{"name": p.name, "path": str(p)} for p in loaded.cepaths],
+        "files": len(loaded.xmlfiles),
+        "events": len(get_ebucket()),
+        "images": len(get_imgbucket()),
+        "skills": len(indexes['skills']),
+        "indexes": {name: len(indexes[name]) for name in INDEX_NAMES},
+        "validation": loaded.validation,
+        "backend": loaded.backend,
+        "cache": (
+            {"hits": loaded.cache.hits, "misses": loaded.cache.misses} if loaded.cache else None
+        ),
+        "bad_files": [{"file": f, "error": str(msg)} for f, msg in get_bigbagxml().bad_xml],
+        "missing_children": loaded.missing_children,
+        "ancestry_errors": [err._asdict() for err in event_ancestry_errors.groupby()],
+        "timings": loaded.timings,
+        "workers": [w._asdict() for w in loaded.tracer.workers()],
+    }
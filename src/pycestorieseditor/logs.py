@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Logging setup, and the pipeline bringing the records of the worker processes to it.
+
+Workers never touch the log file. Their records go through a bounded queue to a single
+listener thread of the parent, which hands them to the handlers configured here. A worker
+whose queue is full drops the record rather than wait.
+"""
+from __future__ import annotations
+
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import sys
+from contextlib import contextmanager
+
+# Both take precedence over the LogLevel and LogFile keys of settings.conf
+CE_LOG_LEVEL = os.getenv("CE_LOG_LEVEL")
+CE_LOG_FILE = os.getenv("CE_LOG_FILE")
+
+DEFAULT_LEVEL = "INFO"
+DEFAULT_FILE = "pce.log"
+STDERR = "-"
+LOG_FORMAT = "%(asctime)s %(name)-15s %(levelname)-8s %(processName)-10s %(message)s"
+# Records waiting for the listener, past this amount workers drop theirs.
+QUEUE_SIZE = 10000
+
+logger = logging.getLogger(__name__)
+_handler: logging.Handler | None = None
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: records are dropped while the queue is full."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        if self.dropped:
+            notice = logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "processName": record.processName,
+                "msg": "%s log records dropped, the log queue was full." % self.dropped,
+            })
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self.dropped += 1
+                return
+            self.dropped = 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_level(level) -> int:
+    """Logging level from a name or a number, DEFAULT_LEVEL when unknown"""
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).strip().upper())
+    if isinstance(value, int):
+        return value
+    if str(level).strip().isdigit():
+        return int(level)
+    logger.warning("Unknown log level '%s', using %s.", level, DEFAULT_LEVEL)
+    return logging.getLevelName(DEFAULT_LEVEL)
+
+
+def configure_logging(level=None, filename=None):
+    """Set the level and destination of the log, the environment winning over the arguments.
+
+    filename is a path, or "-" for stderr. Calling it again replaces the previous destination.
+    """
+    global _handler
+    level = parse_level(CE_LOG_LEVEL or level or DEFAULT_LEVEL)
+    filename = CE_LOG_FILE or filename or os.path.join(os.getcwd(), DEFAULT_FILE)
+    root = logging.getLogger()
+    if _handler is None or getattr(_handler, "baseFilename", STDERR) != (
+        STDERR if filename == STDERR else os.path.abspath(filename)
+    ):
+        if filename == STDERR:
+            handler = logging.StreamHandler(sys.stderr)
+        else:
+            handler = logging.FileHandler(filename, mode="w", encoding="utf-8")
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        if _handler is not None:
+            root.removeHandler(_handler)
+            _handler.close()
+        root.addHandler(handler)
+        _handler = handler
+    root.setLevel(level)
+
+
+def apply_settings(conf):
+    """Reconfigure the log from the LogLevel and LogFile keys of conf"""
+    configure_logging(conf.Read("LogLevel") or None, conf.Read("LogFile") or None)
+
+
+def init_worker_logging(logqueue, level: int):
+    """Worker side of the pipeline: replace the inherited handlers by the queue"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(logqueue))
+    root.setLevel(level)
+
+
+@contextmanager
+def worker_logging(enabled=True):
+    """Queue for init_worker_logging, drained by a listener thread until the block exits.
+
+    Yields None when not enabled, thread and serial workers log directly.
+    """
+    if not enabled:
+        yield None
+        return
+    logqueue = multiprocessing.Queue(QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(
+        logqueue, *logging.getLogger().handlers, respect_handler_level=True
+    )
+    listener.start()
+    try:
+        yield logqueue
+    finally:
+        listener.stop()
+        logqueue.close()
+        logqueue.join_thread()
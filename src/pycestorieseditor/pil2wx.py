@@ -3,8 +3,14 @@
 # © 2025-current bicobus <bicobus@keemail.me>
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 import wx
-from PIL import Image, ImageDraw
+
+# PIL is imported on first use, it weighs on the startup of the frozen build.
+if TYPE_CHECKING:
+    from PIL import Image
 
 
 def hex2rgb(color: str):
@@ -13,6 +19,8 @@ def hex2rgb(color: str):
 
 
 def create_icon(color=None):
+    from PIL import Image, ImageDraw
+
     if not color:
         color = "#2ecc71"
     img = Image.new('RGBA', (16, 16))
@@ -22,6 +30,8 @@ def create_icon(color=None):
 
 
 def pil_create_x():
+    from PIL import Image, ImageDraw
+
     img = Image.new('RGBA', (16, 16))
     draw = ImageDraw.Draw(img)
     draw.ellipse((1, 1, 15, 15), fill="#ECECEC", outline="#8C8C8C")
@@ -30,7 +40,10 @@ def pil_create_x():
     return img
 
 
+@lru_cache(maxsize=1)
 def default_background():
+    from PIL import Image, ImageDraw
+
     matrice = zip([x * 8 * 10 for x in range(1, 22)], [x * 4 * 10 for x in range(1, 22)])
     img = Image.new('RGBA', (445, 805))
     draw = ImageDraw.Draw(img)
@@ -0,0 +1,646 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Query language of the main window search box.
+
+    skill:Roguery AND (text:"fine whisper" OR flag:CanOnlyBeTriggeredByOtherEvent)
+    module:ModA NOT has:options ReqGoldAbove>=100 captor
+
+A bare word or "quoted string" matches a fragment of the event name, field:value or
+field:"quoted value" a value of one of the indexes, and a Req* element followed by one of
+< <= > >= = != and a number compares the requirement. Terms next to each other are joined by
+AND, NOT binds tighter than AND, which binds tighter than OR.
+
+    text:       fragment of the texts, options and companions
+    name:       fragment of the event name
+    skill: trait: flag: consequence: terrain: customflag: item: scene: sound: background:
+    module:     module of the file providing the event
+    file:       fragment of the file path, from the module folder
+    has:        options, menuoptions, companions, triggers, backgrounds, skills, traits,
+                children or parents
+    parent:     events triggered by the given event
+    child:      events triggering the given event
+
+Queries compile to intersections, unions and differences of the sets held by the indexes of
+ceevents. The operands of an AND run from the most selective to the least, and once few
+candidates remain the text and name terms check them one by one instead of searching.
+
+The main window runs them through BackgroundSearch, off the UI thread, against a Snapshot of
+the indexes taken whenever they changed since the previous query.
+"""
+from __future__ import annotations
+
+import logging
+import operator
+import re
+import threading
+import time
+from collections import namedtuple
+from collections.abc import Callable, Iterable, Set
+from functools import lru_cache
+
+from pycestorieseditor.ceevents import (
+    ancestry_instance,
+    ce_abbr_path,
+    ce_module_name,
+    get_ebucket,
+    get_generation,
+    get_indexes,
+    index_lock,
+)
+from pycestorieseditor.indexer import INDEXED
+from pycestorieseditor.textindex import fold
+
+logger = logging.getLogger(__name__)
+
+# Field of a term and the index of ceevents.get_indexes() holding its values.
+KEYWORDS = {
+    "skill": "skills",
+    "trait": "traits",
+    "flag": "flags",
+    "consequence": "consequences",
+    "terrain": "terrains",
+    "customflag": "customflags",
+    "item": "items",
+    "scene": "scenes",
+    "sound": "sounds",
+    "background": "backgrounds",
+}
+GRAPH_HAS = ("children", "parents")
+HAS_VALUES = frozenset(spec.partition("=")[2] for spec in INDEXED["has"]) | set(GRAPH_HAS)
+COMPARISONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+# Seconds without a keystroke before the query of the search box runs.
+DEBOUNCE = 0.1
+# Below this amount of candidates, text and name terms check them rather than search. Terms
+# whose evaluation scans every event always check the candidates.
+CHECK_LIMIT = 512
+
+_token = re.compile(
+    r"""\s*(?:
+        (?P<paren>[()])
+      | (?P<req>[Rr]eq\w*)\s*(?P<op><=|>=|!=|<|>|=)\s*(?P<number>-?\d+(?:\.\d+)?)
+      | (?P<field>[A-Za-z]\w*):(?:"(?P<fquoted>[^"]*)"|(?P<fvalue>[^\s()"]*))
+      | "(?P<quoted>[^"]*)"
+      | (?P<word>[^\s()"]+)
+    )""",
+    re.VERBOSE,
+)
+
+
+class QuerySyntaxError(Exception):
+    def __init__(self, msg, position: int):
+        super().__init__(f"{msg} (at character {position + 1})")
+        self.position = position
+
+
+class SearchCancelled(Exception):
+    ...
+
+
+class Context:
+    """What a query runs against, the buckets of ceevents unless given.
+
+    ancestry is an Ancestry or one of its EventGraph. cancelled is polled between the steps of
+    a query, SearchCancelled is raised once it returns True.
+    """
+
+    def __init__(self, ebucket=None, indexes=None, ancestry=None, cancelled=None):
+        self.ebucket = get_ebucket() if ebucket is None else ebucket
+        self.indexes = get_indexes() if indexes is None else indexes
+        self.ancestry = ancestry_instance if ancestry is None else ancestry
+        self.cancelled: Callable[[], bool] | None = cancelled
+
+    @property
+    def universe(self) -> Set[str]:
+        return self.ebucket.keys()
+
+    def check(self):
+        if self.cancelled is not None and self.cancelled():
+            raise SearchCancelled
+
+    def related(self, name: str, edges: str) -> Iterable[str]:
+        """Names of the "children" or "parents" of name"""
+        return getattr(self.ancestry, edges)(name)
+
+    def ordered(self, names: Set[str]) -> list:
+        """EventSummary of names, in bucket order"""
+        return [ceevent for name, ceevent in self.ebucket.items() if name in names]
+
+
+class Snapshot(Context):
+    """Copy of the buckets, indexes and ancestry frozen at one generation.
+
+    Taken under ceevents.index_lock, it can be queried from another thread while the
+    originals change. The indexes share their sets with the originals, which copy them before
+    changing them, and the EventGraph of the ancestry is frozen once built.
+    """
+
+    def __init__(self, cancelled=None):
+        with index_lock:
+            self.generation = get_generation()
+            indexes = {
+                name: index.snapshot() if hasattr(index, "snapshot") else dict(index)
+                for name, index in get_indexes().items()
+            }
+            # The graph of the ancestry is never modified, the next one replaces it.
+            graph = ancestry_instance.graph()
+            super().__init__(dict(get_ebucket()), indexes, graph, cancelled)
+        self._position: dict[str, int] | None = None
+
+    def ordered(self, names):
+        if len(names) * 4 > len(self.ebucket):
+            return super().ordered(names)
+        if self._position is None:
+            self._position = {name: n for n, name in enumerate(self.ebucket)}
+        ebucket = self.ebucket
+        return [ebucket[name] for name in sorted(names, key=self._position.__getitem__)]
+
+
+class Node:
+    def cost(self, ctx: Context) -> int:
+        """Estimated amount of events matched, used to order the operands of an AND"""
+        return len(ctx.ebucket)
+
+    def evaluate(self, ctx: Context) -> Set[str]:
+        """Names of the events matched. The set may belong to an index, never modify it."""
+        raise NotImplementedError
+
+    def checker(self, ctx: Context) -> Callable[[str], bool] | None:
+        """Test of a single event, for terms cheaper to check than to evaluate"""
+        return None
+
+
+class Fragment(Node):
+    """Fragment of the text or name of an event, through one of the TextIndex"""
+
+    def __init__(self, index: str, value: str):
+        self.index = index
+        self.value = value
+
+    def __repr__(self):
+        return f"{self.index}:{self.value!r}"
+
+    def cost(self, ctx):
+        return ctx.indexes[self.index].estimate(self.value)
+
+    def evaluate(self, ctx):
+        return ctx.indexes[self.index].search(self.value)
+
+    def checker(self, ctx):
+        index, folded = ctx.indexes[self.index], fold(self.value)
+        return lambda name: index.matches(name, folded)
+
+
+def _matching_keys(keys, value: str) -> list[str]:
+    """value itself, or the keys equal to it ignoring case, or else the keys containing it"""
+    if value in keys:
+        return [value]
+    folded = value.casefold()
+    return [k for k in keys if k.casefold() == folded] or [
+        k for k in keys if folded in k.casefold()
+    ]
+
+
+def _union(sets: list[Set[str]]) -> Set[str]:
+    if len(sets) == 1:
+        return sets[0]
+    return set().union(*sets)
+
+
+class Keyword(Node):
+    """Value of one of the inverted indexes of indexer"""
+
+    def __init__(self, index: str, value: str):
+        self.index = index
+        self.value = value
+
+    def __repr__(self):
+        return f"{self.index}:{self.value!r}"
+
+    def _sets(self, ctx) -> list[Set[str]]:
+        inverted = ctx.indexes[self.index]
+        return [inverted[key] for key in _matching_keys(inverted, self.value)]
+
+    def cost(self, ctx):
+        return sum(map(len, self._sets(ctx)))
+
+    def evaluate(self, ctx):
+        return _union(sets) if (sets := self._sets(ctx)) else set()
+
+
+class Has(Keyword):
+    """has:value, either a presence recorded by the "has" index or an ancestry edge"""
+
+    def __init__(self, value: str):
+        super().__init__("has", value)
+
+    def cost(self, ctx):
+        return len(ctx.ebucket) if self.value in GRAPH_HAS else super().cost(ctx)
+
+    def evaluate(self, ctx):
+        if self.value not in GRAPH_HAS:
+            return ctx.indexes["has"].get(self.value, set())
+        check = self.checker(ctx)
+        return {name for name in ctx.ebucket if check(name)}
+
+    def checker(self, ctx):
+        if self.value not in GRAPH_HAS:
+            return None
+        edges = self.value
+        return lambda name: bool(ctx.related(name, edges))
+
+
+class File(Node):
+    """Events provided by the files selected by match, from indexes["files"]"""
+
+    def __init__(self, field: str, value: str, match: Callable[[str, str], bool]):
+        self.field = field
+        self.value = value
+        self._match = match
+
+    def __repr__(self):
+        return f"{self.field}:{self.value!r}"
+
+    def _files(self, ctx) -> list[str]:
+        folded = self.value.casefold()
+        return [f for f in ctx.indexes["files"] if self._match(f, folded)]
+
+    def cost(self, ctx):
+        files = ctx.indexes["files"]
+        return sum(len(files[f]) for f in self._files(ctx))
+
+    def evaluate(self, ctx):
+        files, ebucket = ctx.indexes["files"], ctx.ebucket
+        return {
+            name
+            for xmlfile in self._files(ctx)
+            for name in files[xmlfile]
+            if (ceevent := ebucket.get(name)) is not None and ceevent.xmlfile == xmlfile
+        }
+
+
+def _module_matches(xmlfile: str, folded: str) -> bool:
+    return ce_module_name(xmlfile).casefold() == folded
+
+
+def _file_matches(xmlfile: str, folded: str) -> bool:
+    return folded in ce_abbr_path(xmlfile).replace("\\", "/").casefold()
+
+
+class Related(Node):
+    """Children (parent:name) or parents (child:name) of the named events"""
+
+    def __init__(self, field: str, value: str):
+        self.field = field
+        self.value = value
+
+    def __repr__(self):
+        return f"{self.field}:{self.value!r}"
+
+    def evaluate(self, ctx):
+        if self.value in ctx.ebucket:
+            names = [self.value]
+        else:
+            names = ctx.indexes["names"].search(self.value)
+        edges = "children" if self.field == "parent" else "parents"
+        return {related for name in names for related in ctx.related(name, edges)}
+
+    def cost(self, ctx):
+        return len(self.evaluate(ctx)) if self.value in ctx.ebucket else len(ctx.ebucket)
+
+
+class Compare(Node):
+    """Numeric comparison of a Req* element, against the "requirements" index"""
+
+    def __init__(self, field: str, op: str, number: float):
+        self.field = field
+        self.op = op
+        self.number = number
+
+    def __repr__(self):
+        return f"{self.field}{self.op}{self.number:g}"
+
+    def _sets(self, ctx) -> list[Set[str]]:
+        field, compare, sets = self.field.casefold(), COMPARISONS[self.op], []
+        for key, names in ctx.indexes["requirements"].items():
+            tag, _, value = key.partition("=")
+            if tag.casefold() != field:
+                continue
+            try:
+                number = float(value)
+            except ValueError:
+                continue
+            if compare(number, self.number):
+                sets.append(names)
+        return sets
+
+    def cost(self, ctx):
+        return sum(map(len, self._sets(ctx)))
+
+    def evaluate(self, ctx):
+        return _union(sets) if (sets := self._sets(ctx)) else set()
+
+
+class Not(Node):
+    def __init__(self, item: Node):
+        self.item = item
+
+    def __repr__(self):
+        return f"NOT {self.item!r}"
+
+    def cost(self, ctx):
+        return max(0, len(ctx.ebucket) - self.item.cost(ctx))
+
+    def evaluate(self, ctx):
+        return ctx.universe - self.item.evaluate(ctx)
+
+    def checker(self, ctx):
+        if (check := self.item.checker(ctx)) is None:
+            return None
+        return lambda name: not check(name)
+
+
+class And(Node):
+    def __init__(self, items: list[Node]):
+        self.items = items
+
+    def __repr__(self):
+        return "(" + " AND ".join(map(repr, self.items)) + ")"
+
+    def cost(self, ctx):
+        return min(item.cost(ctx) for item in self.items)
+
+    def evaluate(self, ctx):
+        # Negations are applied last, as differences, rather than as complements of the
+        # whole bucket.
+        positives = [item for item in self.items if not isinstance(item, Not)]
+        negatives = [item.item for item in self.items if isinstance(item, Not)]
+        planned = sorted(((item.cost(ctx), n, item) for n, item in enumerate(positives)))
+        logger.debug("Query plan: %s", ", ".join("%r~%s" % (i, c) for c, _, i in planned))
+        total = len(ctx.ebucket)
+        result = None
+        for cost, _, item in planned:
+            ctx.check()
+            if result is not None and (len(result) <= CHECK_LIMIT or cost >= total):
+                if (check := item.checker(ctx)) is not None:
+                    result = {name for name in result if check(name)}
+                    continue
+            found = item.evaluate(ctx)
+            result = found if result is None else result & found
+            if not result:
+                return set()
+        if result is None:
+            result = ctx.universe
+        for item in negatives:
+            ctx.check()
+            if len(result) <= CHECK_LIMIT or item.cost(ctx) >= total:
+                if (check := item.checker(ctx)) is not None:
+                    result = {name for name in result if not check(name)}
+                    continue
+            result = result - item.evaluate(ctx)
+            if not result:
+                break
+        return result
+
+
+class Or(Node):
+    def __init__(self, items: list[Node]):
+        self.items = items
+
+    def __repr__(self):
+        return "(" + " OR ".join(map(repr, self.items)) + ")"
+
+    def cost(self, ctx):
+        return min(len(ctx.ebucket), sum(item.cost(ctx) for item in self.items))
+
+    def evaluate(self, ctx):
+        found = []
+        for item in self.items:
+            ctx.check()
+            found.append(item.evaluate(ctx))
+        return _union(found)
+
+
+class All(Node):
+    """Empty query"""
+
+    def __repr__(self):
+        return "*"
+
+    def evaluate(self, ctx):
+        return ctx.universe
+
+
+def _tokenize(query: str) -> list[re.Match]:
+    tokens, pos, query = [], 0, query.rstrip()
+    while pos < len(query):
+        if (match := _token.match(query, pos)) is None:
+            while query[pos].isspace():
+                pos += 1
+            raise QuerySyntaxError("Unterminated quote", pos)
+        tokens.append(match)
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, query: str):
+        self.query = query
+        self.tokens = _tokenize(query)
+        self.i = 0
+
+    def _peek(self) -> re.Match | None:
+        return self.tokens[self.i] if self.i < len(self.tokens) else None
+
+    def _accept(self, word: str) -> bool:
+        if (token := self._peek()) is not None and token.group("word") == word:
+            self.i += 1
+            return True
+        return False
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            return All()
+        node = self._or()
+        if (token := self._peek()) is not None:
+            raise QuerySyntaxError("Unexpected ')'", token.start("paren"))
+        return node
+
+    def _or(self) -> Node:
+        items = [self._and()]
+        while self._accept("OR"):
+            items.append(self._and())
+        return items[0] if len(items) == 1 else Or(items)
+
+    def _and(self) -> Node:
+        items = [self._unary()]
+        while (token := self._peek()) is not None and token.group("word") != "OR":
+            if token.group("paren") == ")":
+                break
+            self._accept("AND")
+            items.append(self._unary())
+        return items[0] if len(items) == 1 else And(items)
+
+    def _unary(self) -> Node:
+        if self._accept("NOT"):
+            return Not(self._unary())
+        if (token := self._peek()) is None:
+            raise QuerySyntaxError("Unexpected end of query", len(self.query))
+        self.i += 1
+        if token.group("paren") == "(":
+            node = self._or()
+            if (end := self._peek()) is None or end.group("paren") != ")":
+                raise QuerySyntaxError("Missing ')'", token.start("paren"))
+            self.i += 1
+            return node
+        if token.group("paren") == ")":
+            raise QuerySyntaxError("Unexpected ')'", token.start("paren"))
+        if token.group("word") in ("AND", "OR"):
+            raise QuerySyntaxError(
+                f"Missing term before {token.group('word')}", token.start("word")
+            )
+        return _term(token)
+
+
+def _term(token: re.Match) -> Node:
+    if token.group("req"):
+        return Compare(token.group("req"), token.group("op"), float(token.group("number")))
+    if token.group("quoted") is not None:
+        return Fragment("names", token.group("quoted"))
+    if token.group("word"):
+        return Fragment("names", token.group("word"))
+    field = token.group("field").lower()
+    value = token.group("fquoted")
+    if value is None:
+        value = token.group("fvalue")
+    if not value:
+        raise QuerySyntaxError(f"Missing value after {field}:", token.start("field"))
+    match field:
+        case "text":
+            return Fragment("text", value)
+        case "name":
+            return Fragment("names", value)
+        case "module":
+            return File(field, value, _module_matches)
+        case "file":
+            return File(field, value, _file_matches)
+        case "has":
+            if value.lower() not in HAS_VALUES:
+                raise QuerySyntaxError(
+                    f"has: takes one of {', '.join(sorted(HAS_VALUES))}", token.start("field")
+                )
+            return Has(value.lower())
+        case "parent" | "child":
+            return Related(field, value)
+        case _ if field in KEYWORDS:
+            return Keyword(KEYWORDS[field], value)
+    raise QuerySyntaxError(f"Unknown field '{field}'", token.start("field"))
+
+
+@lru_cache(maxsize=256)
+def parse(query: str) -> Node:
+    """Syntax tree of query, raises QuerySyntaxError"""
+    return _Parser(query).parse()
+
+
+def search(query: str, ctx: Context | None = None) -> Set[str]:
+    """Names of the events matching query. The set may belong to an index, never modify it."""
+    return parse(query).evaluate(ctx or Context())
+
+
+search_result = namedtuple("search_result", ["serial", "query", "events", "error", "submitted"])
+
+
+class BackgroundSearch(threading.Thread):
+    """Runs the queries of the search box on a thread of its own, the latest one winning.
+
+    A query submitted runs once no other came in for its delay, against a Snapshot retaken
+    when the buckets changed, and is abandoned as soon as a newer one is submitted. on_result
+    gets a search_result from this thread: events are the matching EventSummary in bucket
+    order, error the QuerySyntaxError of an invalid query, submitted the perf_counter_ns of
+    the submission.
+    """
+
+    def __init__(self, on_result: Callable[[search_result], None], delay: float = DEBOUNCE):
+        super().__init__(name="search", daemon=True)
+        self._on_result = on_result
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._pending: tuple[int, str, int, float] | None = None
+        self._serial = 0
+        self._stopped = False
+        self._snapshot: Snapshot | None = None
+
+    @property
+    def serial(self) -> int:
+        """Serial of the latest submission, results of older ones are stale"""
+        return self._serial
+
+    def submit(self, query: str, delay: float | None = None) -> int:
+        with self._cond:
+            self._serial += 1
+            self._pending = (
+                self._serial,
+                query,
+                time.perf_counter_ns(),
+                self.delay if delay is None else delay,
+            )
+            self._cond.notify()
+            return self._serial
+
+    def cancel(self):
+        """Drop the pending query and abandon the running one"""
+        with self._cond:
+            self._serial += 1
+            self._pending = None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._serial += 1
+            self._cond.notify()
+
+    def _next(self) -> tuple[int, str, int] | None:
+        with self._cond:
+            while not self._stopped:
+                if self._pending is None:
+                    self._cond.wait()
+                    continue
+                serial, query, submitted, delay = self._pending
+                remaining = delay - (time.perf_counter_ns() - submitted) / 1e9
+                if remaining <= 0:
+                    self._pending = None
+                    return serial, query, submitted
+                self._cond.wait(remaining)
+        return None
+
+    def run(self):
+        while (job := self._next()) is not None:
+            serial, query, submitted = job
+            try:
+                events = self._search(serial, query)
+                error = None
+            except SearchCancelled:
+                logger.debug("Search for '%s' superseded.", query)
+                continue
+            except QuerySyntaxError as e:
+                events, error = [], e
+            if serial == self._serial:
+                self._on_result(search_result(serial, query, events, error, submitted))
+
+    def _search(self, serial: int, query: str) -> list:
+        node = parse(query)
+        if self._snapshot is None or self._snapshot.generation != get_generation():
+            self._snapshot = Snapshot()
+        ctx = self._snapshot
+        ctx.cancelled = lambda: serial != self._serial
+        found = node.evaluate(ctx)
+        ctx.check()
+        return ctx.ordered(found)
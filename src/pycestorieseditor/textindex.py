@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Full text index of the events, for the text: searches of the main window.
+
+Each event is reduced to a document: its text, option texts, notification and companions,
+case and accent folded. Documents are split in tokens, each token lists the events it shows
+up in, and the tokens themselves are indexed by trigram. A substring query is answered by
+finding the tokens containing each of its words through the trigrams, intersecting the events
+of those tokens, then checking the few remaining documents for the whole query.
+
+The names of the events get an index of their own, for the name fragments of a query.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from xml.etree.ElementTree import Element
+
+# Element paths of the strings making up the document of an event, tag@attribute for values
+# held by an attribute.
+TEXT_SOURCES = (
+    "Text",
+    "NotificationName",
+    "Options/Option/OptionText",
+    "MenuOptions/MenuOption/OptionText",
+    "Companions/Companion@Id",
+    "Options/Option/Companions/Companion@Id",
+    "MenuOptions/MenuOption/Companions/Companion@Id",
+)
+_sources = tuple(source.partition("@")[::2] for source in TEXT_SOURCES)
+_word = re.compile(r"\w+")
+# Below this amount of candidates, documents are checked rather than intersected further.
+VERIFY_THRESHOLD = 64
+# Up to this amount of results, the next keystroke only checks them again.
+REFINE_LIMIT = 1024
+
+
+def fold(text: str) -> str:
+    """Lower case, accent free text with runs of whitespace reduced to a single space"""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())
+
+
+def document(element: Element) -> str:
+    """Folded strings of a CEEvent element, one per line so that no match spans two"""
+    strings = []
+    for path, attribute in _sources:
+        for child in element.iterfind(path):
+            value = child.get(attribute) if attribute else child.text
+            if value and (value := fold(value)):
+                strings.append(value)
+    return "\n".join(strings)
+
+
+def trigrams(token: str) -> set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class TextIndex:
+    def __init__(self):
+        self._docs: dict[str, str] = {}
+        self._postings: dict[str, set[str]] = {}  # token -> names of the events
+        self._grams: dict[str, set[str]] = {}  # trigram -> tokens
+        self._last: tuple[str, frozenset[str]] | None = None
+        self._plan: tuple[str, list] | None = None
+        # Once a snapshot shares the sets, each is copied before its first change. The keys of
+        # the sets copied since the last snapshot, tokens and trigrams apart.
+        self._shared = False
+        self._owned_tokens: set[str] = set()
+        self._owned_grams: set[str] = set()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, name):
+        return name in self._docs
+
+    def add(self, name: str, doc: str):
+        """Index doc under name, replacing what name held before"""
+        if name in self._docs:
+            self.remove(name)
+        self._docs[name] = doc
+        self.clear_cache()
+        for token in set(_word.findall(doc)):
+            if token not in self._postings:
+                for gram in trigrams(token):
+                    self._own(self._grams, self._owned_grams, gram).add(token)
+            self._own(self._postings, self._owned_tokens, token).add(name)
+
+    def remove(self, name: str):
+        if (doc := self._docs.pop(name, None)) is None:
+            return
+        self.clear_cache()
+        for token in set(_word.findall(doc)):
+            names = self._own(self._postings, self._owned_tokens, token)
+            names.discard(name)
+            if names:
+                continue
+            del self._postings[token]
+            for gram in trigrams(token):
+                tokens = self._own(self._grams, self._owned_grams, gram)
+                tokens.discard(token)
+                if not tokens:
+                    del self._grams[gram]
+
+    def _own(self, sets: dict[str, set[str]], owned: set[str], key: str) -> set[str]:
+        """Set of key in sets, created if missing, copied first if a snapshot may share it"""
+        if not self._shared or key in owned:
+            return sets.setdefault(key, set())
+        owned.add(key)
+        copy = sets[key] = set(sets.get(key, ()))
+        return copy
+
+    def snapshot(self) -> TextIndex:
+        """Read only copy, for a thread searching while this one changes.
+
+        The copy shares the sets of this index, which copies them before changing them.
+        """
+        copy = TextIndex()
+        copy._docs = dict(self._docs)
+        copy._postings = dict(self._postings)
+        copy._grams = dict(self._grams)
+        self._shared = True
+        self._owned_tokens = set()
+        self._owned_grams = set()
+        return copy
+
+    def clear_cache(self):
+        """Forget the previous query, so that the next search starts from the indexes"""
+        self._last = None
+        self._plan = None
+
+    def tokens_containing(self, fragment: str) -> list[str]:
+        """Tokens of the vocabulary containing fragment"""
+        if len(fragment) < 3:
+            return [token for token in self._postings if fragment in token]
+        grams = sorted((self._grams.get(g, set()) for g in trigrams(fragment)), key=len)
+        candidates = set(grams[0]).intersection(*grams[1:]) if grams[0] else set()
+        return [token for token in candidates if fragment in token]
+
+    def _words(self, query: str) -> list[tuple[int, list[set[str]]]]:
+        """Events of the tokens containing each word of the folded query, smallest first"""
+        if self._plan and self._plan[0] == query:
+            return self._plan[1]
+        postings = []
+        for fragment in set(_word.findall(query)):
+            sets = [self._postings[token] for token in self.tokens_containing(fragment)]
+            postings.append((sum(map(len, sets)), sets))
+        postings.sort(key=lambda p: p[0])
+        self._plan = (query, postings)
+        return postings
+
+    def estimate(self, query: str) -> int:
+        """Upper bound of the amount of events search(query) returns"""
+        query = fold(query)
+        postings = self._words(query) if query else None
+        return postings[0][0] if postings else len(self._docs)
+
+    def matches(self, name: str, query: str) -> bool:
+        """Whether the document of name contains query, query being already folded"""
+        return query in self._docs.get(name, "")
+
+    def search(self, query: str) -> frozenset[str]:
+        """Names of the events whose document contains query, ignoring case and accents"""
+        query = fold(query)
+        if not query:
+            return frozenset(self._docs)
+        # Typing extends the previous query, whose results hold every match of the new one.
+        if self._last and self._last[0] in query and len(self._last[1]) <= REFINE_LIMIT:
+            candidates = self._last[1]
+        else:
+            candidates = None
+            # Most selective word first, checking the documents beats intersecting past a point.
+            for size, sets in self._words(query):
+                if not size:
+                    candidates = set()
+                    break
+                names = sets[0] if len(sets) == 1 else set().union(*sets)  # never modified
+                candidates = names if candidates is None else candidates & names
+                if len(candidates) <= VERIFY_THRESHOLD:
+                    break
+            if candidates is None:  # no word character in the query
+                candidates = self._docs.keys()
+        docs = self._docs
+        result = frozenset(name for name in candidates if query in docs[name])
+        self._last = (query, result)
+        return result
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Timing spans of the load, for the summary dialog, the log and chrome://tracing.
+
+Spans are stamped with time.perf_counter_ns, a monotonic clock shared by every process of the
+machine, so that the spans recorded in the workers line up with the ones of the parent.
+
+Interactions of the main window are recorded as well, from the input to the updated display,
+and summarized as latency histograms.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Takes precedence over the TraceFile key of settings.conf
+CE_TRACE_FILE = os.getenv("CE_TRACE_FILE")
+
+CAT_STAGE = "stage"  # top level steps of the load
+CAT_INGEST = "ingest"  # steps of process_module run by the parent
+CAT_WORKER = "worker"  # process_file calls, in whatever worker ran them
+CAT_UI = "ui"  # interactions of the main window, from the input to the updated display
+
+# Latency the 95th percentile of each kind of CAT_UI span should stay under, in seconds.
+LATENCY_TARGETS = {"search": 0.2}
+# Upper bounds of the buckets of the latency histograms, in seconds.
+LATENCY_BUCKETS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+
+span = namedtuple("span", ["name", "cat", "pid", "tid", "start", "end", "args"])
+worker_stats = namedtuple("worker_stats", ["pid", "tid", "busy", "idle", "tasks"])
+
+
+def make_span(name: str, cat: str, start: int, end: int | None = None, **args) -> span:
+    """Span of the calling process and thread, start and end from time.perf_counter_ns"""
+    return span(
+        name,
+        cat,
+        os.getpid(),
+        threading.get_native_id(),
+        start,
+        time.perf_counter_ns() if end is None else end,
+        args,
+    )
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Nearest rank percentile, p between 0 and 100"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))]
+
+
+def histogram(values: list[float], bounds=LATENCY_BUCKETS) -> list[int]:
+    """Amount of values under each bound, the last count being the values above them all"""
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        counts[bisect.bisect_left(bounds, value)] += 1
+    return counts
+
+
+class Tracer:
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        self.spans: list[span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, cat: str = CAT_STAGE, **args):
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            self.add(make_span(name, cat, start, **args))
+
+    def add(self, record: span):
+        with self._lock:
+            self.spans.append(record)
+
+    def extend(self, records):
+        with self._lock:
+            self.spans.extend(records)
+
+    def durations(self, cat: str = CAT_STAGE, since: int = 0) -> dict[str, float]:
+        """Seconds spent in each span of cat, by name in order of first appearance"""
+        out: dict[str, float] = {}
+        for s in self.spans[since:]:
+            if s.cat == cat:
+                out[s.name] = out.get(s.name, 0) + (s.end - s.start) / 1e9
+        return out
+
+    def workers(self) -> list[worker_stats]:
+        """Busy and idle time of each worker, idle being measured against the pool lifetime"""
+        pools = [s for s in self.spans if s.cat == CAT_INGEST and s.name == "pool"]
+        window = sum(s.end - s.start for s in pools) / 1e9
+        busy: dict[tuple[int, int], list[float]] = {}
+        for s in self.spans:
+            if s.cat == CAT_WORKER:
+                busy.setdefault((s.pid, s.tid), []).append((s.end - s.start) / 1e9)
+        return [
+            worker_stats(pid, tid, sum(times), max(0.0, window - sum(times)), len(times))
+            for (pid, tid), times in sorted(busy.items())
+        ]
+
+    def latencies(self, name: str, cat: str = CAT_UI) -> list[float]:
+        """Seconds taken by each span called name"""
+        return [(s.end - s.start) / 1e9 for s in self.spans if s.cat == cat and s.name == name]
+
+    def latency_summary(self, name: str) -> list[str]:
+        values = self.latencies(name)
+        p95 = percentile(values, 95)
+        lines = [
+            "Latency of %s, %s samples:" % (name, len(values)),
+            "  p50 %7.1fms  p95 %7.1fms  max %7.1fms"
+            % (percentile(values, 50) * 1000, p95 * 1000, max(values) * 1000),
+        ]
+        if (target := LATENCY_TARGETS.get(name)) is not None:
+            verdict = "met" if p95 <= target else "missed"
+            lines[-1] += "  target %.0fms %s" % (target * 1000, verdict)
+        counts = histogram(values)
+        labels = ["< %5.0fms" % (b * 1000) for b in LATENCY_BUCKETS]
+        labels.append(">= %4.0fms" % (LATENCY_BUCKETS[-1] * 1000))
+        for label, amount in zip(labels, counts):
+            if amount:
+                bar = "#" * (40 * amount // len(values))
+                lines.append("  %-10s %5s %s" % (label, amount, bar))
+        return lines
+
+    def summary(self) -> list[str]:
+        """Human readable account of the spans, one line each"""
+        lines = ["Stages:"]
+        stages = self.durations(CAT_STAGE)
+        for name, elapsed in stages.items():
+            lines.append("  %-12s %8.3fs" % (name, elapsed))
+        lines.append("  %-12s %8.3fs" % ("total", sum(stages.values())))
+        if ingest := self.durations(CAT_INGEST):
+            lines.append("Ingest:")
+            for name, elapsed in ingest.items():
+                lines.append("  %-12s %8.3fs" % (name, elapsed))
+        if workers := self.workers():
+            lines.append("Workers:")
+            for w in workers:
+                lines.append(
+                    "  pid %-7s busy %7.3fs  idle %7.3fs  %5s files"
+                    % (w.pid if w.tid == w.pid else "%s/%s" % (w.pid, w.tid), w.busy, w.idle,
+                       w.tasks)
+                )
+            busy = [w.busy for w in workers]
+            if sum(busy):
+                lines.append(
+                    "  imbalance x%.2f (slowest / mean)" % (max(busy) / (sum(busy) / len(busy)))
+                )
+        for name in dict.fromkeys(s.name for s in self.spans if s.cat == CAT_UI):
+            lines.extend(self.latency_summary(name))
+        return lines
+
+    def log_summary(self, level=logging.INFO):
+        for line in self.summary():
+            logger.log(level, line)
+
+    def chrome_trace(self) -> dict:
+        """Trace event format, as loaded by chrome://tracing and Perfetto"""
+        parent = os.getpid()
+        events = []
+        for pid in sorted({s.pid for s in self.spans}):
+            events.append({
+                "name": "process_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": 0,
+                "args": {"name": "pycestorieseditor" if pid == parent else "worker %s" % pid},
+            })
+        for s in self.spans:
+            events.append({
+                "name": s.name,
+                "cat": s.cat,
+                "ph": "X",
+                "pid": s.pid,
+                "tid": s.tid,
+                "ts": (s.start - self.origin) / 1000,
+                "dur": (s.end - s.start) / 1000,
+                "args": {k: str(v) for k, v in s.args.items()},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.chrome_trace(), fh)
+        logger.info("Trace written to %s.", path)
+
+
+def init_tracer() -> Tracer:
+    global tracer
+    tracer = Tracer()
+    return tracer
+
+
+def get_tracer() -> Tracer:
+    return tracer
+
+
+tracer = Tracer()
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import namedtuple
+from collections.abc import Callable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+file_change = namedtuple("file_change", ["path", "kind"])
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+# Folder of a module and the glob of the files a load reads from it, see CEPath.events_files
+# and scan_for_images. Only the globs starting with **/ descend into subfolders.
+WATCHED = (("Events", "*.xml"), ("Images", "**/*.png"))
+
+# See inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF
+)
+_event = struct.Struct("iIII")
+
+
+def watched_folders(cepath) -> list[tuple[Path, str]]:
+    return [(Path(str(cepath), folder), pattern) for folder, pattern in WATCHED]
+
+
+def is_watched(path, folder, pattern: str) -> bool:
+    """Whether the glob pattern of folder picks path, as a load would"""
+    relative = os.path.relpath(path, folder)
+    if relative.startswith(os.pardir):
+        return False
+    recursive = pattern.startswith("**/")
+    if not recursive and os.path.dirname(relative):
+        return False
+    return fnmatch.fnmatch(os.path.basename(path), pattern[3:] if recursive else pattern)
+
+
+def snapshot(folders) -> dict[str, tuple[int, int]]:
+    """Map each watched file of the (folder, pattern) pairs to its (mtime, size)."""
+    files = {}
+    for folder, pattern in folders:
+        for path in Path(folder).glob(pattern):
+            with contextlib.suppress(OSError):
+                st = path.stat()
+                files[str(path)] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+class _Inotify:
+    """Minimal ctypes binding over the linux inotify API."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wds: dict[int, str] = {}
+
+    def add_watch(self, folder):
+        wd = self._add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed on %s" % folder)
+        self._wds[wd] = str(folder)
+
+    def add_tree(self, folder):
+        for root, _, _ in os.walk(folder):
+            self.add_watch(root)
+
+    def read(self):
+        """Yield (path, mask) for every pending event."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _event.unpack_from(data, offset)
+            offset += _event.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if wd in self._wds:
+                yield os.path.join(self._wds[wd], os.fsdecode(name)), mask
+
+    def close(self):
+        with contextlib.suppress(OSError):
+            os.close(self.fd)
+
+
+class ModuleWatcher(threading.Thread):
+    """Watch the Events and Images folders of the given modules.
+
+    Uses inotify when available and falls back to polling otherwise. Changes are accumulated
+    until the folders have been quiet for `debounce` seconds, then handed to the callback as
+    a list of file_change, from the watcher thread.
+    """
+
+    def __init__(
+        self,
+        cepaths,
+        callback: Callable[[list[file_change]], None],
+        debounce: float = 0.5,
+        poll_interval: float = 1.0,
+    ):
+        super().__init__(name="ModuleWatcher", daemon=True)
+        self._folders = [
+            (folder, pattern)
+            for cepath in cepaths
+            for folder, pattern in watched_folders(cepath)
+            if folder.is_dir()
+        ]
+        self._callback = callback
+        self._debounce = debounce
+        self._poll_interval = poll_interval
+        self._stopped = threading.Event()
+        self._known = snapshot(self._folders)
+        self._polled = dict(self._known)
+        self._pending: set[str] = set()
+        self._inotify = None
+        if sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+                for folder, pattern in self._folders:
+                    if pattern.startswith("**/"):
+                        self._inotify.add_tree(folder)
+                    else:
+                        self._inotify.add_watch(folder)
+            except (OSError, AttributeError, TypeError) as e:
+                logger.warning("inotify unavailable, falling back to polling: %s", e)
+                if self._inotify:
+                    self._inotify.close()
+                self._inotify = None
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._inotify else "polling"
+
+    def stop(self):
+        self._stopped.set()
+
+    def _is_watched(self, path) -> bool:
+        return any(is_watched(path, folder, pattern) for folder, pattern in self._folders)
+
+    def _in_recursive(self, path) -> bool:
+        return any(
+            pattern.startswith("**/") and not os.path.relpath(path, folder).startswith(os.pardir)
+            for folder, pattern in self._folders
+        )
+
+    def run(self):
+        logger.info("Watching %s folders (%s).", len(self._folders), self.mode)
+        last = 0.0
+        try:
+            while not self._stopped.is_set():
+                if self._collect():
+                    last = time.monotonic()
+                elif self._pending and time.monotonic() - last >= self._debounce:
+                    self._flush()
+        finally:
+            if self._inotify:
+                self._inotify.close()
+
+    def _collect(self) -> bool:
+        """Wait for changes, return True if any were found."""
+        if not self._inotify:
+            self._stopped.wait(self._poll_interval)
+            current = snapshot(self._folders)
+            changed = {p for p, stat in current.items() if self._polled.get(p) != stat}
+            changed |= self._polled.keys() - current.keys()
+            self._polled = current
+            self._pending |= changed
+            return bool(changed)
+
+        timeout = self._debounce if self._pending else self._poll_interval
+        ready, _, _ = select.select([self._inotify.fd], [], [], timeout)
+        if not ready:
+            return False
+        found = False
+        for path, mask in self._inotify.read():
+            if mask & IN_ISDIR:
+                # Only the folders of a recursive glob are watched below their top.
+                if mask & (IN_CREATE | IN_MOVED_TO) and self._in_recursive(path):
+                    with contextlib.suppress(OSError):
+                        self._inotify.add_tree(path)
+                    self._pending.update(
+                        f for f in snapshot([(path, "**/*")]) if self._is_watched(f)
+                    )
+                continue
+            if self._is_watched(path):
+                self._pending.add(path)
+                found = True
+        return found
+
+    def _flush(self):
+        changes = []
+        for path in sorted(self._pending):
+            try:
+                st = os.stat(path)
+            except OSError:
+                if self._known.pop(path, None) is not None:
+                    changes.append(file_change(path, DELETED))
+                continue
+            stat = (st.st_mtime_ns, st.st_size)
+            previous = self._known.get(path)
+            self._known[path] = stat
+            if previous is None:
+                changes.append(file_change(path, CREATED))
+            elif previous != stat:
+                changes.append(file_change(path, MODIFIED))
+        self._pending.clear()
+        if not changes:
+            return
+        logger.info("Detected %s changed files.", len(changes))
+        try:
+            self._callback(changes)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Watcher callback failed.")
@@ -23,6 +23,8 @@ from pycestorieseditor.ceevents import (
     init_index,
     get_xsdfile,
     init_bigbagxml,
+    VALIDATION_EAGER,
+    VALIDATION_MODES,
 )
 from pycestorieseditor.config import get_config
 from pycestorieseditor.wxui import MainWindow
@@ -249,6 +251,14 @@ class CeSettingsWindow(wx.Frame):
         xsdlabel = wx.StaticText(window, wx.ID_ANY, label="XSD file")
         self.xsdentry = wx.TextCtrl(window, wx.ID_ANY, value="", style=wx.TE_READONLY)
         xsdbutton = wx.Button(window, wx.ID_ANY, "Select")
+        validationlabel = wx.StaticText(window, wx.ID_ANY, label="Validation")
+        self.validationchoice = wx.Choice(window, wx.ID_ANY, choices=list(VALIDATION_MODES))
+        self.validationchoice.SetStringSelection(VALIDATION_EAGER)
+        self.validationchoice.SetToolTip(
+            "eager: validate every xml file against the XSD before showing the events.\n"
+            "deferred: show the events right away and validate in the background.\n"
+            "off: only check that the xml files are well formed."
+        )
 
         addremovesizer.Add(buttonadd, 0, wx.ALL, 5)
         addremovesizer.Add(buttonrem, 0, wx.ALL, 5)
@@ -275,6 +285,10 @@ class CeSettingsWindow(wx.Frame):
         fsizer.Add(self.xsdentry, 0, wx.ALL | wx.EXPAND, 3)
         fsizer.Add(xsdbutton, 0, wx.RIGHT, 3)
 
+        fsizer.Add(validationlabel, 0, wx.LEFT, 3)
+        fsizer.Add(self.validationchoice, 0, wx.ALL, 3)
+        fsizer.Add((10, 10), 0, wx.RIGHT, 3)
+
         fsizer.Add((10, 10), 0, wx.LEFT, 3)
         fsizer.Add((10, 10), 0, wx.ALL | wx.EXPAND, 3)
         fsizer.Add(btnsave, 0, wx.RIGHT, 3)
@@ -414,7 +428,7 @@ class CeSettingsWindow(wx.Frame):
         errs = 0
         for module in self._paths.values():
             pulse("Processing module... {}".format(module.name))
-            err = process_module([str(f) for f in module.events_files], pulse)
+            err, _ = process_module([str(f) for f in module.events_files], pulse)
             errs += err
         if errs > 0:
             self._show_warning(f"{errs} xml files couldn't be validated, please check the logs.")
@@ -429,6 +443,7 @@ class CeSettingsWindow(wx.Frame):
         )
         fconf.SetPath("/general")
         fconf.Write("CE_XSDFILE", self.xsdentry.GetValue())
+        fconf.Write("ValidationMode", self.validationchoice.GetStringSelection())
         n = count()
         for path in self._paths.values():
             key = "CeModulePath%s" % next(n)
@@ -452,6 +467,9 @@ class CeSettingsWindow(wx.Frame):
         self.xsdentry.SetValue(conf.Read("CE_XSDFILE"))
         self.xsdentry.SetToolTip(conf.Read("CE_XSDFILE"))
         init_xsdfile(conf.Read("CE_XSDFILE"))
+        mode = conf.Read("ValidationMode", VALIDATION_EAGER)
+        if mode in VALIDATION_MODES:
+            self.validationchoice.SetStringSelection(mode)
 
     def _on_mouse_event(self, evt: wx.MouseEvent):
         obj: wxst.GenStaticText = evt.GetEventObject()
@@ -6,25 +6,22 @@ from __future__ import annotations
 import logging
 import os
 import re
+import sys
+from array import array
 from collections import namedtuple
 from collections.abc import Callable
 from contextlib import suppress
 from dataclasses import dataclass
 from functools import lru_cache
-from itertools import chain
+from itertools import chain, groupby
+from pathlib import Path
 from typing import TypeVar, Optional
 
-import matplotlib.pyplot as plt
 import wx
 import wx.grid
 import wx.lib.mixins.inspection
 import wx.lib.scrolledpanel as wx_scrolled
-from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
-from matplotlib.backends.backend_wxagg import NavigationToolbar2WxAgg as NavigationToolbar
 from attrs import fields
-from netgraph import Graph
-from pygments import token
-from pygments.styles import get_style_by_name
 from wx import stc
 from wx.lib import buttons
 from wx.lib import expando
@@ -34,23 +31,22 @@ from pycestorieseditor import APPNAME
 from pycestorieseditor.ceevents import (
     get_ebucket,
     Ceevent,
-    init_xsdfile,
-    process_module,
-    CePath,
-    create_ebucket,
-    scan_for_images,
-    create_imgbucket,
     get_imgbucket,
-    init_index,
-    get_indexes,
-    init_bigbagxml,
     get_bigbagxml,
     ce_abbr_path,
-    populate_children,
     event_ancestry_errors,
+    materialize,
     find_by_name,
+    read_event_source,
+    EventSummary,
+    EventNotFound,
     ancestry_instance,
-    NotBannerLordModule
+    apply_reload,
+    load_progress,
+    format_progress,
+    BackgroundReload,
+    BackgroundValidation,
+    VALIDATION_DEFERRED,
 )
 from pycestorieseditor.ceevents_template import (
     RestrictedListOfFlagsType,
@@ -61,14 +57,25 @@ from pycestorieseditor.ceevents_template import (
     MenuOption,
     MenuOptions,
 )
-from pycestorieseditor.ancestrygraph import build_graph
+from pycestorieseditor.analytics import get_report, graph_report, report_lines
+from pycestorieseditor.ancestrygraph import DIRECTIONS, MAX_DEPTH, MAX_NODES, build_graph
+from pycestorieseditor.eventlist import COLUMNS, NUMERIC, EventTable, RowTable
+from pycestorieseditor.layout import BackgroundLayout, cached_layout, graph_layout
+from pycestorieseditor.loader import load_collection
+from pycestorieseditor.logs import apply_settings
+from pycestorieseditor.query import BackgroundSearch, QuerySyntaxError, parse, search_result
+from pycestorieseditor.tracing import CAT_UI, Tracer, init_tracer, make_span
 from pycestorieseditor.pil2wx import (
+    default_background,
     hex2rgb,
     wxicon,
 )
+from pycestorieseditor.watcher import DELETED, ModuleWatcher, file_change
 
+# matplotlib, netgraph and pygments are only imported once the ancestry graph or the xml
+# source of an event is displayed.
 logger = logging.getLogger(__name__)
-style = get_style_by_name("default")
+PROGRESS_RANGE = 1000
 
 if wx.Platform == '__WXMSW__':
     faces = {
@@ -97,8 +104,23 @@ else:
         'size': 11,
         'size2': 10,
     }
-faces["back"] = style.background_color
-faces["fore"] = style.styles[token.Token] or "#000"
+
+
+@lru_cache(maxsize=1)
+def xml_style():
+    """Pygments style of the xml source, along with the faces it applies to"""
+    from pygments import token
+    from pygments.styles import get_style_by_name
+
+    style = get_style_by_name("default")
+    faces["back"] = style.background_color
+    faces["fore"] = style.styles[token.Token] or "#000"
+    return style
+
+
+def close_figures():
+    if (plt := sys.modules.get("matplotlib.pyplot")) is not None:
+        plt.close('all')
 
 
 def values_as_list(modalitem):
@@ -145,6 +167,8 @@ def pyg2sci_properties(properties: str) -> str:
 # * https://wiki.wxpython.org/StyledTextCtrl%20Lexer%20Quick%20Reference#Xml
 # * https://github.com/wxWidgets/wxWidgets/blob/3bd50638863a379570f7f93d27d91ba297995369/include/wx/stc/stc.h#L736-L747
 def pygment2scite(styles):
+    from pygments import token
+
     for pygtoken, properties in styles.items():
         scitoken = None
         match pygtoken:
@@ -332,6 +356,44 @@ class ListCtrlPanel(wx.Panel, ColumnSorterMixin):
         pass
 
 
+class VirtualTable(wx.ListCtrl, ListCtrlAutoWidthMixin):
+    """Virtual list over a RowTable, sorted by clicking the column headers"""
+
+    MAX_WIDTH = 600
+
+    def __init__(self, parent, table: RowTable, headers: tuple[str, ...]):
+        super().__init__(
+            parent,
+            wx.ID_ANY,
+            style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL | wx.BORDER_NONE,
+        )
+        ListCtrlAutoWidthMixin.__init__(self)
+        self._table = table
+        self._sort: tuple[int, bool] | None = None  # column, ascending
+        for column, label in enumerate(headers):
+            self.InsertColumn(column, label)
+            # Autosizing only measures the rows a virtual list has drawn, size to the longest.
+            width = self.GetTextExtent(table.longest(column) or label)[0] + 20
+            self.SetColumnWidth(column, min(width, self.MAX_WIDTH))
+        self._rows = table.order()
+        self.SetItemCount(len(self._rows))
+        self.Bind(wx.EVT_LIST_COL_CLICK, self.on_col_click)
+
+    def row(self, item: int) -> tuple[str, ...]:
+        return self._table.rows[self._rows[item]]
+
+    def OnGetItemText(self, item, column):
+        return self._table.text(self._rows[item], column)
+
+    def on_col_click(self, event):
+        column = event.GetColumn()
+        ascending = not (self._sort and self._sort == (column, True))
+        self._sort = (column, ascending)
+        self.ShowSortIndicator(column, ascending)
+        self._rows = self._table.order(column, ascending)
+        self.Refresh()
+
+
 class DataTypeNotValid(Exception):
     ...
 
@@ -903,10 +965,14 @@ class DwTabOne(wx_scrolled.ScrolledPanel):
 
 
 class DwTabXml(wx.Panel):
-    def __init__(self, parent, source: str):
+    """Source of the event, only read from its file once the tab is opened."""
+
+    def __init__(self, parent, summary: EventSummary):
         super().__init__(parent)
+        self._summary = summary
+        self._loaded = False
         core = wx.BoxSizer(wx.VERTICAL)
-        t = stc.StyledTextCtrl(self, wx.ID_ANY, style=wx.TE_MULTILINE)
+        self._text = t = stc.StyledTextCtrl(self, wx.ID_ANY, style=wx.TE_MULTILINE)
         t.SetWrapMode(stc.STC_WRAP_WORD)
         t.SetWrapIndentMode(stc.STC_WRAPINDENT_SAME)
         t.SetViewWhiteSpace(stc.STC_WS_INVISIBLE)
@@ -915,6 +981,21 @@ class DwTabXml(wx.Panel):
         t.SetTabIndents(True)
         t.SetUseTabs(True)
         t.SetLexer(stc.STC_LEX_XML)
+        t.SetEditable(False)
+        core.Add(t, 1, wx.EXPAND | wx.ALL, 2)
+        self.SetSizerAndFit(core)
+
+    def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            source = read_event_source(self._summary).decode("utf-8", errors="replace")
+        except (OSError, EventNotFound) as e:
+            logger.error("Cannot read the source of '%s': %s", self._summary.name, e)
+            source = f"<!-- Cannot read {self._summary.xmlfile}: {e} -->"
+        t = self._text
+        style = xml_style()
         t.SetSelBackground(True, style.highlight_color)
         t.StyleSetSpec(
             stc.STC_STYLE_DEFAULT,
@@ -923,11 +1004,10 @@ class DwTabXml(wx.Panel):
         t.StyleClearAll()
         for pygtoken, spec in pygment2scite(style.styles):
             t.StyleSetSpec(pygtoken, spec)
+        t.SetEditable(True)
         t.SetText(source.replace("    ", "\t"))
         t.Colourise(0, -1)
         t.SetEditable(False)
-        core.Add(t, 1, wx.EXPAND | wx.ALL, 2)
-        self.SetSizerAndFit(core)
 
 
 class DwTabOption(wx_scrolled.ScrolledPanel):
@@ -1172,31 +1252,111 @@ class DwTabMenuOptions(wx.Panel):
 
 
 class DwTabAncestry(wx.Panel):
+    """Ancestry graph of the event, only drawn once the tab is opened and laid out off the GUI
+    thread, see layout.BackgroundLayout."""
+
+    DIRECTION_LABELS = ("Parents and children", "Parents", "Children")  # as DIRECTIONS
+
     def __init__(self, parent, ceevent: Ceevent):
         super().__init__(parent)
+        self._ceevent = ceevent
+        self._loaded = False
+        self._serial = 0  # of the latest draw, older layouts are dropped
+
+    def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
+        from matplotlib.backends.backend_wxagg import NavigationToolbar2WxAgg as NavigationToolbar
+
         self.figure = plt.figure()
         self.canvas = FigureCanvas(self, -1, self.figure)
         self.toolbar = NavigationToolbar(self.canvas)
         self.toolbar.Realize()
-        edges, nodes, colors, labels = build_graph(ceevent)
 
-        Graph(
-            edges,
-            nodes=range(len(nodes)),
-            node_layout="spring",
-            node_labels=labels,
-            node_label_offset=0.05,
-            node_label_fontdict={'size': 10},
-            node_color=colors,
-            arrows=True,
-            edge_layout="curved",
-        )
+        self.depth = wx.SpinCtrl(self, wx.ID_ANY, min=1, max=MAX_DEPTH, initial=1)
+        self.depth.SetToolTip("Hops away from the event")
+        self.direction = wx.Choice(self, wx.ID_ANY, choices=self.DIRECTION_LABELS)
+        self.direction.SetSelection(0)
+        self.status = wx.StaticText(self, wx.ID_ANY, "")
+        controls = wx.BoxSizer(wx.HORIZONTAL)
+        label = wx.StaticText(self, wx.ID_ANY, "Depth")
+        for control in (label, self.depth, self.direction, self.status):
+            controls.Add(control, 0, wx.ALIGN_CENTER_VERTICAL | wx.ALL, 5)
 
         sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(controls, 0, wx.EXPAND)
         sizer.Add(self.canvas, 1, wx.LEFT | wx.TOP | wx.GROW)
         sizer.Add(self.toolbar, 0, wx.EXPAND)
         self.toolbar.update()
         self.SetSizer(sizer)
+        self.Bind(wx.EVT_SPINCTRL, self.on_change, self.depth)
+        self.Bind(wx.EVT_CHOICE, self.on_change, self.direction)
+        self.draw()
+        self.Layout()
+
+    def on_change(self, event):
+        self.draw()
+
+    def draw(self):
+        """Draw the graph at once when its layout is cached, once laid out otherwise"""
+        sub = build_graph(
+            self._ceevent.name.value,
+            self.depth.GetValue(),
+            DIRECTIONS[self.direction.GetSelection()],
+        )
+        self._serial += 1
+        status = f"{len(sub.nodes)} events"
+        if sub.truncated:
+            status += f", limited to the {MAX_NODES} closest"
+        self.status.SetLabel(status)
+        if not sub.edges:
+            self.show_text("No event in this direction")
+        elif (result := cached_layout(sub)) is not None:
+            self.render(sub, result)
+        else:
+            self.show_text("Laying the graph out...")
+            serial = self._serial
+            BackgroundLayout(
+                sub, lambda result: wx.CallAfter(self._on_layout, serial, sub, result)
+            ).start()
+
+    def _on_layout(self, serial: int, sub, result):
+        # The window was closed, or another depth or direction asked for meanwhile.
+        if not self or serial != self._serial:
+            return
+        if result is None:
+            self.show_text("The graph could not be laid out, see the log")
+        else:
+            self.render(sub, result)
+
+    def show_text(self, text: str):
+        self.figure.clf()
+        ax = self.figure.add_subplot()
+        ax.set_axis_off()
+        ax.text(0.5, 0.5, text, ha="center", va="center")
+        self.canvas.draw()
+
+    def render(self, sub, result):
+        from netgraph import Graph
+
+        node_layout, edge_layout = graph_layout(sub, result)
+        self.figure.clf()
+        Graph(
+            sub.edges,
+            nodes=range(len(sub.nodes)),
+            node_layout=node_layout,
+            node_labels=sub.labels,
+            node_label_offset=0.05,
+            node_label_fontdict={'size': 10},
+            node_color=sub.colors,
+            arrows=True,
+            edge_layout=edge_layout,
+            ax=self.figure.add_subplot(),
+        )
+        self.canvas.draw()
 
 
 class DetailWindow(wx.Frame):
@@ -1211,7 +1371,7 @@ class DetailWindow(wx.Frame):
         nb = wx.Notebook(self, wx.ID_ANY, style=wx.NB_LEFT)
 
         tabone = DwTabOne(nb, ceevent)
-        tabxml = DwTabXml(nb, ceevent.xmlsource)
+        self.tabxml = DwTabXml(nb, find_by_name(ceevent.name.value))
         taboptions, tabmoptions = None, None
         if ceevent.options:
             taboptions = DwTabOptions(nb, ceevent.options)
@@ -1219,7 +1379,7 @@ class DetailWindow(wx.Frame):
             tabmoptions = DwTabMenuOptions(nb, ceevent.menu_options)
 
         nb.AddPage(tabone, "Main")
-        nb.AddPage(tabxml, "Xml Source")
+        nb.AddPage(self.tabxml, "Xml Source")
         if taboptions:
             nb.AddPage(taboptions, "Options")
         if tabmoptions:
@@ -1249,17 +1409,24 @@ class DetailWindow(wx.Frame):
         self.CenterOnScreen()
 
         self.Bind(wx.EVT_CLOSE, self.on_close2)
+        nb.Bind(wx.EVT_NOTEBOOK_PAGE_CHANGED, self.on_page_changed)
         self.Bind(wx.EVT_BUTTON, self.on_close, self.button_close)
         self.Bind(wx.EVT_BUTTON, lambda evt: self.on_preview_click(evt, ceevent), button_preview)
 
+    def on_page_changed(self, evt):
+        page = evt.GetEventObject().GetPage(evt.GetSelection())
+        if isinstance(page, (DwTabXml, DwTabAncestry)):
+            page.load()
+        evt.Skip()
+
     def on_close2(self, evt):
-        plt.close('all')
+        close_figures()
         parent = self.GetParent()
         parent._cb_toggle()
         evt.Skip()
 
     def on_close(self, event):
-        plt.close('all')
+        close_figures()
         parent = self.GetParent()
         parent._cb_toggle()
         self.Destroy()
@@ -1319,7 +1486,7 @@ class PreviewEvent(wx.Panel):
         try:
             self.background_img = ibucket[determine_background(ceevent)]
         except KeyError:  # Some images come with the core module, which isn't parsed.
-            self.background_img = ibucket[None]
+            self.background_img = default_background()
 
     def build_widgets(self, ceevent):
         vsizer = wx.BoxSizer(wx.VERTICAL)
@@ -1383,7 +1550,7 @@ class PreviewEvent(wx.Panel):
 
     def on_button_clicked(self, evt):
         wdg = evt.GetEventObject()
-        ceevent = find_by_name(wdg.event_name)
+        ceevent = materialize(wdg.event_name)
         if not ceevent:
             dialog = wx.MessageDialog(
                 self,
@@ -1426,63 +1593,151 @@ class BadXmlDetails(wx.Frame):
     def __init__(self, parent, data, *args, **kwargs):
         kwargs['style'] = kwargs.get("style", 0) | wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
         super().__init__(parent, title="PCE: Troubleshooting xml files", *args, **kwargs)
-        panel = wx_scrolled.ScrolledPanel(self, wx.ID_ANY)
-        panel.SetMinSize(wx.Size(1024, 600))
-
-        sizer = wx.FlexGridSizer(2, wx.Size(5, 5))
-        sizer.AddGrowableCol(1)
-        for k, v in data.bad_xml:
-            wx_label_text(panel, sizer, "File:", ce_abbr_path(k), tooltip=k)
-            wx_label_text(panel, sizer, "Error:", v, True)
-            sizer.AddSpacer(10)
-            sizer.AddSpacer(10)
-        panel.SetSizerAndFit(sizer)
-        panel.SetupScrolling()
-        self.Layout()
+        panel = wx.Panel(self, wx.ID_ANY)
+        self.SetMinSize(wx.Size(1024, 600))
+        vsizer = wx.BoxSizer(wx.VERTICAL)
 
+        # File, first line of the error, then the full path and error for the detail pane.
+        rows = [
+            (ce_abbr_path(xmlfile), msg.partition("\n")[0], xmlfile, msg)
+            for xmlfile, msg in data.bad_xml
+        ]
+        self._table = VirtualTable(panel, RowTable(rows), ("File", "Error"))
+        self._table.Bind(wx.EVT_LIST_ITEM_SELECTED, self.on_selected)
+        vsizer.Add(self._table, 2, wx.ALL | wx.EXPAND, 5)
 
-class AncestryTable(ABCtrl):
-    def populate(self):
-        for ri, rdata in enumerate(self._data):
-            idx = self.InsertItem(ri, ce_abbr_path(rdata.filename))
-            self.SetItem(idx, 1, rdata.source)
-            self.SetItem(idx, 2, rdata.child)
-            yield ri, idx, [
-                rdata.filename,
-                rdata.source,
-                rdata.child,
-            ]
-        self.SetColumnWidth(0, wx.LIST_AUTOSIZE)
-        self.SetColumnWidth(1, wx.LIST_AUTOSIZE)
-        self.SetColumnWidth(2, wx.LIST_AUTOSIZE)
+        self._detail = wx.TextCtrl(
+            panel, wx.ID_ANY, style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_DONTWRAP
+        )
+        vsizer.Add(self._detail, 1, wx.ALL | wx.EXPAND, 5)
+        panel.SetSizerAndFit(vsizer)
+        if rows:
+            self._table.Select(0)
+
+    def on_selected(self, event):
+        _, _, xmlfile, msg = self._table.row(event.GetIndex())
+        self._detail.SetValue(f"{xmlfile}\n\n{msg}")
 
 
 class AncestryDetails(wx.Frame):
     def __init__(self, parent, *args, **kwargs):
         kwargs['style'] = kwargs.get("style", 0) | wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
         super().__init__(parent, title="PCE: Troubleshooting ancestry", *args, **kwargs)
-        panel = wx_scrolled.ScrolledPanel(self, wx.ID_ANY)
+        panel = wx.Panel(self, wx.ID_ANY)
         self.SetMinSize((1250, 600))
         vsizer = wx.BoxSizer(wx.VERTICAL)
         txt = (
-            "The following is a list of TriggerEvent, it is sorted by file.\nThe event source is the point of "
-            "reference, where as the event target is the missing event."
+            "The following is a list of TriggerEvent, sorted by file until a column is clicked.\n"
+            "The event source is the point of reference, where as the event target is the "
+            "missing event."
         )
         vsizer.Add(wx.StaticText(panel, wx.ID_ANY, txt), 0, wx.ALL | wx.EXPAND, 10)
 
-        table = ListCtrlPanel(
-            panel,
-            event_ancestry_errors.groupby("filename"),
-            ("Filename", "Event Source", "Event Target"),
-            AncestryTable,
-        )
+        # The errors are kept grouped by file, the path is abbreviated once per file.
+        rows = []
+        for filename, errors in groupby(event_ancestry_errors.grouped(), lambda e: e.filename):
+            path = ce_abbr_path(filename)
+            rows.extend((path, err.source, err.child) for err in errors)
+        table = VirtualTable(panel, RowTable(rows), ("Filename", "Event Source", "Event Target"))
         vsizer.Add(table, 1, wx.ALL | wx.EXPAND, 5)
 
         panel.SetSizerAndFit(vsizer)
-        panel.SetupScrolling()
         # self.SetSize((800, -1))
 
 
+class LoadTimingsDetails(wx.Frame):
+    def __init__(self, parent, tracer: Tracer, *args, **kwargs):
+        kwargs['style'] = kwargs.get("style", 0) | wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
+        super().__init__(parent, title="PCE: Load timings", *args, **kwargs)
+        self._tracer = tracer
+        panel = wx.Panel(self, wx.ID_ANY)
+        self.SetMinSize((600, 450))
+        vsizer = wx.BoxSizer(wx.VERTICAL)
+        text = wx.TextCtrl(
+            panel,
+            wx.ID_ANY,
+            value="\n".join(tracer.summary()),
+            style=wx.TE_MULTILINE | wx.TE_READONLY | wx.TE_DONTWRAP,
+        )
+        text.SetFont(
+            wx.Font(10, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)
+        )
+        vsizer.Add(text, 1, wx.ALL | wx.EXPAND, 5)
+        savebtn = wx.Button(panel, label="Save trace...")
+        savebtn.SetToolTip("Save the spans as a json file for chrome://tracing or Perfetto")
+        vsizer.Add(savebtn, 0, wx.ALL | wx.ALIGN_RIGHT, 5)
+        panel.SetSizer(vsizer)
+        self.Bind(wx.EVT_BUTTON, self.on_save, savebtn)
+
+    def on_save(self, event):
+        with wx.FileDialog(
+            self,
+            "Save trace",
+            defaultFile="pce-trace.json",
+            wildcard="Trace files (*.json)|*.json",
+            style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT,
+        ) as dialog:
+            if dialog.ShowModal() == wx.ID_CANCEL:
+                return
+            path = dialog.GetPath()
+        try:
+            self._tracer.write_chrome_trace(path)
+        except OSError as e:
+            dialog = wx.MessageDialog(
+                self,
+                f"Cannot write {path}: {e}",
+                "Save trace",
+                style=wx.OK | wx.CENTER | wx.ICON_ERROR,
+            )
+            dialog.ShowModal()
+
+
+class GraphReportDetails(wx.Frame):
+    """Unreachable, orphan and dead end events, and loops of the story graph"""
+
+    def __init__(self, parent, report: graph_report, *args, **kwargs):
+        kwargs['style'] = kwargs.get("style", 0) | wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER
+        super().__init__(parent, title="PCE: Story graph", *args, **kwargs)
+        panel = wx.Panel(self, wx.ID_ANY)
+        self.SetMinSize((900, 600))
+        vsizer = wx.BoxSizer(wx.VERTICAL)
+        summary = report_lines(report)[:6]
+        summary.append("Double click an event to open it.")
+        text = wx.StaticText(panel, wx.ID_ANY, "\n".join(summary))
+        vsizer.Add(text, 0, wx.ALL | wx.EXPAND, 10)
+
+        ebucket = get_ebucket()
+
+        def row(problem, name):
+            return problem, name, ce_abbr_path(ebucket[name].xmlfile)
+
+        orphans = set(report.orphans)
+        rows = [row("Orphan" if n in orphans else "Unreachable", n) for n in report.unreachable]
+        rows.extend(row("Dead end", name) for name in report.dead_ends)
+        closed = set(report.closed_loops)
+        for position, loop in enumerate(report.loops):
+            kind = "Loop without exit" if position in closed else "Loop"
+            label = f"{kind} {position + 1}, {len(loop)} events"
+            rows.extend(row(label, name) for name in loop)
+        self._table = VirtualTable(panel, RowTable(rows), ("Problem", "Event", "File"))
+        self._table.Bind(wx.EVT_LIST_ITEM_ACTIVATED, self.on_activated)
+        vsizer.Add(self._table, 1, wx.ALL | wx.EXPAND, 5)
+        panel.SetSizerAndFit(vsizer)
+
+    def on_activated(self, event):
+        name = self._table.row(event.GetIndex())[1]
+        if not (ceeventobj := materialize(name)):
+            dialog = wx.MessageDialog(
+                self,
+                f"Event {name} couldn't be loaded, please check the logs.",
+                "Error: event not loaded",
+                style=wx.OK | wx.CENTER | wx.ICON_ERROR,
+            )
+            dialog.ShowModal()
+            return
+        DetailWindow(self, ceeventobj).Show()
+
+
 # - Main Window ---
 class ModuleProcessingError(Exception):
     ...
@@ -1503,60 +1758,101 @@ class SearchIndice(wx.BoxSizer):
     def __init__(self, parent, term, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.term = term
-        self.text = f"{term[0]}: {term[1]}" if term[0] else f"{term[2]}"
+        self.text = term
         bmp = wx.ArtProvider.GetBitmap(wx.ART_CLOSE, wx.ART_OTHER, (16, 16))
         self.b = buttons.ThemedGenBitmapTextButton(parent, wx.ID_ANY, bmp, self.text)
         self.Add(self.b, 0, wx.EXPAND, 0)
 
 
-class CeListItem(wx.ListItem):
-    def __init__(self, item, wxid: int):
-        super().__init__()
-        self.SetText(item.name.value)
-        self.SetId(wxid)
-        if color := item.get_color():
-            self.SetBackgroundColour(wx.Colour(hex2rgb(color)))
-
-
 class CeListBox(wx.ListCtrl, ListCtrlAutoWidthMixin):
+    """Virtual list of the events, the rows being ids of an EventTable"""
+
     def __init__(self, parent, wxid, cb):
-        super().__init__(parent, wxid, style=wx.LC_REPORT | wx.LC_NO_HEADER | wx.LC_SINGLE_SEL)
+        super().__init__(parent, wxid, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_SINGLE_SEL)
         ListCtrlAutoWidthMixin.__init__(self)  # Using super() doesn't work?!
-        self.InsertColumn(0, "Events")
-        self.setResizeColumn(0)
+        self.filtered = False
+        self._table: EventTable | None = None
+        self._attrs: list[wx.ItemAttr | None] = []
+        self._ids = array("i")
+        self._sort: tuple[int, bool] | None = None  # column, ascending
+        for column, label in enumerate(COLUMNS):
+            fmt = wx.LIST_FORMAT_RIGHT if column in NUMERIC else wx.LIST_FORMAT_LEFT
+            self.InsertColumn(column, label, fmt)
+        self.setResizeColumn(1)
         self.populate()
         self._cb_toggle = cb
+        self.Bind(wx.EVT_LIST_COL_CLICK, self.on_col_click)
+
+    def _current_table(self) -> EventTable:
+        """Table of the bucket as it is now, rebuilt after the bucket changed"""
+        if self._table is None or not self._table.is_current():
+            self._table = EventTable()
+            self._attrs = [None]
+            for color in self._table.palette[1:]:
+                attr = wx.ItemAttr()
+                attr.SetBackgroundColour(wx.Colour(hex2rgb(color)))
+                self._attrs.append(attr)
+        return self._table
+
+    def _show(self, ids: array):
+        if self._sort is not None:
+            ids = self._table.sort(ids, *self._sort)
+        self._ids = ids
+        self.SetItemCount(len(ids))
+        self.Refresh()
 
     def populate(self, items=None):
-        self.DeleteAllItems()
-        if not items:
-            items = get_ebucket().values()
+        """Show the given EventSummary, or every event"""
+        table = self._current_table()
+        self.filtered = items is not None
+        self._show(table.all_ids() if items is None else table.ids_of(e.name for e in items))
+
+    def refresh_events(self):
+        """Follow the events that changed on disk, keeping the rows shown.
+
+        Counts of parents and children change beyond the events reloaded, the table is rebuilt
+        whatever changed.
+        """
+        shown = [self._table.names[eid] for eid in self._ids] if self._table else []
+        table = self._current_table()
+        if self.filtered:
+            self._show(table.ids_of(shown))
+        else:
+            self._show(table.all_ids())
+
+    def name_at(self, row: int) -> str:
+        return self._table.names[self._ids[row]]
+
+    def OnGetItemText(self, item, column):
+        return self._table.text(self._ids[item], column)
+
+    def OnGetItemAttr(self, item):
+        return self._attrs[self._table.categories[self._ids[item]]]
 
-        # self.autocomplete_data = [item.name for item in items]
-        for n, item in enumerate(items):
-            self.InsertItem(CeListItem(item, n))
+    def on_col_click(self, event):
+        column = event.GetColumn()
+        ascending = not (self._sort and self._sort == (column, True))
+        self._sort = (column, ascending)
+        self.ShowSortIndicator(column, ascending)
+        self._show(self._ids)
 
     def on_clicked_event(self, event):
-        ebucket = get_ebucket()
-        ceeventobj = ebucket[event.Text]
+        name = self.name_at(event.GetIndex())
+        ceeventobj = materialize(name)
+        if not ceeventobj:
+            dialog = wx.MessageDialog(
+                self,
+                f"Event {name} couldn't be loaded, please check the logs.",
+                "Error: event not loaded",
+                style=wx.OK | wx.CENTER | wx.ICON_ERROR,
+            )
+            dialog.ShowModal()
+            return
         displayframe = DetailWindow(self, ceeventobj)
         displayframe.Show()
         self._cb_toggle()
 
 
-def _filter_text(text, stack: list[Ceevent]):
-    return filter(lambda x: x.text and text in x.text.value, stack)
-
-
-def _filter_skillid(skill, stack: list[Ceevent]):
-    indexes = get_indexes()
-    ebucket = get_ebucket()
-    if skill in indexes['skills'].keys():
-        for event in indexes['skills'][skill]:
-            yield ebucket[event]
-
-
-search = re.compile(r"""(?:(?P<tag>text|skill):"(?P<value>[^"]+)")+|(\w+)""")
 indice = namedtuple("indice", "iid term button")
 
 
@@ -1567,7 +1863,6 @@ class MainWindow(wx.Frame):
         self.SetIcon(wx.ArtProvider.GetIcon('ICON'))
         self._conffile = conffile
         self._load_conf()
-        bbx = get_bigbagxml()
 
         self._indices: list[indice] = []
 
@@ -1585,19 +1880,12 @@ class MainWindow(wx.Frame):
 
         self.bad_xml_btn = wx.Button(self.panel_1, label="", size=(-1, 30))
         self.bad_xml_btn.SetBackgroundColour((100, 41, 38))
-        if bxa := bbx.amount():
-            self.bad_xml_btn.SetLabelText(f"{bxa} xml file{'s'[:bxa ^ 1]} failed validation")
-        else:
-            self.bad_xml_btn.Hide()
-
         self.ancestry_btn = wx.Button(self.panel_1, label="", size=(-1, 30))
         self.ancestry_btn.SetBackgroundColour((100, 41, 38))
-        if event_ancestry_errors.len > 1:
-            self.ancestry_btn.SetLabelText(
-                f"{event_ancestry_errors.len} trigger events coulnd't be found"
-            )
-        else:
-            self.ancestry_btn.Hide()
+        self._update_warning_buttons()
+        self.timings_btn = wx.Button(self.panel_1, label="Load timings", size=(-1, 30))
+        self.graph_btn = wx.Button(self.panel_1, label="Story graph", size=(-1, 30))
+        self.graph_btn.SetToolTip("Unreachable, orphan and dead end events, and loops")
 
         # Legend panel
         self.panel_leg = wx.StaticBox(
@@ -1659,6 +1947,11 @@ class MainWindow(wx.Frame):
         self.searchent.SetMinSize((250, -1))
         self.searchent.ShowCancelButton(True)
         self.searchent.SetDescriptiveText("Search")
+        self.searchent.SetToolTip(
+            "Name fragments, text:, skill:, trait:, flag:, consequence:, module:, file:,\n"
+            "has:options, parent:, child:, ReqGoldAbove>100, joined by AND, OR, NOT and\n"
+            "parentheses. Enter keeps the query as a search indice."
+        )
         self.searchent.SetFocus()
         searchbnt = wx.Button(self.panel_search, label="Clear")
 
@@ -1666,6 +1959,8 @@ class MainWindow(wx.Frame):
 
         warningsizer.Add(self.bad_xml_btn, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT | wx.RIGHT, 3)
         warningsizer.Add(self.ancestry_btn, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT | wx.RIGHT, 3)
+        warningsizer.Add(self.timings_btn, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT | wx.RIGHT, 3)
+        warningsizer.Add(self.graph_btn, 0, wx.ALIGN_CENTER_VERTICAL | wx.LEFT | wx.RIGHT, 3)
         topsizer.Add(warningsizer, 0, wx.ALIGN_CENTER_HORIZONTAL | wx.LEFT, wx.RIGHT, 3)
         topsizer.Add(self.window_1, 1, wx.EXPAND | wx.FIXED_MINSIZE, 0)
 
@@ -1694,6 +1989,18 @@ class MainWindow(wx.Frame):
 
         self.Layout()
 
+        self._watcher = None
+        self._reloader = None
+        self._pending_changes: dict[str, str] = {}  # path of a xml file -> kind of change
+        self._start_watcher()
+        self._validators: list[BackgroundValidation] = []
+        self._start_validation()
+        self._searcher = BackgroundSearch(
+            lambda result: wx.CallAfter(self._on_search_result, result)
+        )
+        self._searcher.start()
+
+        self.Bind(wx.EVT_CLOSE, self.on_close)
         self.Bind(wx.EVT_LIST_ITEM_SELECTED, self.celb.on_clicked_event, self.celb)
         self.Bind(wx.EVT_BUTTON, self.on_reset_event, searchbnt)
         self.Bind(wx.EVT_TEXT, self.on_text_event, self.searchent)
@@ -1701,11 +2008,128 @@ class MainWindow(wx.Frame):
         self.Bind(wx.EVT_SEARCH_CANCEL, self.on_reset_event, self.searchent)
         self.bad_xml_btn.Bind(wx.EVT_BUTTON, self._on_bad_xml_clicked, self.bad_xml_btn)
         self.ancestry_btn.Bind(wx.EVT_BUTTON, self._on_ancestry_btn_clicked, self.ancestry_btn)
+        self.timings_btn.Bind(wx.EVT_BUTTON, self._on_timings_btn_clicked, self.timings_btn)
+        self.graph_btn.Bind(wx.EVT_BUTTON, self._on_graph_btn_clicked, self.graph_btn)
         self.bad_xml_btn.Bind(wx.EVT_ENTER_WINDOW, self._on_button_hover, self.bad_xml_btn)
         self.ancestry_btn.Bind(wx.EVT_ENTER_WINDOW, self._on_button_hover, self.ancestry_btn)
         self.bad_xml_btn.Bind(wx.EVT_LEAVE_WINDOW, self._on_button_hover, self.bad_xml_btn)
         self.ancestry_btn.Bind(wx.EVT_LEAVE_WINDOW, self._on_button_hover, self.ancestry_btn)
 
+    def _update_warning_buttons(self):
+        bbx = get_bigbagxml()
+        if bxa := bbx.amount():
+            self.bad_xml_btn.SetLabelText(f"{bxa} xml file{'s'[:bxa ^ 1]} failed validation")
+            self.bad_xml_btn.Show()
+        else:
+            self.bad_xml_btn.Hide()
+
+        if event_ancestry_errors.len > 1:
+            self.ancestry_btn.SetLabelText(
+                f"{event_ancestry_errors.len} trigger events coulnd't be found"
+            )
+            self.ancestry_btn.Show()
+        else:
+            self.ancestry_btn.Hide()
+
+    def _start_validation(self, xmlfiles=None):
+        xmlfiles = self._xmlfiles if xmlfiles is None else xmlfiles
+        if self._validation != VALIDATION_DEFERRED or not xmlfiles:
+            return
+        # Reloads validate their files while the first pass may still run.
+        self._validators = [v for v in self._validators if v.is_alive()]
+        validator = BackgroundValidation(
+            xmlfiles,
+            lambda xmlfile, errs: wx.CallAfter(self._on_file_validated, xmlfile, errs),
+            self._validation_cache,
+            backend=self._backend,
+        )
+        validator.start()
+        self._validators.append(validator)
+
+    def _on_file_validated(self, xmlfile, errs):
+        if not self:
+            return
+        bbx = get_bigbagxml()
+        bbx.discard(xmlfile)
+        if errs:
+            bbx.add_bad_xmlfile(errs[0], errs[1])
+        self._update_warning_buttons()
+        self.panel_1.Layout()
+
+    def _start_watcher(self):
+        if not self._watch or not self._cepaths:
+            return
+        self._watcher = ModuleWatcher(
+            self._cepaths, lambda changes: wx.CallAfter(self._on_files_changed, changes)
+        )
+        self._watcher.start()
+
+    def _on_files_changed(self, changes: list[file_change]):
+        ibucket = get_imgbucket()
+        for change in changes:
+            path = Path(change.path)
+            if path.suffix.lower() == ".png":
+                key = path.name.replace('.png', '')
+                if change.kind == DELETED:
+                    if str(ibucket.get(key)) == change.path:
+                        ibucket.pop(key)
+                else:
+                    ibucket[key] = path
+            else:
+                # The latest change of a file wins.
+                self._pending_changes.pop(change.path, None)
+                self._pending_changes[change.path] = change.kind
+        self._start_reload()
+
+    def _start_reload(self):
+        """Parse the changed files in the background, one reload at a time"""
+        if self._reloader or not self._pending_changes:
+            return
+        changes, self._pending_changes = self._pending_changes, {}
+        xmlchanged = [path for path, kind in changes.items() if kind != DELETED]
+        xmldeleted = [path for path, kind in changes.items() if kind == DELETED]
+        self._reloader = BackgroundReload(
+            xmlchanged,
+            lambda results: wx.CallAfter(self._on_files_parsed, xmldeleted, results),
+            self._cache,
+            self._validation,
+            self._backend,
+        )
+        self._reloader.start()
+
+    def _on_files_parsed(self, xmldeleted: list, results):
+        self._reloader = None
+        if not self:
+            return
+        if results is not None:
+            # The files in the order of a full load, new ones included.
+            self._xmlfiles = [
+                xmlfile for cepath in self._cepaths for xmlfile in cepath.events_files
+            ]
+            added, updated, removed = apply_reload(results, xmldeleted, self._xmlfiles)
+            logger.info(
+                "Reloaded %s files: %s added, %s updated, %s removed events.",
+                len(results) + len(xmldeleted), len(added), len(updated), len(removed),
+            )
+            self._start_validation([xmlfile for xmlfile, _ in results])
+            if self.celb.filtered:
+                self.build_constraints_and_populate(delay=0)
+            else:
+                self.celb.refresh_events()
+            self._update_warning_buttons()
+            self.panel_1.Layout()
+        self._start_reload()
+
+    def on_close(self, event):
+        if self._watcher:
+            self._watcher.stop()
+        self._searcher.stop()
+        for validator in self._validators:
+            validator.stop()
+        for validator in self._validators:
+            validator.join()
+        event.Skip()
+
     def cb_toggle_enable(self):
         if self.IsEnabled():
             self.Disable()
@@ -1716,7 +2140,7 @@ class MainWindow(wx.Frame):
         dialog = wx.ProgressDialog(
             "Validation",
             "Validating xml files...",
-            maximum=1,
+            maximum=PROGRESS_RANGE,
             style=wx.PD_APP_MODAL | wx.PD_AUTO_HIDE | wx.PD_ELAPSED_TIME | wx.PD_SMOOTH,
         )
         dialog.SetIcon(wx.ArtProvider.GetIcon('ICON'))
@@ -1729,38 +2153,32 @@ class MainWindow(wx.Frame):
             wx.MilliSleep(1)
             wx.Yield()
 
-        create_ebucket()
-        create_imgbucket()
-        init_index()
-        pulse("Reading config file...")
-        conf = wx.FileConfig(
-            APPNAME, localFilename=str(self._conffile), style=wx.CONFIG_USE_LOCAL_FILE
-        )
-        conf.SetPath("/general")
-        path_amount = conf.ReadInt("CeModulePathAmount")
-
-        xmlfiles = []
-        for n in range(path_amount):
-            try:
-                p = CePath(conf.Read("CeModulePath%i" % n))
-            except NotBannerLordModule as e:
-                logger.error(e)
-                continue
-            pulse("Populating xmlfiles to parse...")
-            xmlfiles.extend(p.events_files)
-            pulse("Populating images for module %s..." % p.name)
-            scan_for_images(str(p))
-        pulse("Init xsd file...")
-        init_xsdfile(conf.Read("CE_XSDFILE"))
-        pulse("Big Bad XML...")
-        init_bigbagxml()
+        def progress(p: load_progress):
+            # Reaching the maximum would auto hide the dialog before the ancestry is built.
+            value = PROGRESS_RANGE * p.bytes // p.total_bytes if p.total_bytes else 0
+            dialog.Update(min(value, PROGRESS_RANGE - 1), format_progress(p))
+            wx.Yield()
+
+        self._tracer = init_tracer()
+        with self._tracer.span("config"):
+            pulse("Reading config file...")
+            conf = wx.FileConfig(
+                APPNAME, localFilename=str(self._conffile), style=wx.CONFIG_USE_LOCAL_FILE
+            )
+            conf.SetPath("/general")
+            apply_settings(conf)
+            self._watch = conf.ReadBool("WatchModules", True)
         try:
-            process_module(xmlfiles, pulse)
+            loaded = load_collection(conf, pulse, progress)
         except Exception as e:
             logger.error(e)
             raise ModuleProcessingError from e
-        pulse("Creating events ancestry...")
-        errors = populate_children()
+        self._cepaths = loaded.cepaths
+        self._xmlfiles = loaded.xmlfiles
+        self._validation = loaded.validation
+        self._cache = loaded.cache
+        self._backend = loaded.backend
+        self._validation_cache = loaded.validation_cache
         dialog.Close()
 
     def on_reset_event(self, event):
@@ -1771,35 +2189,36 @@ class MainWindow(wx.Frame):
             self.indicessizer.Hide(widget)
             self.indicessizer.Remove(widget)
             self._indices = []
+        self._searcher.cancel()
         self.celb.populate()
         event.Skip()
 
-    def build_constraints_and_populate(self, with_search_value=True):
-        filterstr = []
-        constraints = []
-        if with_search_value:
-            indices = chain(self._indices, search.findall(self.searchent.Value))
-        else:
-            indices = self._indices
-        for ind in indices:
-            match ind.term if isinstance(ind, indice) else ind:
-                case ("text", value, ""):
-                    constraints.append((_filter_text, value))
-                case ("skill", value, ""):
-                    constraints.append((_filter_skillid, value))
-                case ("", "", value):
-                    filterstr.append(value)
-
-        ebucket = get_ebucket()
-        items = ebucket.values()
-        if constraints:
-            for c, value in constraints:
-                items = c(value, items)
-        if filterstr:
-            for string in filterstr:
-                items = list(filter(lambda x: string in x.name.value, items))
+    def build_constraints_and_populate(self, with_search_value=True, delay=None):
+        """Hand the query to the search thread, the list is updated by _on_search_result.
+
+        delay defaults to the debounce of keystrokes.
+        """
+        queries = [ind.term for ind in self._indices]
+        if with_search_value and self.searchent.Value.strip():
+            queries.append(self.searchent.Value)
+        if not queries:
+            self._searcher.cancel()
+            self.celb.populate()
+            return
+        self._searcher.submit(" AND ".join(f"({query})" for query in queries), delay)
 
-        self.celb.populate(list(items))
+    def _on_search_result(self, result: search_result):
+        if result.serial != self._searcher.serial:
+            return  # superseded while waiting for the main loop
+        if result.error:
+            logger.debug("Incomplete search query: %s", result.error)  # still being typed
+            return
+        self.celb.populate(result.events)
+        self._tracer.add(
+            make_span(
+                "search", CAT_UI, result.submitted, query=result.query, events=len(result.events)
+            )
+        )
 
     def on_remove_indice(self, event):
         i: indice = list(filter(lambda x: event.EventObject is x.button, self._indices))[0]
@@ -1812,14 +2231,23 @@ class MainWindow(wx.Frame):
         self.searchent.SetFocus()
         self.leftsizer.Layout()
         self.panel_search_indices.FitInside()
-        self.build_constraints_and_populate(with_search_value=False)
+        self.build_constraints_and_populate(with_search_value=False, delay=0)
 
     def on_text_enter_event(self, event):
-        for term in search.findall(self.searchent.Value):
-            lbl = SearchIndice(self.panel_search_indices, term)
-            iid = self.indicessizer.Add(lbl, 0, wx.EXPAND | wx.LEFT, 5)
-            self.Bind(wx.EVT_BUTTON, self.on_remove_indice, lbl.b)
-            self._indices.append(indice(iid, lbl.term, lbl.b))
+        if not (query := self.searchent.Value.strip()):
+            return
+        try:
+            parse(query)
+        except QuerySyntaxError as e:
+            dialog = wx.MessageDialog(
+                self, str(e), "Invalid search", style=wx.OK | wx.CENTER | wx.ICON_ERROR
+            )
+            dialog.ShowModal()
+            return
+        lbl = SearchIndice(self.panel_search_indices, query)
+        iid = self.indicessizer.Add(lbl, 0, wx.EXPAND | wx.LEFT, 5)
+        self.Bind(wx.EVT_BUTTON, self.on_remove_indice, lbl.b)
+        self._indices.append(indice(iid, lbl.term, lbl.b))
         self.leftsizer.Layout()
         self.panel_search_indices.FitInside()
         self.searchent.Clear()
@@ -1841,6 +2269,16 @@ class MainWindow(wx.Frame):
         x = AncestryDetails(self)
         x.Show()
 
+    def _on_timings_btn_clicked(self, evt):
+        x = LoadTimingsDetails(self, self._tracer)
+        x.Show()
+
+    def _on_graph_btn_clicked(self, evt):
+        with wx.BusyCursor():
+            report = get_report()
+        x = GraphReportDetails(self, report)
+        x.Show()
+
     def _on_button_hover(self, evt):
         obj: wx.Button = evt.GetEventObject()
         match evt.Entering(), evt.Leaving():
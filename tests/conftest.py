@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import pytest
+
+from tests.events import reset_collection
+
+
+@pytest.fixture
+def collection():
+    reset_collection()
+    yield
+    reset_collection()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Event files and collection state shared by the tests"""
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from pycestorieseditor import ceevents
+
+XSD = Path(__file__).parent / "data" / "events.xsd"
+
+
+def event_xml(name, triggers=(), text="", flags=("Captive",), skills=(), gold=None) -> str:
+    """A CEEvent element, with one option per triggered event"""
+    parts = [f"<CEEvent><Name>{escape(name)}</Name>"]
+    if text:
+        parts.append(f"<Text>{escape(text)}</Text>")
+    parts.append("<MultipleRestrictedListOfFlags>")
+    parts.extend(f"<RestrictedListOfFlags>{flag}</RestrictedListOfFlags>" for flag in flags)
+    parts.append("</MultipleRestrictedListOfFlags>")
+    if triggers:
+        parts.append("<Options>")
+        for order, trigger in enumerate(triggers):
+            parts.append(
+                f"<Option><Order>{order}</Order><MultipleRestrictedListOfConsequences>"
+                "<RestrictedListOfConsequences>StripPlayer</RestrictedListOfConsequences>"
+                f"</MultipleRestrictedListOfConsequences><OptionText>Option {order}</OptionText>"
+                f"<TriggerEventName>{escape(trigger)}</TriggerEventName></Option>"
+            )
+        parts.append("</Options>")
+    if gold is not None:
+        parts.append(f"<ReqGoldAbove>{gold}</ReqGoldAbove>")
+    if skills:
+        parts.append("<SkillsRequired>")
+        parts.extend(f'<SkillRequired Id="{skill}" Min="10"/>' for skill in skills)
+        parts.append("</SkillsRequired>")
+    parts.append("</CEEvent>")
+    return "".join(parts)
+
+
+def write_events(path: Path, *events: str) -> str:
+    """Write the given event_xml as a file of events, return its path"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = "\n".join(events)
+    path.write_text(
+        f'<?xml version="1.0" encoding="utf-8"?>\n<CEEvents>\n{document}\n</CEEvents>\n',
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+def reset_collection():
+    """Empty buckets, indexes, ancestry and errors, as a load starts with"""
+    ceevents.create_ebucket()
+    ceevents.create_imgbucket()
+    ceevents.init_index()
+    ceevents.init_bigbagxml()
+    ceevents.ancestry_instance.clear()
+    ceevents.event_ancestry_errors.clear()
+    ceevents.init_xsdfile(XSD)
+
+
+def load(xmlfiles) -> int:
+    """Full load of xmlfiles on the serial backend, return the amount of missing children"""
+    reset_collection()
+    ceevents.process_module(list(xmlfiles), backend="serial")
+    return ceevents.populate_children()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import random
+
+import pytest
+
+from pycestorieseditor import analytics
+from pycestorieseditor.analytics import (
+    ONLY_TRIGGERED,
+    analyze,
+    ends_story,
+    get_report,
+    strongly_connected,
+)
+from pycestorieseditor.ceevents import Ancestry, EventGraph, find_by_name, outbound_event
+from tests.events import event_xml, load, write_events
+
+
+def build(edges: dict[str, list[str]]) -> EventGraph:
+    ancestry = Ancestry()
+    for name in edges:
+        ancestry.register(name)
+    for name, targets in edges.items():
+        ancestry.set_children(
+            name, [outbound_event(target, n, None, None) for n, target in enumerate(targets)]
+        )
+    return ancestry.graph()
+
+
+def components(graph: EventGraph) -> set[frozenset[str]]:
+    return {frozenset(graph.names[eid] for eid in c) for c in strongly_connected(graph)}
+
+
+def brute_force(graph: EventGraph) -> set[frozenset[str]]:
+    """Events reaching each other, through the reachability of every event"""
+    reach = [analytics.reachable_from(graph, [eid]) for eid in range(len(graph))]
+    return {
+        frozenset(
+            graph.names[other]
+            for other in range(len(graph))
+            if reach[eid][other] and reach[other][eid]
+        )
+        for eid in range(len(graph))
+    }
+
+
+def test_hand_built():
+    graph = build(
+        {
+            "a": ["b"],
+            "b": ["c", "e"],
+            "c": ["a", "d"],
+            "d": ["d"],
+            "e": ["f"],
+            "f": ["e", "g"],
+            "g": [],
+        }
+    )
+    assert components(graph) == set(map(frozenset, ["abc", "d", "ef", "g"]))
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_graphs(seed):
+    rng = random.Random(seed)
+    names = [f"event{i}" for i in range(rng.randint(1, 40))]
+    graph = build({name: rng.sample(names, rng.randint(0, 3)) for name in names})
+    assert components(graph) == brute_force(graph)
+    # Reverse topological order: an edge never leads to a component found later.
+    order = {}
+    for position, component in enumerate(strongly_connected(graph)):
+        order.update(dict.fromkeys(component, position))
+    for eid in range(len(graph)):
+        assert all(order[target] <= order[eid] for target in graph.child_ids(eid))
+
+
+@pytest.mark.parametrize("loop", [False, True])
+def test_long_chain(loop):
+    # Far deeper than the recursion limit.
+    names = [f"event{i}" for i in range(20000)]
+    edges = {name: [target] for name, target in zip(names, names[1:])}
+    edges[names[-1]] = [names[0]] if loop else []
+    found = strongly_connected(build(edges))
+    assert len(found) == (1 if loop else len(names))
+
+
+@pytest.fixture
+def story(tmp_path, collection):
+    only = ("Captive", ONLY_TRIGGERED)
+    xmlfile = write_events(
+        tmp_path / "ModA" / "Events" / "story.xml",
+        event_xml("start", ["a"]),
+        event_xml("a", ["b"], flags=only),
+        event_xml("b", ["a", "c"], flags=only),
+        event_xml("c", ["d"], flags=only),
+        event_xml("d", ["c"], flags=only),
+        event_xml("orphan", ["start"], flags=only),
+        event_xml("dead_end", ["missing", "nowhere"]),
+        event_xml("self", ["self"], flags=only),
+    )
+    load([xmlfile])
+
+
+def test_analyze(story):
+    report = analyze()
+    assert report.events == 8
+    assert report.edges == 8
+    assert report.entries == 2
+    assert report.reachable == 6
+    assert report.unreachable == ["orphan", "self"]
+    assert report.orphans == ["orphan"]
+    assert report.dead_ends == ["dead_end"]
+    assert sorted(report.loops) == [["a", "b"], ["c", "d"], ["self"]]
+    assert len(report.loops[0]) == 2
+    # a and b exit to c, c and d never leave, nor does self.
+    closed = sorted(report.loops[position] for position in report.closed_loops)
+    assert closed == [["c", "d"], ["self"]]
+    lines = analytics.report_lines(report)
+    assert "Loop without exit: c, d" in lines
+    assert "Orphan event: orphan" in lines
+    assert "Dead end: dead_end" in lines
+
+
+# An option triggering no event, the story ends when it is picked.
+LEAVE = (
+    "<Option><Order>9</Order><MultipleRestrictedListOfConsequences>"
+    "<RestrictedListOfConsequences>StripPlayer</RestrictedListOfConsequences>"
+    "</MultipleRestrictedListOfConsequences><OptionText>Leave</OptionText></Option>"
+)
+
+
+def test_option_leaving_loop(tmp_path, collection):
+    load(
+        [
+            write_events(
+                tmp_path / "ModA" / "Events" / "loops.xml",
+                event_xml("open_a", ["open_b"]),
+                event_xml("open_b", ["open_a"]).replace("</Options>", LEAVE + "</Options>"),
+                event_xml("closed_a", ["closed_b"]),
+                event_xml("closed_b", ["closed_a", "closed_a"]),
+                event_xml("end"),
+            )
+        ]
+    )
+    assert [ends_story(find_by_name(name)) for name in ("open_a", "open_b", "end")] == [
+        False,
+        True,
+        True,
+    ]
+    report = analyze()
+    assert sorted(report.loops) == [["closed_a", "closed_b"], ["open_a", "open_b"]]
+    # open_b has an option triggering nothing, the story may leave that loop.
+    assert [report.loops[position] for position in report.closed_loops] == [
+        ["closed_a", "closed_b"]
+    ]
+
+
+def test_report_kept_until_change(story, tmp_path):
+    report = get_report()
+    assert get_report() is report
+    load([write_events(tmp_path / "ModA" / "Events" / "other.xml", event_xml("alone"))])
+    assert get_report() is not report
+    assert get_report().events == 1
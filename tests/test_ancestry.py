@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""The EventGraph built by Ancestry must hold the edges a plain dict of lists would."""
+import random
+
+import pytest
+
+from pycestorieseditor.ceevents import Ancestry, EventGraph, ancestry_edge, outbound_event
+
+
+class Model:
+    """Ancestry as a dict of the edges going out of each event, in registration order"""
+
+    def __init__(self):
+        self.edges: dict[str, list[outbound_event]] = {}
+
+    def register(self, name):
+        self.edges.setdefault(name, [])
+
+    def unregister(self, name) -> set[str]:
+        if self.edges.pop(name, None) is None:
+            return set()
+        parents = set()
+        for source, edges in self.edges.items():
+            if any(e.name == name for e in edges):
+                parents.add(source)
+                self.edges[source] = [e for e in edges if e.name != name]
+        return parents
+
+    def set_children(self, name, edges):
+        self.edges[name] = [e for e in edges if e.name in self.edges]
+
+    def out_edges(self, name) -> list[ancestry_edge]:
+        return [ancestry_edge(name, *e) for e in self.edges.get(name, ())]
+
+    def in_edges(self, name) -> list[ancestry_edge]:
+        return [
+            ancestry_edge(source, *e)
+            for source, edges in self.edges.items()
+            for e in edges
+            if e.name == name
+        ]
+
+
+def check(graph: EventGraph, model: Model):
+    assert graph.names == list(model.edges)
+    assert len(graph) == len(model.edges)
+    for name in model.edges:
+        out_edges, in_edges = model.out_edges(name), model.in_edges(name)
+        assert graph.edges(name) == out_edges
+        assert graph.in_edges(name) == in_edges
+        assert graph.children(name) == list(dict.fromkeys(e.target for e in out_edges))
+        assert graph.parents(name) == list(dict.fromkeys(e.source for e in in_edges))
+    # The reverse index covers every edge once.
+    assert len(graph.sources) == len(graph.targets) == graph.offsets[-1]
+    assert graph.roffsets[-1] == len(graph.targets)
+
+
+def random_edges(rng: random.Random, names: list[str]) -> list[outbound_event]:
+    return [
+        outbound_event(
+            rng.choice(names),
+            option,
+            rng.choice((None, "10", "EventWeight")),
+            rng.choice((None, "ReqGold", "ReqMorale")),
+        )
+        for option in range(rng.randint(0, 4))
+    ]
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_random_changes(seed):
+    rng = random.Random(seed)
+    names = [f"event{i}" for i in range(15)]
+    ancestry, model = Ancestry(), Model()
+    for _ in range(400):
+        name = rng.choice(names)
+        roll = rng.random()
+        if roll < 0.3:
+            ancestry.register(name)
+            model.register(name)
+        elif roll < 0.35:
+            assert ancestry.unregister(name) - {name} == model.unregister(name) - {name}
+        elif name in model.edges and roll < 0.85:
+            edges = random_edges(rng, names)
+            ancestry.set_children(name, edges)
+            model.set_children(name, edges)
+        elif name in model.edges:
+            ancestry.clear_children(name)
+            model.set_children(name, [])
+        # Reading now and then rebuilds after a batch of changes of any size.
+        if rng.random() < 0.2:
+            check(ancestry.graph(), model)
+    check(ancestry.graph(), model)
+
+
+def test_unregister_returns_parents():
+    ancestry = Ancestry()
+    for name in ("a", "b", "c"):
+        ancestry.register(name)
+    ancestry.set_children("a", [outbound_event("c", 0, None, None)])
+    ancestry.set_children("c", [outbound_event("c", 0, None, None)])
+    ancestry.graph()
+    # Pending edges count as well as the ones of the graph.
+    ancestry.set_children("b", [outbound_event("c", 0, None, None)])
+    assert ancestry.unregister("c") == {"a", "b"}
+    assert ancestry.unregister("c") == set()
+    graph = ancestry.graph()
+    assert graph.names == ["a", "b"]
+    assert not graph.targets and "c" not in ancestry
+
+
+def test_graph_frozen():
+    ancestry = Ancestry()
+    for name in ("a", "b"):
+        ancestry.register(name)
+    ancestry.set_children("a", [outbound_event("b", 0, "5", None)])
+    graph = ancestry.graph()
+    assert ancestry.graph() is graph
+    ancestry.set_children("a", [])
+    ancestry.register("c")
+    # A graph handed out is never modified, the next one replaces it.
+    assert graph.children("a") == ["b"]
+    assert graph.edges("a") == [ancestry_edge("a", "b", 0, "5", None)]
+    assert "c" not in graph
+    assert ancestry.graph() is not graph
+    assert ancestry.graph().children("a") == []
+
+
+def test_unknown_children_left_out():
+    ancestry = Ancestry()
+    ancestry.register("a")
+    ancestry.set_children("a", [outbound_event("missing", 0, None, None)])
+    assert ancestry.children("a") == []
+    assert ancestry.graph().children("missing") == []
+    assert not ancestry.get("a").is_graphable()
+    with pytest.raises(KeyError):
+        ancestry.get("missing")
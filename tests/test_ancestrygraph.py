@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import random
+
+import pytest
+
+from pycestorieseditor import ancestrygraph, ceevents
+from pycestorieseditor.ancestrygraph import (
+    BOTH,
+    CHILD_COLOR,
+    CYCLE_COLOR,
+    DOWN,
+    PARENT_COLOR,
+    ROOT_COLOR,
+    UP,
+    build_graph,
+    extract,
+)
+from tests.events import event_xml, load, write_events
+
+
+def loaded(tmp_path, edges: dict[str, list[str]]) -> ceevents.EventGraph:
+    events = [event_xml(name, targets) for name, targets in edges.items()]
+    load([write_events(tmp_path / "ModA" / "Events" / "events.xml", *events)])
+    return ceevents.ancestry_instance.graph()
+
+
+def within(edges: dict[str, list[str]], name: str, depth: int, direction: str) -> dict:
+    """Distance of the events up to depth hops away, by growing the set one hop at a time"""
+    down = {source: set(targets) & set(edges) for source, targets in edges.items()}
+    up = {target: {s for s, t in down.items() if target in t} for target in edges}
+    steps = {UP: [up], DOWN: [down], BOTH: [up, down]}[direction]
+    distances = {}
+    for step in steps:
+        reached = {name: 0}
+        for hop in range(1, depth + 1):
+            following = {other for eid in reached for other in step[eid]} - reached.keys()
+            reached.update(dict.fromkeys(following, hop))
+        for eid, hop in reached.items():
+            distances[eid] = min(hop, distances.get(eid, hop))
+    return distances
+
+
+def random_edges(seed: int) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    names = [f"event{i}" for i in range(rng.randint(5, 60))]
+    return {name: rng.sample(names + ["missing"], rng.randint(0, 3)) for name in names}
+
+
+@pytest.fixture
+def story(tmp_path, collection):
+    edges = {
+        "grandparent": ["parent"],
+        "parent": ["root", "sibling"],
+        "root": ["child", "loop"],
+        "loop": ["parent"],
+        "child": ["grandchild", "grandchild"],
+        "grandchild": [],
+        "sibling": [],
+    }
+    return loaded(tmp_path, edges)
+
+
+def test_depth_and_direction(story):
+    result = extract(story, "root", 1, BOTH)
+    assert result.nodes == ["root", "parent", "child", "loop"]
+    assert result.colors == {0: ROOT_COLOR, 1: PARENT_COLOR, 2: CHILD_COLOR, 3: CHILD_COLOR}
+    # Every edge between two of the events, loop going back to parent included.
+    assert sorted(result.edges) == [(0, 2), (0, 3), (1, 0), (3, 1)]
+    assert not result.truncated
+    # Loop is both a descendant and an ancestor two hops away.
+    result = extract(story, "root", 2, BOTH)
+    assert set(result.nodes) == {"root", "parent", "loop", "grandparent", "child", "grandchild"}
+    assert result.colors[result.nodes.index("loop")] == CYCLE_COLOR
+    assert "sibling" not in result.nodes
+    assert extract(story, "root", 2, UP).nodes == ["root", "parent", "grandparent", "loop"]
+    down = ["root", "child", "loop", "grandchild", "parent"]
+    assert extract(story, "root", 2, DOWN).nodes == down
+    assert extract(story, "grandchild", 3, DOWN).nodes == ["grandchild"]
+
+
+def test_edges_once(story):
+    # child triggers grandchild twice, drawn once.
+    result = extract(story, "child", 1, DOWN)
+    assert result.edges == [(0, 1)]
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("direction", [UP, DOWN, BOTH])
+def test_random(tmp_path, collection, seed, direction):
+    edges = random_edges(seed)
+    graph = loaded(tmp_path, edges)
+    for depth in (1, 2, 4):
+        name = random.Random(seed + depth).choice(list(edges))
+        expected = within(edges, name, depth, direction)
+        result = extract(graph, name, depth, direction)
+        assert result.nodes[0] == name
+        assert sorted(result.nodes) == sorted(expected)
+        nodes = set(result.nodes)
+        drawn = {(result.nodes[s], result.nodes[t]) for s, t in result.edges}
+        assert drawn == {(s, t) for s in nodes for t in edges[s] if t in nodes}
+        assert len(drawn) == len(result.edges)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5, 12])
+@pytest.mark.parametrize("direction", [UP, DOWN, BOTH])
+def test_truncated(tmp_path, collection, limit, direction):
+    # Every event triggers the next three, far more events than the limit within reach.
+    names = [f"event{i}" for i in range(100)]
+    edges = {name: names[n + 1:n + 4] for n, name in enumerate(names)}
+    graph = loaded(tmp_path, edges)
+    expected = within(edges, "event50", 5, direction)
+    result = extract(graph, "event50", 5, direction, limit)
+    assert result.truncated
+    assert len(result.nodes) == limit and result.nodes[0] == "event50"
+    # The closest events are the ones kept.
+    kept = [expected[name] for name in result.nodes]
+    dropped = [hop for name, hop in expected.items() if name not in result.nodes]
+    assert max(kept) <= min(dropped)
+    assert not extract(graph, "event50", 5, direction, len(expected)).truncated
+
+
+def test_max_nodes(tmp_path, collection):
+    names = [f"event{i}" for i in range(ancestrygraph.MAX_NODES + 10)]
+    graph = loaded(tmp_path, {"hub": names, **{name: [] for name in names}})
+    result = extract(graph, "hub", 1, DOWN)
+    assert result.truncated and len(result.nodes) == ancestrygraph.MAX_NODES
+    assert build_graph("hub", 1, DOWN) == result
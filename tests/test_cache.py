@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import os
+
+import pytest
+
+from pycestorieseditor.cache import CACHE_SUFFIX, LayoutCache, ParseCache
+
+RESULT = (["event"], False)
+
+
+@pytest.fixture
+def xsd(tmp_path):
+    path = tmp_path / "schema.xsd"
+    path.write_text("<schema/>", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def xmlfile(tmp_path):
+    path = tmp_path / "events.xml"
+    path.write_text("<CEEvents/>", encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path, xsd):
+    return ParseCache(xsd, path=tmp_path / "cache")
+
+
+def entries(cache):
+    return sorted(cache.path.glob("*" + CACHE_SUFFIX))
+
+
+def test_roundtrip(cache, xmlfile):
+    assert cache.get(xmlfile) is None
+    cache.put(xmlfile, RESULT)
+    assert cache.get(xmlfile) == RESULT
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_missing_file(cache, tmp_path):
+    assert cache.key(tmp_path / "missing.xml") is None
+    cache.put(tmp_path / "missing.xml", RESULT)
+    assert not entries(cache)
+
+
+def test_mtime_invalidates(cache, xmlfile):
+    cache.put(xmlfile, RESULT)
+    st = xmlfile.stat()
+    os.utime(xmlfile, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert cache.get(xmlfile) is None
+
+
+def test_size_invalidates(cache, xmlfile):
+    cache.put(xmlfile, RESULT)
+    st = xmlfile.stat()
+    xmlfile.write_text("<CEEvents></CEEvents>", encoding="utf-8")
+    os.utime(xmlfile, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert cache.get(xmlfile) is None
+
+
+def test_xsd_invalidates(tmp_path, xsd, xmlfile):
+    ParseCache(xsd, path=tmp_path / "cache").put(xmlfile, RESULT)
+    assert ParseCache(xsd, path=tmp_path / "cache").get(xmlfile) == RESULT
+    xsd.write_text("<schema></schema>", encoding="utf-8")
+    assert ParseCache(xsd, path=tmp_path / "cache").get(xmlfile) is None
+
+
+def test_salt_invalidates(tmp_path, xsd, xmlfile):
+    ParseCache(xsd, path=tmp_path / "cache", salt="wellformed").put(xmlfile, RESULT)
+    assert ParseCache(xsd, path=tmp_path / "cache").get(xmlfile) is None
+    assert ParseCache(xsd, path=tmp_path / "cache", salt="validation").get(xmlfile) is None
+    assert ParseCache(xsd, path=tmp_path / "cache", salt="wellformed").get(xmlfile) == RESULT
+
+
+@pytest.mark.parametrize(
+    "damage",
+    [
+        lambda data: data[:-1] + bytes([data[-1] ^ 0xFF]),  # payload altered
+        lambda data: data[:10],  # truncated header
+        lambda data: b"NOTCACHE" + data[8:],  # wrong magic
+        lambda data: data + b"\0",  # payload longer than recorded
+    ],
+)
+def test_corrupt_entry_dropped(cache, xmlfile, damage):
+    cache.put(xmlfile, RESULT)
+    (entry,) = entries(cache)
+    entry.write_bytes(damage(entry.read_bytes()))
+    assert cache.get(xmlfile) is None
+    assert not entry.exists()
+    assert cache.misses == 1
+
+
+def test_evict_least_recently_used(tmp_path, xsd):
+    xmlfiles = []
+    for n in range(6):
+        path = tmp_path / f"events{n}.xml"
+        path.write_text("<CEEvents/>", encoding="utf-8")
+        xmlfiles.append(path)
+    cache = ParseCache(xsd, path=tmp_path / "cache")
+    for n, path in enumerate(xmlfiles):
+        cache.put(path, ("x" * 1000, n))
+        entry = cache.path / (cache.key(path) + CACHE_SUFFIX)
+        os.utime(entry, ns=(n * 10**9, n * 10**9))
+    size = entries(cache)[0].stat().st_size
+    # The oldest entry becomes the most recently used one.
+    assert cache.get(xmlfiles[0]) == ("x" * 1000, 0)
+    assert cache.evict() == 0
+    assert ParseCache(xsd, path=tmp_path / "cache", max_size=size * 4).evict() == 3
+    kept = [n for n, path in enumerate(xmlfiles) if cache.get(path) is not None]
+    assert kept == [0, 4, 5]
+
+
+def test_clear(cache, xmlfile):
+    cache.put(xmlfile, RESULT)
+    cache.clear()
+    assert not entries(cache)
+
+
+def test_layout_cache(tmp_path):
+    cache = LayoutCache(path=tmp_path / "cache")
+    assert cache.path == tmp_path / "cache" / "layout"
+    assert "abc" not in cache and cache.get("abc") is None
+    cache.put("abc", RESULT)
+    assert "abc" in cache and cache.get("abc") == RESULT
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_layout_cache_evict(tmp_path):
+    cache = LayoutCache(path=tmp_path / "cache", max_size=1)
+    for key in ("a", "b"):
+        cache.put(key, RESULT)
+    assert cache.evict() == 2
+    assert not entries(cache)
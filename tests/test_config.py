@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import random
+
+import pytest
+
+from pycestorieseditor.config import SettingsFile
+
+
+def wx_escape(value: str) -> str:
+    """FilterOutValue of wxFileConfig, the escaping of the values it writes"""
+    if not value:
+        return value
+    quoted = value[0].isspace() or value[0] == '"'
+    special = {"\n": "n", "\r": "r", "\t": "t", "\\": "\\"}
+    if quoted:
+        special['"'] = '"'
+    escaped = "".join("\\" + special[c] if c in special else c for c in value)
+    return f'"{escaped}"' if quoted else escaped
+
+
+def settings(tmp_path, text: str) -> SettingsFile:
+    path = tmp_path / "settings.conf"
+    path.write_bytes(text.encode("utf-8"))
+    return SettingsFile(path)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "",
+        "plain",
+        r"C:\Program Files\Mount & Blade II Bannerlord\Modules\zCaptivityEvents",
+        "  leading spaces",
+        "trailing spaces  ",
+        '"quoted"',
+        'in "the" middle',
+        '"',
+        "tab\tnew\nline\rreturn",
+        "back\\slash\\",
+        "ünïcödé ; # = [x]",
+    ],
+)
+def test_wx_escaping(tmp_path, value):
+    conf = settings(tmp_path, f"[general]\nKey={wx_escape(value)}\n")
+    assert conf.Read("Key") == value
+
+
+def test_random_values(tmp_path):
+    rng = random.Random(0)
+    alphabet = ' ab"\\\t\n\r=;#[]é'
+    values = ["".join(rng.choices(alphabet, k=rng.randint(0, 12))) for _ in range(300)]
+    lines = "".join(f"Key{n}={wx_escape(value)}\n" for n, value in enumerate(values))
+    conf = settings(tmp_path, f"[general]\n{lines}")
+    assert [conf.Read(f"Key{n}") for n in range(len(values))] == values
+
+
+def test_unescape_as_wx(tmp_path):
+    conf = settings(
+        tmp_path,
+        "[general]\n"
+        # Unknown escapes and a trailing backslash are dropped.
+        "Unknown=a\\qb\\\n"
+        # Unescaped quotes of a quoted value are dropped, not the ones of an unquoted value.
+        'Quotes="a"b"\n'
+        'Unquoted=a"b"\n'
+        "Spaced   =   value\n",
+    )
+    assert conf.Read("Unknown") == "ab"
+    assert conf.Read("Quotes") == "ab"
+    assert conf.Read("Unquoted") == 'a"b"'
+    assert conf.Read("Spaced") == "value"
+
+
+def test_sections(tmp_path):
+    conf = settings(
+        tmp_path,
+        "Key=outside\n"
+        "; comment\n"
+        "[/general]\n"
+        "  # comment\n"
+        "Key=inside\n"
+        "[other]\n"
+        "Other=1\n",
+    )
+    assert conf.Read("Key") == "inside"
+    assert conf.Read("Other", "missing") == "missing"
+    assert conf.path == tmp_path / "settings.conf"
+
+
+@pytest.mark.parametrize(
+    "value,integer,boolean",
+    [
+        ("0", 0, False),
+        ("1", 1, True),
+        ("42", 42, True),
+        ("-3", -3, True),
+        (" 7 ", 7, True),
+        ("+5", 5, True),
+        # Not numbers to wx.FileConfig: the default is returned.
+        ("true", None, None),
+        ("yes", None, None),
+        ("1.5", None, None),
+        ("1_000", None, None),
+        ("", None, None),
+    ],
+)
+def test_read_int_bool(tmp_path, value, integer, boolean):
+    conf = settings(tmp_path, f"[general]\nKey={value}\n")
+    assert conf.ReadInt("Key", 99) == (99 if integer is None else integer)
+    assert conf.ReadBool("Key", True) is (True if boolean is None else boolean)
+    assert conf.ReadBool("Key", False) is (False if boolean is None else boolean)
+
+
+def test_missing_keys(tmp_path):
+    conf = settings(tmp_path, "[general]\n")
+    assert conf.Read("Missing") == ""
+    assert conf.Read("Missing", "default") == "default"
+    assert conf.ReadInt("Missing") == 0
+    assert conf.ReadBool("Missing") is False
+    assert conf.ReadBool("Missing", True) is True
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import random
+from array import array
+
+import pytest
+
+from pycestorieseditor import ceevents
+from pycestorieseditor.eventlist import COLUMNS, EventTable, RowTable
+from tests.events import event_xml, load, write_events
+
+
+@pytest.fixture
+def table(tmp_path, collection):
+    """Table of random events over two modules, with many equal values in every column"""
+    rng = random.Random(3)
+    names = [f"ev{rng.randint(0, 999):03d}_{i}" for i in range(80)]
+    xmlfiles = []
+    for module in ("ModB", "ModA"):
+        for filename in ("b.xml", "a.xml"):
+            events = [
+                event_xml(name, rng.sample(names + ["missing"], rng.randint(0, 3)))
+                for name in names[len(xmlfiles) * 20:len(xmlfiles) * 20 + 20]
+            ]
+            xmlfiles.append(write_events(tmp_path / module / "Events" / filename, *events))
+    load(xmlfiles)
+    return EventTable()
+
+
+def brute_force(table: EventTable, ids, column: int, ascending: bool) -> list[int]:
+    """ids sorted by the text of column, names breaking ties, all of it reversed if descending"""
+    values = table._columns()[column]
+    ordered = sorted(ids, key=lambda eid: (values[eid], table.names[eid]))
+    return ordered if ascending else ordered[::-1]
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+@pytest.mark.parametrize("column", range(len(COLUMNS)))
+def test_sort(table, column, ascending):
+    everything = table.all_ids()
+    assert list(table.sort(everything, column, ascending)) == brute_force(
+        table, everything, column, ascending
+    )
+    # A search result goes through the ranks rather than the cached order.
+    rng = random.Random(column)
+    for amount in (0, 1, 17, len(table) - 1):
+        ids = array("i", rng.sample(range(len(table)), amount))
+        assert list(table.sort(ids, column, ascending)) == brute_force(
+            table, ids, column, ascending
+        )
+
+
+def test_columns(table):
+    graph = ceevents.ancestry_instance.graph()
+    for eid, name in enumerate(table.names):
+        summary = ceevents.find_by_name(name)
+        assert table.text(eid, 0) == name
+        assert table.text(eid, 1) == ceevents.ce_module_name(summary.xmlfile)
+        assert table.text(eid, 3) == str(summary.options)
+        assert table.parents[eid] == len(set(graph.parents(name)))
+        assert table.children[eid] == len(set(graph.children(name)))
+        assert table.palette[table.categories[eid]] == summary.get_color()
+    assert table.is_current()
+    load([])
+    assert not table.is_current()
+
+
+def test_ids_of(table):
+    names = [table.names[5], "unknown", table.names[0], table.names[5]]
+    assert list(table.ids_of(names)) == [5, 0, 5]
+    assert list(table.ids_of([])) == []
+    assert [table.names[eid] for eid in table.ids_of(reversed(table.names))] == list(
+        reversed(table.names)
+    )
+
+
+def test_row_table():
+    rows = RowTable([("b", "2"), ("a", "2"), ("c", "1")])
+    assert list(rows.order()) == [0, 1, 2]
+    assert list(rows.order(0)) == [1, 0, 2]
+    assert list(rows.order(0, ascending=False)) == [2, 0, 1]
+    # Stable: equal values keep the given order.
+    assert list(rows.order(1)) == [2, 0, 1]
+    assert rows.longest(0) == "b"
+    assert RowTable([]).longest(0) == ""
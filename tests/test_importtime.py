@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Import time budget of the modules on the startup path.
+
+Each module is imported in a fresh interpreter with -X importtime, the best of a few runs is
+compared with its budget. CE_IMPORTTIME_SCALE multiplies the budgets, for slower machines.
+"""
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+RUNS = 3
+SCALE = float(os.getenv("CE_IMPORTTIME_SCALE") or 1.0)
+# Cumulative import time in milliseconds, measured on a modest laptop with some headroom.
+BUDGETS = {
+    "pycestorieseditor.ceevents": 500,
+    "pycestorieseditor.loader": 550,
+    "pycestorieseditor.__main__": 600,
+    "pycestorieseditor.wxui": 1500,
+}
+# Imported on first use only, they must not show up at import time.
+HEAVY = ("wx", "PIL", "matplotlib", "netgraph", "pygments")
+LAZY = {
+    "pycestorieseditor.ceevents": HEAVY,
+    "pycestorieseditor.loader": HEAVY,
+    "pycestorieseditor.__main__": HEAVY,
+    "pycestorieseditor.wxui": HEAVY[1:],
+}
+_line = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def importtime(module: str) -> tuple[float, set[str]]:
+    """Cumulative import time of module in ms, along with every module it imported"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import %s" % module],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    assert not proc.returncode, proc.stderr
+    cumulative, imported = None, set()
+    for match in _line.finditer(proc.stderr):
+        imported.add(match.group(3))
+        if match.group(3) == module:
+            cumulative = int(match.group(1)) / 1000
+    assert cumulative is not None, "%s was already imported" % module
+    return cumulative, imported
+
+
+@pytest.mark.parametrize("module", BUDGETS)
+def test_import_budget(module):
+    if module.endswith(".wxui"):
+        pytest.importorskip("wx")
+    runs = [importtime(module) for _ in range(RUNS)]
+    best = min(elapsed for elapsed, _ in runs)
+    assert best <= BUDGETS[module] * SCALE
+    eager = sorted(name for name in runs[0][1] if name.split(".")[0] in LAZY[module])
+    assert not eager
+
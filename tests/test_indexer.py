@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+from xml.etree import ElementTree
+
+import pytest
+
+from pycestorieseditor.indexer import (
+    INDEX_NAMES,
+    INDEXED,
+    compile_extractor,
+    empty_indexes,
+    extract,
+    index_event,
+    unindex_event,
+)
+from tests.events import event_xml
+
+
+def keys_of(document: str) -> dict[str, tuple[str, ...]]:
+    keys = extract(ElementTree.fromstring(document))
+    return {index: values for index, values in zip(INDEX_NAMES, keys) if values}
+
+
+def brute_force(document: str) -> dict[str, tuple[str, ...]]:
+    """The specs of INDEXED applied to every element of the event, wherever it is"""
+    found = {index: {} for index in INDEX_NAMES}
+    for element in ElementTree.fromstring(document).iter():
+        text = (element.text or "").strip()
+        for index, specs in INDEXED.items():
+            for spec in specs:
+                spec, _, constant = spec.partition("=")
+                tag, _, attribute = spec.partition("@")
+                if tag.endswith("*"):
+                    if element.tag.startswith(tag[:-1]) and text:
+                        found[index][f"{element.tag}={text}"] = None
+                elif element.tag != tag:
+                    continue
+                elif constant:
+                    found[index][constant] = None
+                elif value := (element.get(attribute, "").strip() if attribute else text):
+                    found[index][value] = None
+    return {index: tuple(values) for index, values in found.items() if values}
+
+
+EVENTS = [
+    event_xml("plain"),
+    event_xml("skilled", ["a", "b"], text="Some text", skills=["Charm", "Roguery"], gold=10),
+    event_xml("flags", flags=["Captive", "Random", "CanOnlyBeTriggeredByOtherEvent"]),
+    "<CEEvent><Name>menu</Name><MenuOptions><MenuOption><Order>0</Order>"
+    "<TriggerEventName>next</TriggerEventName></MenuOption></MenuOptions>"
+    "<TraitsRequired><TraitRequired Id='Mercy' Min='1'/></TraitsRequired>"
+    "<SoundName>scream</SoundName><BackgroundName>camp</BackgroundName>"
+    "<ReqHeroPartyHaveItem>sword</ReqHeroPartyHaveItem></CEEvent>",
+]
+
+
+@pytest.mark.parametrize("document", EVENTS)
+def test_extract_matches_brute_force(document):
+    assert keys_of(document) == brute_force(document)
+
+
+def test_extract_metadata():
+    keys = keys_of(EVENTS[1])
+    assert keys["skills"] == ("Charm", "Roguery")
+    assert keys["flags"] == ("Captive",)
+    assert keys["consequences"] == ("StripPlayer",)
+    assert keys["has"] == ("options", "triggers", "skills")
+    assert keys["requirements"] == ("ReqGoldAbove=10",)
+    keys = keys_of(EVENTS[3])
+    assert keys["traits"] == ("Mercy",)
+    assert keys["items"] == ("sword",)
+    assert keys["has"] == ("menuoptions", "triggers", "traits", "backgrounds")
+
+
+def test_extract_dedup():
+    document = event_xml(
+        "twice", ["a", "b", "a"], flags=["Captive", "Random", "Captive"], skills=["Charm"] * 3
+    )
+    keys = keys_of(document)
+    assert keys["skills"] == ("Charm",)
+    assert keys["flags"] == ("Captive", "Random")
+    assert keys["consequences"] == ("StripPlayer",)
+    assert keys["has"] == ("options", "triggers", "skills")
+
+
+def test_extract_strips_and_skips_empty():
+    keys = keys_of(
+        "<CEEvent><Name>blank</Name><SoundName>  scream \n</SoundName>"
+        "<BackgroundName>   </BackgroundName><SkillsRequired><SkillRequired Id=''/>"
+        "</SkillsRequired></CEEvent>"
+    )
+    assert keys == {"sounds": ("scream",), "has": ("backgrounds", "skills")}
+
+
+def test_extractor_compiled_once():
+    plan = compile_extractor()
+    assert compile_extractor() is plan
+    # Only the branches leading to an indexed value are walked.
+    assert "Name" not in plan.children and "Text" not in plan.children
+    assert "SkillRequired" in plan.children["SkillsRequired"].children
+
+
+def test_unknown_tags_ignored():
+    keys = keys_of(
+        "<CEEvent><Name>odd</Name><Unknown><SoundName>hidden</SoundName></Unknown>"
+        "<SoundName>shown</SoundName></CEEvent>"
+    )
+    assert keys == {"sounds": ("shown",)}
+
+
+def test_index_and_unindex():
+    indexes = empty_indexes()
+    first = extract(ElementTree.fromstring(EVENTS[1]))
+    second = extract(ElementTree.fromstring(event_xml("other", skills=["Charm"])))
+    index_event(indexes, "skilled", first)
+    index_event(indexes, "other", second)
+    assert indexes["skills"] == {"Charm": {"skilled", "other"}, "Roguery": {"skilled"}}
+    unindex_event(indexes, "skilled", first)
+    assert indexes["skills"] == {"Charm": {"other"}}
+    assert "options" not in indexes["has"]
+
+
+def test_snapshot_copy_on_write():
+    indexes = empty_indexes()
+    index_event(indexes, "a", extract(ElementTree.fromstring(event_xml("a", skills=["Charm"]))))
+    snapshot = indexes["skills"].snapshot()
+    index_event(indexes, "b", extract(ElementTree.fromstring(event_xml("b", skills=["Charm"]))))
+    assert snapshot == {"Charm": {"a"}}
+    assert indexes["skills"] == {"Charm": {"a", "b"}}
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import multiprocessing
+
+import pytest
+
+from pycestorieseditor import ceevents
+from pycestorieseditor.backends import (
+    BACKEND_AUTO,
+    BACKEND_PROCESS,
+    BACKEND_SERIAL,
+    BACKEND_THREAD,
+)
+from pycestorieseditor.cache import ParseCache
+from tests.events import XSD, event_xml, reset_collection, write_events
+
+
+@pytest.fixture
+def xmlfiles(tmp_path, collection):
+    return [
+        write_events(tmp_path / "a.xml", event_xml("start", ["end"])),
+        write_events(tmp_path / "b.xml", event_xml("end"), event_xml("bad", ["nowhere"])),
+    ]
+
+
+@pytest.fixture
+def module(tmp_path, collection):
+    """Files of a module, two of them invalid and one overriding the events of another"""
+    folder = tmp_path / "ModA" / "Events"
+    return [
+        write_events(
+            folder / "story.xml",
+            *(event_xml(f"story{i}", [f"story{i + 1}", "shared"]) for i in range(30)),
+            event_xml("story30", ["missing"]),
+        ),
+        write_events(folder / "shared.xml", event_xml("shared", ["story0"], text="first")),
+        write_events(folder / "bad.xml", event_xml("lost"), "<CEEvent><Bogus/></CEEvent>"),
+        write_events(folder / "override.xml", event_xml("shared", ["story5"], text="last")),
+        write_events(folder / "empty.xml"),
+    ]
+
+
+def loaded_state(xmlfiles, backend) -> tuple:
+    """What a load of xmlfiles on backend leaves behind"""
+    reset_collection()
+    errcount, used = ceevents.process_module(xmlfiles, backend=backend)
+    assert used == backend
+    missing = ceevents.populate_children()
+    graph = ceevents.ancestry_instance.graph()
+    events = {
+        name: (
+            summary.xmlfile,
+            summary.start,
+            summary.end,
+            sorted(graph.parents(name)),
+            sorted(graph.children(name)),
+        )
+        for name, summary in ceevents.get_ebucket().items()
+    }
+    bad = sorted(xmlfile for xmlfile, _ in ceevents.get_bigbagxml().bad_xml)
+    return errcount, missing, events, bad
+
+
+@pytest.mark.parametrize("backend", [BACKEND_PROCESS, BACKEND_THREAD, BACKEND_SERIAL])
+def test_backends_agree(module, backend, monkeypatch):
+    # Split the story file on the pools, whichever order the workers finish in.
+    monkeypatch.setattr(ceevents, "SPLIT_MIN_SIZE", 0)
+    expected = loaded_state(module, BACKEND_SERIAL)
+    errcount, _, events, bad = expected
+    assert errcount == 2 and bad == sorted([module[2], module[4]])
+    assert set(events) == {f"story{i}" for i in range(31)} | {"shared"}
+    assert events["shared"][0] == module[3] and events["shared"][4] == ["story5"]
+    assert loaded_state(module, backend) == expected
+
+
+def test_auto_backend_resolved(xmlfiles):
+    errcount, backend = ceevents.process_module(xmlfiles, backend=BACKEND_AUTO)
+    assert errcount == 0
+    # Two small files are not worth a pool.
+    assert backend == BACKEND_SERIAL
+    assert set(ceevents.get_ebucket()) == {"start", "end", "bad"}
+
+
+def test_backend_given(xmlfiles):
+    assert ceevents.process_module(xmlfiles, backend=BACKEND_THREAD) == (0, BACKEND_THREAD)
+
+
+def test_auto_backend_resolved_from_cache(xmlfiles, tmp_path):
+    cache = ParseCache(XSD, path=tmp_path / "cache")
+    ceevents.process_module(xmlfiles, cache=cache, backend=BACKEND_SERIAL)
+    errcount, backend = ceevents.process_module(xmlfiles, cache=cache, backend=BACKEND_AUTO)
+    assert cache.hits == len(xmlfiles)
+    assert (errcount, backend) == (0, BACKEND_SERIAL)
+
+
+@pytest.mark.parametrize("backend", [BACKEND_SERIAL, BACKEND_THREAD])
+def test_background_validation_backend(xmlfiles, tmp_path, backend):
+    bad = write_events(tmp_path / "c.xml", "<CEEvent><Name>odd</Name><Bogus/></CEEvent>")
+    results, done = {}, []
+    validator = ceevents.BackgroundValidation(
+        [*xmlfiles, bad], results.__setitem__, on_done=lambda: done.append(1), backend=backend
+    )
+    validator.start()
+    validator.join(10)
+    assert done
+    assert results[xmlfiles[0]] is False and results[xmlfiles[1]] is False
+    assert results[bad][0] == bad
+    # Neither backend starts worker processes.
+    assert not multiprocessing.active_children()
+
+
+def test_background_validation_stopped(xmlfiles):
+    results, done = {}, []
+    validator = ceevents.BackgroundValidation(
+        xmlfiles, results.__setitem__, on_done=lambda: done.append(True), backend=BACKEND_SERIAL
+    )
+    validator.stop()
+    validator.start()
+    validator.join(10)
+    assert not results and not done
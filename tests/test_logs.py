@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import logging
+import queue
+import threading
+
+import pytest
+
+from pycestorieseditor.logs import DroppingQueueHandler, parse_level, worker_logging
+
+
+def record(msg: str) -> logging.LogRecord:
+    return logging.makeLogRecord({"name": "test", "levelno": logging.INFO, "msg": msg})
+
+
+def test_full_queue_drops():
+    logqueue = queue.Queue(2)
+    handler = DroppingQueueHandler(logqueue)
+    for n in range(5):
+        # A blocking put would never return, nothing drains the queue.
+        worker = threading.Thread(target=handler.handle, args=(record(f"record {n}"),))
+        worker.start()
+        worker.join(1)
+        assert not worker.is_alive()
+    assert handler.dropped == 3
+    assert [logqueue.get_nowait().msg for _ in range(2)] == ["record 0", "record 1"]
+
+
+def test_dropped_records_reported():
+    logqueue = queue.Queue(2)
+    handler = DroppingQueueHandler(logqueue)
+    for n in range(4):
+        handler.handle(record(f"record {n}"))
+    logqueue.get_nowait()
+    # The notice takes the room left, the record following it is dropped in turn.
+    handler.handle(record("record 4"))
+    notice = logqueue.queue[-1]
+    assert notice.levelno == logging.WARNING
+    assert notice.getMessage() == "2 log records dropped, the log queue was full."
+    assert handler.dropped == 1
+    logqueue.queue.clear()
+    handler.handle(record("record 5"))
+    assert [r.getMessage() for r in logqueue.queue] == [
+        "1 log records dropped, the log queue was full.",
+        "record 5",
+    ]
+    assert handler.dropped == 0
+
+
+def test_worker_logging_disabled():
+    with worker_logging(False) as logqueue:
+        assert logqueue is None
+
+
+@pytest.mark.parametrize(
+    "level,expected",
+    [
+        ("debug", logging.DEBUG),
+        (" Warning ", logging.WARNING),
+        ("15", 15),
+        (30, 30),
+        ("loud", logging.INFO),
+    ],
+)
+def test_parse_level(level, expected):
+    assert parse_level(level) == expected
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+from pathlib import Path
+from xml.etree import ElementTree
+
+import pytest
+
+from pycestorieseditor import ceevents
+from pycestorieseditor.ceevents_template import Ceevents
+from tests.events import event_xml, load, write_events
+
+EVENTS = (
+    event_xml("first", ["second"], text="Night falls.", gold=10),
+    event_xml("second", ["first", "third"], text="A river", skills=("Charm",)),
+    event_xml("third", text="Ünïcode & <escaped>"),
+)
+
+
+@pytest.fixture
+def xmlfile(tmp_path, collection):
+    xmlfile = write_events(tmp_path / "events.xml", *EVENTS)
+    load([xmlfile])
+    yield xmlfile
+    ceevents._materialize.cache_clear()
+
+
+def eager(xmlfile) -> dict:
+    """Every event of xmlfile, parsed from the whole document at once"""
+    root = ElementTree.fromstring(Path(xmlfile).read_bytes())
+    events = ceevents.get_parser().parse(root, Ceevents).ceevent
+    for ceevent in events:
+        ceevent.xmlfile = xmlfile
+    return {ceevent.name.value: ceevent for ceevent in events}
+
+
+def test_matches_eager_parse(xmlfile):
+    expected = eager(xmlfile)
+    assert set(expected) == {"first", "second", "third"}
+    for name, ceevent in expected.items():
+        assert ceevents.materialize(name) == ceevent
+    assert ceevents.materialize("missing") is None
+
+
+def test_span_is_event_source(xmlfile):
+    data = Path(xmlfile).read_bytes()
+    for source in EVENTS:
+        name = ElementTree.fromstring(source).findtext("Name")
+        summary = ceevents.find_by_name(name)
+        source = source.encode("utf-8")
+        assert data[summary.start:summary.end] == source
+        assert ceevents._read_span(xmlfile, summary.start, summary.end) == source
+        assert ceevents.read_event_source(summary) == source
+
+
+def test_edited_in_place(xmlfile):
+    summary = ceevents.find_by_name("second")
+    # Same length, the span still holds the event: the bytes on disk are returned.
+    Path(xmlfile).write_bytes(Path(xmlfile).read_bytes().replace(b"A river", b"A creek"))
+    source = ceevents.read_event_source(summary)
+    assert b"A creek" in source and b"A river" not in source
+
+
+def test_moved(xmlfile):
+    summary = ceevents.find_by_name("second")
+    moved = event_xml("second", text="Rewritten")
+    write_events(Path(xmlfile), event_xml("new", text="x" * 50), EVENTS[0], moved)
+    assert ceevents.read_event_source(summary) == moved.encode("utf-8")
+    assert ceevents.materialize("second").text.value == "Rewritten"
+
+
+@pytest.mark.parametrize("cut", ["empty", "before", "within"])
+def test_truncated(xmlfile, cut):
+    summary = ceevents.find_by_name("third")
+    size = {"empty": 0, "before": summary.start, "within": summary.end - 10}[cut]
+    with open(xmlfile, "r+b") as fh:
+        fh.truncate(size)
+    # Whatever is left of the file, nothing from the former span is handed out.
+    with pytest.raises((ceevents.EventNotFound, ElementTree.ParseError)):
+        ceevents.read_event_source(summary)
+    assert ceevents.materialize("third") is None
+
+
+def test_removed(xmlfile):
+    summary = ceevents.find_by_name("third")
+    write_events(Path(xmlfile), *EVENTS[:2])
+    with pytest.raises(ceevents.EventNotFound):
+        ceevents.read_event_source(summary)
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import random
+from collections import namedtuple
+
+import pytest
+
+from pycestorieseditor import query
+from pycestorieseditor.query import (
+    And,
+    Context,
+    Node,
+    Not,
+    Or,
+    QuerySyntaxError,
+    SearchCancelled,
+    Snapshot,
+    parse,
+    search,
+)
+from tests.events import event_xml, load, write_events
+
+SKILLS = ("Charm", "Roguery", "Riding")
+FLAGS = ("Captive", "Random", "CanOnlyBeTriggeredByOtherEvent")
+WORDS = ("camp", "river", "night", "market")
+
+spec = namedtuple("spec", ["name", "text", "skills", "flags", "gold", "triggers", "module"])
+
+
+@pytest.fixture(scope="module")
+def specs(tmp_path_factory):
+    """Random events over two modules, loaded once for the whole module"""
+    rng = random.Random(1)
+    names = [f"ev{i:02d}_{rng.choice(WORDS)}" for i in range(60)]
+    specs = {}
+    for name in names:
+        specs[name] = spec(
+            name,
+            " ".join(rng.sample(WORDS, rng.randint(0, 2))),
+            tuple(rng.sample(SKILLS, rng.randint(0, 2))),
+            tuple(rng.sample(FLAGS, rng.randint(1, 2))),
+            rng.choice((None, 10, 50, 100)),
+            tuple(rng.sample(names + ["missing"], rng.randint(0, 3))),
+            rng.choice(("ModA", "ModB")),
+        )
+    root = tmp_path_factory.mktemp("query")
+    xmlfiles = []
+    for module in ("ModA", "ModB"):
+        events = [
+            event_xml(s.name, s.triggers, s.text, s.flags, s.skills, s.gold)
+            for s in specs.values()
+            if s.module == module
+        ]
+        xmlfiles.append(write_events(root / module / "Events" / "events.xml", *events))
+    load(xmlfiles)
+    yield specs
+    load([])
+
+
+def children(specs, s):
+    return [t for t in s.triggers if t in specs]
+
+
+def compare_gold(op: str, gold: int):
+    compare = query.COMPARISONS[op]
+    return lambda specs, s: s.gold is not None and compare(s.gold, gold)
+
+
+# Terms of the random queries and what they match, given the specs of every event.
+TERMS = [
+    *((f"skill:{skill}", lambda specs, s, skill=skill: skill in s.skills) for skill in SKILLS),
+    *((f"flag:{flag}", lambda specs, s, flag=flag: flag in s.flags) for flag in FLAGS),
+    *((f"text:{word}", lambda specs, s, word=word: word in s.text) for word in WORDS),
+    *((word, lambda specs, s, word=word: word in s.name) for word in WORDS),
+    *(
+        (f"ReqGoldAbove{op}{gold}", compare_gold(op, gold))
+        for op in query.COMPARISONS
+        for gold in (10, 50)
+    ),
+    ("module:ModA", lambda specs, s: s.module == "ModA"),
+    ("file:modb/events", lambda specs, s: s.module == "ModB"),
+    ("has:options", lambda specs, s: bool(s.triggers)),
+    ("has:skills", lambda specs, s: bool(s.skills)),
+    ("has:children", lambda specs, s: bool(children(specs, s))),
+    (
+        "has:parents",
+        lambda specs, s: any(s.name in children(specs, p) for p in specs.values()),
+    ),
+    ("ev1", lambda specs, s: "ev1" in s.name),
+]
+
+
+def random_query(rng: random.Random, depth: int = 0):
+    """Query string and its predicate"""
+    roll = rng.random()
+    if depth > 2 or roll < 0.4:
+        return rng.choice(TERMS)
+    if roll < 0.55:
+        text, match = random_query(rng, depth + 1)
+        return f"NOT {text}", lambda specs, s: not match(specs, s)
+    items = [random_query(rng, depth + 1) for _ in range(rng.randint(2, 3))]
+    if roll < 0.8:
+        joiner = rng.choice((" ", " AND "))
+        return (
+            "(" + joiner.join(text for text, _ in items) + ")",
+            lambda specs, s: all(match(specs, s) for _, match in items),
+        )
+    return (
+        "(" + " OR ".join(text for text, _ in items) + ")",
+        lambda specs, s: any(match(specs, s) for _, match in items),
+    )
+
+
+def brute_force(specs, match) -> set[str]:
+    return {name for name, s in specs.items() if match(specs, s)}
+
+
+@pytest.mark.parametrize("text,match", TERMS, ids=[text for text, _ in TERMS])
+def test_term(specs, text, match):
+    assert set(search(text)) == brute_force(specs, match)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_queries(specs, seed):
+    rng = random.Random(seed)
+    snapshot = Snapshot()
+    for _ in range(60):
+        text, match = random_query(rng)
+        expected = brute_force(specs, match)
+        assert set(search(text)) == expected, text
+        assert set(search(text, snapshot)) == expected, text
+
+
+def test_related(specs):
+    name = next(s.name for s in specs.values() if children(specs, s))
+    assert set(search(f"parent:{name}")) == set(children(specs, specs[name]))
+    assert set(search(f"child:{name}")) == {
+        s.name for s in specs.values() if name in children(specs, s)
+    }
+
+
+def test_empty_query(specs):
+    assert set(search("")) == set(specs)
+    assert set(search("   ")) == set(specs)
+
+
+def test_precedence():
+    assert repr(parse("a OR b c")) == "(names:'a' OR (names:'b' AND names:'c'))"
+    assert repr(parse("NOT a b")) == "(NOT names:'a' AND names:'b')"
+    assert repr(parse("NOT (a OR b)")) == "NOT (names:'a' OR names:'b')"
+    assert repr(parse('text:"fine whisper" ReqGoldAbove >= 10')) == (
+        "(text:'fine whisper' AND ReqGoldAbove>=10)"
+    )
+    assert repr(parse("Skill:Charm")) == "skills:'Charm'"
+
+
+@pytest.mark.parametrize(
+    "text,message,position",
+    [
+        ("(skill:Charm", "Missing ')'", 0),
+        ("a )", "Unexpected ')'", 2),
+        ("a AND", "Unexpected end of query", 5),
+        ("NOT", "Unexpected end of query", 3),
+        ("OR a", "Missing term before OR", 0),
+        ("a AND OR b", "Missing term before OR", 6),
+        ('text:"fine', "Unterminated quote", 5),
+        ('a  "fine', "Unterminated quote", 3),
+        ("skill:", "Missing value after skill:", 0),
+        ("colour:red", "Unknown field 'colour'", 0),
+        ("has:nothing", "has: takes one of", 0),
+    ],
+)
+def test_syntax_error(text, message, position):
+    with pytest.raises(QuerySyntaxError) as error:
+        parse(text)
+    assert message in str(error.value)
+    assert error.value.position == position
+
+
+class Probe(Node):
+    """Term of a given cost and result, recording its evaluation"""
+
+    def __init__(self, cost: int, names: set[str], log: list):
+        self._cost = cost
+        self.names = names
+        self.log = log
+
+    def __repr__(self):
+        return f"probe{self._cost}"
+
+    def cost(self, ctx):
+        return self._cost
+
+    def evaluate(self, ctx):
+        self.log.append(self._cost)
+        return self.names
+
+
+@pytest.fixture
+def ctx():
+    return Context({name: None for name in "abcdef"}, {}, {})
+
+
+def test_and_runs_cheapest_first(ctx):
+    log = []
+    node = And([Probe(5, {"a", "b", "c"}, log), Probe(1, {"b", "c"}, log), Probe(3, {"c"}, log)])
+    assert node.evaluate(ctx) == {"c"}
+    assert log == [1, 3, 5]
+    assert node.cost(ctx) == 1
+
+
+def test_and_stops_once_empty(ctx):
+    log = []
+    node = And([Probe(2, {"a"}, log), Probe(1, {"b"}, log), Probe(3, {"a", "b"}, log)])
+    assert node.evaluate(ctx) == set()
+    assert log == [1, 2]
+
+
+def test_and_negations_last(ctx):
+    log = []
+    node = And([Not(Probe(0, {"a"}, log)), Probe(4, {"a", "b", "c"}, log)])
+    assert node.evaluate(ctx) == {"b", "c"}
+    assert log == [4, 0]
+    # Only negations: taken from every event.
+    assert And([Not(Probe(1, {"a", "b"}, log))]).evaluate(ctx) == set("cdef")
+
+
+def test_not_or_cost(ctx):
+    log = []
+    assert Not(Probe(2, {"a", "b"}, log)).cost(ctx) == 4
+    assert Not(Probe(2, {"a", "b"}, log)).evaluate(ctx) == set("cdef")
+    assert Or([Probe(2, {"a"}, log), Probe(3, {"b"}, log)]).cost(ctx) == 5
+    assert Or([Probe(5, {"a"}, log), Probe(3, {"b"}, log)]).cost(ctx) == 6
+    assert Or([Probe(2, {"a"}, log), Probe(3, {"a", "b"}, log)]).evaluate(ctx) == {"a", "b"}
+
+
+def test_cancelled(ctx):
+    ctx.cancelled = lambda: True
+    with pytest.raises(SearchCancelled):
+        Or([Probe(1, {"a"}, []), Probe(1, {"b"}, [])]).evaluate(ctx)
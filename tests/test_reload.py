@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+"""Reloading files must leave the collection as a full load of the new files would."""
+import random
+
+import pytest
+
+from pycestorieseditor import ceevents
+from pycestorieseditor.indexer import INDEX_NAMES
+from tests.events import event_xml, load, write_events
+
+WORDS = ("camp", "river", "night", "market")
+
+
+def state() -> dict:
+    """Everything a load fills, in a comparable form"""
+    bucket = ceevents.get_ebucket()
+    indexes = ceevents.get_indexes()
+    graph = ceevents.ancestry_instance.graph()
+    return {
+        "bucket": dict(bucket),
+        "shadowed": {
+            name: set(definitions) for name, definitions in ceevents.shadowed.items()
+        },
+        "graph": set(graph.names),
+        "edges": sorted(edge for name in graph.names for edge in graph.edges(name)),
+        "errors": sorted(ceevents.event_ancestry_errors),
+        "indexes": {
+            index: {value: set(names) for value, names in indexes[index].items()}
+            for index in INDEX_NAMES
+        },
+        "text": {word: indexes['text'].search(word) for word in WORDS},
+        "names": {name: indexes['names'].search(name) for name in bucket},
+    }
+
+
+@pytest.fixture
+def modules(tmp_path, collection):
+    """Two modules, the second overriding events of the first"""
+    a1 = write_events(
+        tmp_path / "ModA" / "Events" / "a1.xml",
+        event_xml("start", ["shared", "ghost"], text="Camp at night"),
+        event_xml("shared", ["start"], text="River of the first module", skills=["Charm"]),
+        event_xml("only_a", ["shared2"]),
+    )
+    a2 = write_events(
+        tmp_path / "ModA" / "Events" / "a2.xml",
+        event_xml("shared2", ["only_a"], text="Market", gold=10),
+    )
+    b1 = write_events(
+        tmp_path / "ModB" / "Events" / "b1.xml",
+        event_xml("shared", ["only_b", "phantom"], text="River of the second module"),
+        event_xml("shared2", ["shared"], skills=["Roguery"]),
+        event_xml("only_b", ["start", "ghost"], text="Night market"),
+    )
+    return tmp_path, [a1, a2, b1]
+
+
+def reload_and_compare(changed, deleted, xmlfiles):
+    incremental = ceevents.reload_files(changed, deleted, xmlfiles)
+    reloaded = state()
+    before = set(reloaded["bucket"])
+    load(xmlfiles)
+    assert reloaded == state()
+    return incremental, before
+
+
+def test_override_order(modules):
+    _, xmlfiles = modules
+    load(xmlfiles)
+    bucket = ceevents.get_ebucket()
+    assert bucket["shared"].xmlfile == xmlfiles[2]
+    assert bucket["shared2"].xmlfile == xmlfiles[2]
+    assert set(ceevents.shadowed["shared"]) == {xmlfiles[0]}
+    # Merged in reverse, the last file still wins.
+    load(reversed(xmlfiles))
+    assert ceevents.get_ebucket()["shared"].xmlfile == xmlfiles[0]
+
+
+def test_delete_overriding_file(modules):
+    _, (a1, a2, b1) = modules
+    load([a1, a2, b1])
+    (added, updated, removed), _ = reload_and_compare([], [b1], [a1, a2])
+    assert ceevents.get_ebucket()["shared"].xmlfile == a1
+    assert (added, updated, removed) == (set(), {"shared", "shared2"}, {"only_b"})
+
+
+def test_change_overriding_file(modules):
+    tmp_path, (a1, a2, b1) = modules
+    load([a1, a2, b1])
+    write_events(
+        tmp_path / "ModB" / "Events" / "b1.xml",
+        event_xml("only_b", ["shared", "new"]),
+        event_xml("new", ["shared2"], text="A camp by the river"),
+    )
+    (added, updated, removed), _ = reload_and_compare([b1], [], [a1, a2, b1])
+    assert (added, removed) == ({"new"}, set())
+    assert {"shared", "shared2", "only_b"} <= updated
+
+
+def test_change_overridden_file(modules):
+    tmp_path, (a1, a2, b1) = modules
+    load([a1, a2, b1])
+    write_events(
+        tmp_path / "ModA" / "Events" / "a1.xml",
+        event_xml("start", ["shared"], text="Camp"),
+        event_xml("shared", [], text="Rewritten, still overridden"),
+        event_xml("phantom", ["only_a"]),
+    )
+    (added, updated, removed), _ = reload_and_compare([a1], [], [a1, a2, b1])
+    assert ceevents.get_ebucket()["shared"].xmlfile == b1
+    assert (added, removed) == ({"phantom"}, {"only_a"})
+    assert "shared" not in updated
+
+
+def test_new_file_overrides(modules):
+    tmp_path, (a1, a2, b1) = modules
+    load([a1, a2, b1])
+    b2 = write_events(
+        tmp_path / "ModB" / "Events" / "b2.xml",
+        event_xml("shared", ["ghost"]),
+        event_xml("ghost", []),
+    )
+    reload_and_compare([b2], [], [a1, a2, b1, b2])
+    assert ceevents.get_ebucket()["shared"].xmlfile == b2
+
+
+def test_new_file_ranked_first(modules):
+    tmp_path, (a1, a2, b1) = modules
+    load([a1, a2, b1])
+    a0 = write_events(tmp_path / "ModA" / "Events" / "a0.xml", event_xml("shared2", ["ghost"]))
+    reload_and_compare([a0], [], [a0, a1, a2, b1])
+    assert ceevents.get_ebucket()["shared2"].xmlfile == b1
+
+
+def test_delete_every_definition(modules):
+    _, (a1, a2, b1) = modules
+    load([a1, a2, b1])
+    (added, updated, removed), _ = reload_and_compare([], [a1, b1], [a2])
+    assert removed == {"start", "shared", "only_a", "only_b"}
+    assert updated == {"shared2"}
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_edits(tmp_path, collection, seed):
+    """Sequences of edits to files sharing event names, reloaded one after the other then
+    checked against a full load"""
+    rng = random.Random(seed)
+    names = [f"event{n}" for n in range(30)]
+
+    def write(path):
+        events = [
+            event_xml(name, rng.sample(names + ["missing"], rng.randrange(3)), rng.choice(WORDS))
+            for name in rng.sample(names, rng.randrange(1, 8))
+        ]
+        return write_events(path, *events)
+
+    paths = [tmp_path / f"Mod{n % 3}" / "Events" / f"f{n}.xml" for n in range(8)]
+    order = [str(path) for path in paths]
+    present = [write(path) for path in paths[:6]]
+    load(present)
+    for _ in range(25):
+        path = rng.choice(paths)
+        if str(path) in present and rng.random() < 0.3:
+            present.remove(str(path))
+            path.unlink()
+            changed, deleted = [], [str(path)]
+        else:
+            if str(path) not in present:
+                present.append(str(path))
+                present.sort(key=order.index)
+            changed, deleted = [write(path)], []
+        ceevents.reload_files(changed, deleted, list(present))
+    reload_and_compare([], [], list(present))
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import os
+import random
+from pathlib import Path
+
+import pytest
+
+from pycestorieseditor import ceevents
+from pycestorieseditor.backends import BACKEND_SERIAL, BACKEND_THREAD
+from pycestorieseditor.ceevents import PartialResults, process_file, process_part, split_file
+from tests.events import event_xml, write_events
+
+INVALID = "<CEEvent><Name>odd</Name><Bogus/></CEEvent>"
+
+
+def events(amount: int) -> list[str]:
+    rng = random.Random(amount)
+    return [
+        event_xml(f"event{i}", [f"event{i + 1}"], text="word " * rng.randint(0, 40))
+        for i in range(amount)
+    ]
+
+
+@pytest.fixture
+def xmlfile(tmp_path, collection):
+    return write_events(tmp_path / "events.xml", *events(40))
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    """Split every file among four workers, whatever its size"""
+    monkeypatch.setattr(ceevents, "SPLIT_MIN_SIZE", 0)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    return 4
+
+
+def reassemble(tasks) -> tuple:
+    """Result of the whole file, the parts being processed in any order"""
+    tasks = list(tasks)
+    random.Random(0).shuffle(tasks)
+    partials, results = PartialResults(), []
+    for task in tasks:
+        result = partials.add(task, process_part(task))
+        assert (result is None) == (task is not tasks[-1])
+        results.append(result)
+    return results[-1]
+
+
+@pytest.mark.parametrize("parts", [2, 3, 4, 7])
+def test_split_file(xmlfile, parts):
+    size = os.path.getsize(xmlfile)
+    tasks = split_file(xmlfile, size, parts)
+    assert 1 < len(tasks) <= parts
+    assert [task.part for task in tasks] == list(range(len(tasks)))
+    assert all(task.parts == len(tasks) for task in tasks)
+    # The parts follow each other, from the first event to the end of the last one.
+    spans = list(ceevents.iter_event_spans(Path(xmlfile).read_bytes()))
+    starts = {start for start, _ in spans}
+    assert tasks[0].start == tasks[0].head == spans[0][0]
+    assert tasks[-1].end == tasks[-1].tail == spans[-1][1]
+    for task, following in zip(tasks, tasks[1:]):
+        assert task.end == following.start and following.start in starts
+
+
+def test_parts_reassemble(xmlfile, workers):
+    whole, errs = process_file(xmlfile)
+    assert not errs and len(whole) == 40
+    tasks = split_file(xmlfile, os.path.getsize(xmlfile), workers)
+    assert len(tasks) == workers
+    # Same summaries, with the byte offsets of the events in the whole file.
+    assert reassemble(tasks) == (whole, False)
+
+
+def test_part_error_marks_file(tmp_path, workers, collection):
+    source = events(40)
+    source[25] = INVALID
+    xmlfile = write_events(tmp_path / "events.xml", *source)
+    tasks = split_file(xmlfile, os.path.getsize(xmlfile), workers)
+    assert sum(bool(process_part(task)[1]) for task in tasks) == 1
+    bucket, errs = reassemble(tasks)
+    assert bucket == [] and errs[0] == xmlfile
+
+
+def test_schedule(tmp_path, workers, collection):
+    big = write_events(tmp_path / "big.xml", *events(80))
+    small = [write_events(tmp_path / f"small{i}.xml", *events(2)) for i in range(6)]
+    batches = ceevents.schedule([*small, big], workers)
+    assert len(batches) > 1
+    tasks = [task for batch in batches for task in batch]
+    assert [task.size for task in tasks] == sorted((task.size for task in tasks), reverse=True)
+    parts = [task for task in tasks if task.xmlfile == big]
+    assert len(parts) == workers
+    assert sorted(task.xmlfile for task in tasks if task.parts == 1) == sorted(small)
+    assert reassemble(parts) == process_file(big)
+    # Without splitting every file is a single task.
+    batches = ceevents.schedule([*small, big], workers, split=False)
+    tasks = [task for batch in batches for task in batch]
+    assert sorted(task.xmlfile for task in tasks) == sorted([*small, big])
+    assert all(task.parts == 1 for task in tasks)
+
+
+@pytest.mark.parametrize("invalid", [False, True])
+def test_split_load(tmp_path, workers, collection, monkeypatch, invalid):
+    source = events(60)
+    if invalid:
+        source[40] = INVALID
+    xmlfile = write_events(tmp_path / "events.xml", *source)
+    parts = []
+
+    def count_parts(task, *args, **kwargs):
+        parts.append(task.parts)
+        return process_part(task, *args, **kwargs)
+
+    monkeypatch.setattr(ceevents, "process_part", count_parts)
+    loaded = {}
+    for backend in (BACKEND_SERIAL, BACKEND_THREAD):
+        ceevents.create_ebucket()
+        parts.clear()
+        errcount, _ = ceevents.process_module([xmlfile], backend=backend)
+        loaded[backend] = errcount, dict(ceevents.get_ebucket())
+    # The serial backend never splits, the thread backend parses four parts.
+    assert parts == [workers] * workers
+    assert loaded[BACKEND_THREAD] == loaded[BACKEND_SERIAL]
+    assert loaded[BACKEND_THREAD][0] == int(invalid)
+    assert len(loaded[BACKEND_THREAD][1]) == (0 if invalid else 60)
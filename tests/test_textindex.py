@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import random
+from xml.etree import ElementTree
+
+import pytest
+
+from pycestorieseditor.textindex import VERIFY_THRESHOLD, TextIndex, document, fold
+from tests.events import event_xml
+
+WORDS = ("camp", "campfire", "river", "riverbank", "night", "knight", "market", "a", "of")
+
+
+def brute_force(docs: dict[str, str], query: str) -> frozenset[str]:
+    query = fold(query)
+    return frozenset(name for name, doc in docs.items() if query in doc)
+
+
+def random_docs(rng: random.Random, amount: int) -> dict[str, str]:
+    return {
+        f"event{i}": fold(" ".join(rng.choices(WORDS, k=rng.randint(0, 6))))
+        for i in range(amount)
+    }
+
+
+def random_query(rng: random.Random) -> str:
+    word = rng.choice(WORDS)
+    start = rng.randrange(len(word))
+    query = word[start:rng.randint(start + 1, len(word))]
+    if rng.random() < 0.3:
+        query = f"{query} {rng.choice(WORDS)[:3]}"
+    return query.upper() if rng.random() < 0.2 else query
+
+
+def build(docs: dict[str, str]) -> TextIndex:
+    index = TextIndex()
+    for name, doc in docs.items():
+        index.add(name, doc)
+    return index
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_search_matches_brute_force(seed):
+    rng = random.Random(seed)
+    # Enough events for the intersection to go past VERIFY_THRESHOLD.
+    docs = random_docs(rng, VERIFY_THRESHOLD * 4)
+    index = build(docs)
+    for _ in range(200):
+        query = random_query(rng)
+        assert index.search(query) == brute_force(docs, query), query
+        assert index.estimate(query) >= len(index.search(query))
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_add_remove_matches_brute_force(seed):
+    rng = random.Random(seed)
+    docs = random_docs(rng, 50)
+    index = build(docs)
+    for _ in range(100):
+        name = f"event{rng.randrange(60)}"
+        if rng.random() < 0.4:
+            docs.pop(name, None)
+            index.remove(name)
+        else:
+            docs[name] = fold(" ".join(rng.choices(WORDS, k=rng.randint(1, 5))))
+            index.add(name, docs[name])
+        query = random_query(rng)
+        assert index.search(query) == brute_force(docs, query), query
+    assert len(index) == len(docs)
+    # Removing every event leaves no token nor trigram behind.
+    for name in list(docs):
+        index.remove(name)
+    assert not index._postings and not index._grams
+
+
+def test_document_folds():
+    element = ElementTree.fromstring(event_xml("folded", ["next"], text="  Élan   VITAL "))
+    assert document(element) == "elan vital\noption 0"
+    index = TextIndex()
+    index.add("folded", document(element))
+    assert index.search("ÉLAN") == {"folded"}
+    # A match never spans two strings of the event.
+    assert index.search("vital option") == frozenset()
+
+
+def test_empty_query():
+    index = build({"a": "camp", "b": ""})
+    assert index.search("  ") == {"a", "b"}
+    assert index.search("!!") == frozenset()
+
+
+def test_refine_previous_query(monkeypatch):
+    index = build({"a": "camp fire", "b": "campfire", "c": "river camp", "d": "night"})
+    assert index.search("cam") == {"a", "b", "c"}
+    planned = []
+    monkeypatch.setattr(index, "_words", lambda query: planned.append(query) or [])
+    # Extending the previous query only checks its results again.
+    assert index.search("campf") == {"b"}
+    assert index.search("CAMPFIRE") == {"b"}
+    assert not planned
+    # Any other query goes through the indexes.
+    assert index.search("camp fire") == {"a"}
+    assert planned == ["camp fire"]
+
+
+def test_refine_after_change():
+    index = build({"a": "camp fire", "b": "river"})
+    assert index.search("cam") == {"a"}
+    index.add("b", "campfire")
+    assert index.search("camp") == {"a", "b"}
+    index.remove("a")
+    assert index.search("campf") == {"b"}
+
+
+def test_snapshot_isolated():
+    docs = {"a": "camp fire", "b": "river bank"}
+    index = build(docs)
+    snapshot = index.snapshot()
+    index.add("c", "camp river")
+    index.remove("b")
+    index.add("a", "night market")
+    assert snapshot.search("camp") == {"a"}
+    assert snapshot.search("river") == {"b"}
+    assert index.search("camp") == {"c"}
+    assert index.search("river") == {"c"}
+    assert index.search("market") == {"a"}
+    # A second snapshot is isolated as well, the first one still.
+    again = index.snapshot()
+    index.remove("c")
+    assert again.search("camp") == {"c"}
+    assert snapshot.search("camp") == {"a"}
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import json
+import os
+import threading
+
+import pytest
+
+from pycestorieseditor.tracing import (
+    CAT_INGEST,
+    CAT_STAGE,
+    CAT_UI,
+    CAT_WORKER,
+    Tracer,
+    histogram,
+    make_span,
+    percentile,
+)
+
+
+def test_nested_spans():
+    tracer = Tracer()
+    with tracer.span("load", files=2):
+        with tracer.span("parse", CAT_INGEST) as args:
+            args["events"] = 5
+        with pytest.raises(ValueError):
+            with tracer.span("merge", CAT_INGEST):
+                raise ValueError
+    # Recorded as they end, a failed span included.
+    inner, failed, outer = tracer.spans
+    assert [s.name for s in tracer.spans] == ["parse", "merge", "load"]
+    assert outer.cat == CAT_STAGE and outer.args == {"files": 2}
+    assert inner.args == {"events": 5}
+    assert outer.start <= inner.start <= inner.end <= failed.start <= failed.end <= outer.end
+    assert tracer.durations() == {"load": (outer.end - outer.start) / 1e9}
+    assert set(tracer.durations(CAT_INGEST)) == {"parse", "merge"}
+    assert tracer.durations(since=3) == {}
+
+
+def test_chrome_trace(tmp_path):
+    tracer = Tracer()
+    origin = tracer.origin
+    tracer.add(make_span("load", CAT_STAGE, origin + 1000, origin + 5000))
+    tracer.add(make_span("process_file", CAT_WORKER, origin + 2000, origin + 4000, part="1/2"))
+    worker = make_span("process_file", CAT_WORKER, origin, origin + 1500)._replace(pid=1)
+    tracer.add(worker)
+    path = tmp_path / "trace.json"
+    tracer.write_chrome_trace(path)
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    assert trace["displayTimeUnit"] == "ms"
+    metadata = [e for e in trace["traceEvents"] if e["ph"] == "M"]
+    assert metadata == [
+        {"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "worker 1"}},
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "tid": 0,
+            "args": {"name": "pycestorieseditor"},
+        },
+    ]
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    # Microseconds from the creation of the tracer, arguments as strings.
+    assert complete[0] == {
+        "name": "load",
+        "cat": CAT_STAGE,
+        "ph": "X",
+        "pid": os.getpid(),
+        "tid": threading.get_native_id(),
+        "ts": 1.0,
+        "dur": 4.0,
+        "args": {},
+    }
+    assert complete[1]["args"] == {"part": "1/2"}
+    assert (complete[2]["pid"], complete[2]["ts"], complete[2]["dur"]) == (1, 0.0, 1.5)
+
+
+@pytest.mark.parametrize(
+    "values,p,expected",
+    [
+        ([], 50, 0.0),
+        ([3.0], 0, 3.0),
+        ([3.0], 100, 3.0),
+        ([4, 1, 3, 2], 50, 2),
+        ([4, 1, 3, 2], 75, 3),
+        ([4, 1, 3, 2], 100, 4),
+        (list(range(1, 101)), 95, 95),
+        (list(range(1, 101)), 1, 1),
+        (list(range(1, 21)), 95, 19),
+    ],
+)
+def test_percentile(values, p, expected):
+    assert percentile(values, p) == expected
+
+
+def test_histogram():
+    assert histogram([0.005, 0.01, 0.015, 0.3, 5.0], (0.01, 0.02, 1.0)) == [2, 1, 1, 1]
+
+
+def test_latency_summary():
+    tracer = Tracer()
+    for ms in range(1, 21):
+        tracer.add(make_span("search", CAT_UI, 0, ms * 10_000_000))
+    lines = tracer.latency_summary("search")
+    assert lines[0] == "Latency of search, 20 samples:"
+    assert "p95   190.0ms" in lines[1] and lines[1].endswith("target 200ms met")
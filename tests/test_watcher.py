@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Licensed under the EUPL v1.2
+# © 2025-current bicobus <bicobus@keemail.me>
+import queue
+import sys
+import time
+
+import pytest
+
+from pycestorieseditor import watcher
+from pycestorieseditor.watcher import (
+    CREATED,
+    DELETED,
+    MODIFIED,
+    ModuleWatcher,
+    file_change,
+    is_watched,
+)
+
+TIMEOUT = 5
+
+
+@pytest.fixture(params=["polling", "inotify"])
+def watch(request, tmp_path, monkeypatch):
+    """Start a watcher over a module, return its folder and the queue of changes"""
+    if request.param == "polling":
+        monkeypatch.setattr(watcher, "_Inotify", None)  # unusable, falls back to polling
+    elif not sys.platform.startswith("linux"):
+        pytest.skip("inotify is linux only")
+    module = tmp_path / "ModA"
+    (module / "Events").mkdir(parents=True)
+    (module / "Images").mkdir()
+    changes = queue.Queue()
+    thread = ModuleWatcher([module], changes.put, debounce=0.05, poll_interval=0.05)
+    assert thread.mode == request.param
+    thread.start()
+    yield module, changes
+    thread.stop()
+    thread.join(TIMEOUT)
+
+
+def wait_for(changes: queue.Queue, expected: file_change) -> list[file_change]:
+    """Every change received until expected shows up"""
+    received = []
+    deadline = time.monotonic() + TIMEOUT
+    while expected not in received:
+        received.extend(changes.get(timeout=max(0.0, deadline - time.monotonic())))
+    return received
+
+
+def test_write_modify_delete(watch):
+    module, changes = watch
+    path = module / "Events" / "events.xml"
+    path.write_text("<CEEvents/>", encoding="utf-8")
+    assert wait_for(changes, file_change(str(path), CREATED)) == [
+        file_change(str(path), CREATED)
+    ]
+    path.write_text("<CEEvents></CEEvents>", encoding="utf-8")
+    assert wait_for(changes, file_change(str(path), MODIFIED)) == [
+        file_change(str(path), MODIFIED)
+    ]
+    path.unlink()
+    assert wait_for(changes, file_change(str(path), DELETED)) == [
+        file_change(str(path), DELETED)
+    ]
+
+
+def test_only_loaded_files(watch):
+    module, changes = watch
+    # A load reads neither the subfolders of Events nor other suffixes.
+    (module / "Events" / "sub").mkdir()
+    (module / "Events" / "sub" / "nested.xml").write_text("<CEEvents/>", encoding="utf-8")
+    (module / "Events" / "notes.txt").write_text("notes", encoding="utf-8")
+    # Images are read from every subfolder.
+    (module / "Images" / "sub").mkdir()
+    image = module / "Images" / "sub" / "picture.png"
+    image.write_bytes(b"png")
+    received = wait_for(changes, file_change(str(image), CREATED))
+    assert received == [file_change(str(image), CREATED)]
+
+
+@pytest.mark.parametrize(
+    "path,folder,pattern,expected",
+    [
+        ("m/Events/a.xml", "m/Events", "*.xml", True),
+        ("m/Events/sub/a.xml", "m/Events", "*.xml", False),
+        ("m/Events/a.txt", "m/Events", "*.xml", False),
+        ("m/Other/a.xml", "m/Events", "*.xml", False),
+        ("m/Images/a.png", "m/Images", "**/*.png", True),
+        ("m/Images/sub/deep/a.png", "m/Images", "**/*.png", True),
+        ("m/a.png", "m/Images", "**/*.png", False),
+    ],
+)
+def test_is_watched(path, folder, pattern, expected):
+    assert is_watched(path, folder, pattern) is expected
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="case insensitive file system")
+def test_suffix_case_sensitive():
+    # As the glob of the loader on this platform.
+    assert not is_watched("m/Events/A.XML", "m/Events", "*.xml")